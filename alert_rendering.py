@@ -0,0 +1,358 @@
+import functools
+
+from revenue_stats import REPORT_PERCENTILES, percentile_key, sparkline
+
+
+# Slack limits: https://api.slack.com/reference/block-kit/blocks
+SLACK_MAX_BLOCKS = 50
+SLACK_SECTION_TEXT_LIMIT = 3000
+# Slack truncates plain `text` messages well before its 40k hard limit when
+# rendering, so long text reports are split into pages of this size.
+SLACK_TEXT_PAGE_LIMIT = 3900
+# Per-utility sections list this many utilities and summarise the rest, so
+# a report stays at one or two posts however many utilities are active
+DEFAULT_MAX_UTILITY_LINES = 20
+
+FIDELITY_NOTES = {
+    'rollup': "Built from stored window rollups; vending health unavailable",
+    'group_only': "Revenue by utility only; vending health and ticket sizes unavailable",
+    'count_only': "Transaction count only; revenue could not be computed",
+    'estimated': "Estimated count from recent windows; revenue could not be computed",
+    'unavailable': "Transaction data could not be read"
+}
+
+TOP_FIELD_LABELS = {
+    'meterNumber': "Meters",
+    'customerId': "Customers"
+}
+
+# symbol, thousands separator, decimal separator
+CURRENCY_LOCALES = {
+    'en_NG': ('₦', ',', '.'),
+    'en_US': ('$', ',', '.'),
+    'en_GB': ('£', ',', '.'),
+    'de_DE': ('€', '.', ','),
+    'fr_FR': ('€', ' ', ',')
+}
+
+
+TITLE = "⚡ *Power Transaction Revenue Report*"
+NO_TRANSACTIONS_TEXT = "📭 *No new transactions yet*\n\nNo power transactions were processed during this period."
+UTILITY_TITLE = "🏢 *Revenue Breakdown by Utility:*"
+HEALTH_TITLE = "🩺 *Vending Health:*"
+
+# Templates are module constants, never user input; each renders with one
+# str.format_map call on a dict of values
+TEMPLATES = {name: source.format_map for name, source in {
+    'period': "📅 *Period:* {period_name}\n🕐 *Time:* {time_display}",
+    'time_display': "{start:%H:%M} - {end:%H:%M} UTC on {start:%Y-%m-%d}",
+    'unavailable': "⚠️ *{note}*",
+    'totals': "💰 *Total Revenue Generated:* {total_amount}\n📊 *Total Transactions:* {total_transactions:,}",
+    'utility_line': "• *{util}*: {amount} ({transactions} transactions)",
+    'utility_rest': "• _{count:,} more utilities_: {amount} ({transactions:,} transactions)",
+    'more_utilities': "• _…and {count:,} more utilities_",
+    'degraded': "⚠️ _Degraded report ({fidelity}): {note}_",
+    'ticket_size': "🎟️ *Ticket Size:* {percentiles}",
+    'distribution_title': "📶 *Distribution* ({first_label} → {last_label}):",
+    'distribution_line': "• *{util}*: `{sparkline}` {percentiles}",
+    'hourly_title': "🕒 *Revenue by Hour* ({first_hour:%H:%M} → {last_hour:%H:%M} UTC):",
+    'hourly_line': "• *{util}*: `{sparkline}` peak {peak_hour:%H:%M} ({peak_amount})",
+    'top_title': "🏆 *Top {label} by Revenue:*",
+    'top_line': "• *{util}*: {entries}",
+    'top_entry': "`{key}` {amount} ({count:,})",
+    'health_rate': "✅ *Fulfillment Rate:* {rate}",
+    'health_failed': "❌ *Failed (revenue at risk):* {failed_amount} ({failed_transactions:,} transactions)",
+    'health_pending': "⏳ *Pending Backlog:* {pending_transactions:,} transactions ({pending_amount})",
+    'health_line': "• *{util}*: {rate} fulfilled, {failed_amount} failed ({failed_transactions}), {pending_transactions} pending",
+    'read_source': "_Read from {read_preference} node, ~{staleness:.0f}s behind primary_",
+    'continued': "{title} (continued {page}/{pages})",
+    'page_context': "Page {page}/{pages}",
+    'error': "🚨 *Power Transaction Alert System Error*\n\n*Error:* {error}\n*Time:* {time:%Y-%m-%d %H:%M:%S} UTC"
+}.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def currency_formatter(locale_name='en_NG', decimals=2):
+    symbol, thousands, decimal = CURRENCY_LOCALES.get(locale_name, CURRENCY_LOCALES['en_NG'])
+    spec = f",.{decimals}f"
+    # Format with Python's ',' and '.' and swap them in one pass for other locales
+    translation = str.maketrans({',': thousands, '.': decimal}) if (thousands, decimal) != (',', '.') else None
+
+    def format_amount(amount):
+        text = format(amount, spec)
+        if translation is not None:
+            text = text.translate(translation)
+        return symbol + text
+
+    return format_amount
+
+
+def format_rate(rate):
+    return f"{rate:.1%}" if rate is not None else "n/a"
+
+
+PERCENTILE_KEYS = tuple(percentile_key(q) for q in REPORT_PERCENTILES)
+
+
+def percentile_text(stats, money):
+    return " • ".join([f"{key} {money(stats[key])}" for key in PERCENTILE_KEYS if stats.get(key) is not None])
+
+
+def capped(rows, max_lines):
+    """The rows to list and how many are left out"""
+    if max_lines is None or len(rows) <= max_lines:
+        return rows, 0
+    return rows[:max_lines], len(rows) - max_lines
+
+
+def more_utilities_line(count):
+    return [TEMPLATES['more_utilities']({'count': count})] if count else []
+
+
+def format_vending_health(revenue_data, locale_name='en_NG'):
+    section = vending_health_section(revenue_data, locale_name)
+    return "\n".join(section) if section else ""
+
+
+def amount_stats_section(revenue_data, locale_name='en_NG', max_lines=None):
+    amount_stats = revenue_data.get('amount_stats')
+    if not amount_stats:
+        return []
+
+    whole_money = currency_formatter(locale_name, 0)
+    labels = amount_stats['histogram_labels']
+    lines = [
+        TEMPLATES['ticket_size']({'percentiles': percentile_text(amount_stats['overall'], whole_money)}),
+        TEMPLATES['distribution_title']({'first_label': labels[0], 'last_label': labels[-1]})
+    ]
+    line_template = TEMPLATES['distribution_line']
+    shown, hidden = capped(amount_stats['by_utility'], max_lines)
+    for util_stats in shown:
+        lines.append(line_template({
+            'util': util_stats['util'],
+            'sparkline': sparkline(util_stats['histogram']),
+            'percentiles': percentile_text(util_stats, whole_money)
+        }))
+    return lines + more_utilities_line(hidden)
+
+
+def hourly_revenue_section(revenue_data, locale_name='en_NG', max_lines=None):
+    hourly_revenue = revenue_data.get('hourly_revenue')
+    if not hourly_revenue or not hourly_revenue['by_utility']:
+        return []
+
+    whole_money = currency_formatter(locale_name, 0)
+    hours = hourly_revenue['hours']
+    lines = [TEMPLATES['hourly_title']({'first_hour': hours[0], 'last_hour': hours[-1]})]
+    line_template = TEMPLATES['hourly_line']
+    shown, hidden = capped([util_data for util_data in hourly_revenue['by_utility'] if any(util_data['amounts'])], max_lines)
+    for util_data in shown:
+        amounts = util_data['amounts']
+        peak = max(range(len(amounts)), key=amounts.__getitem__)
+        lines.append(line_template({
+            'util': util_data['util'],
+            'sparkline': sparkline(amounts),
+            'peak_hour': hours[peak],
+            'peak_amount': whole_money(amounts[peak])
+        }))
+    return lines + more_utilities_line(hidden)
+
+
+def top_contributors_section(revenue_data, locale_name='en_NG', max_lines=None):
+    top_contributors = revenue_data.get('top_contributors')
+    if not top_contributors or not top_contributors['by_utility']:
+        return []
+
+    whole_money = currency_formatter(locale_name, 0)
+    label = TOP_FIELD_LABELS.get(top_contributors['field'], top_contributors['field'])
+    lines = [TEMPLATES['top_title']({'label': label})]
+    line_template = TEMPLATES['top_line']
+    entry_template = TEMPLATES['top_entry']
+    shown, hidden = capped([util_data for util_data in top_contributors['by_utility'] if util_data['top']], max_lines)
+    for util_data in shown:
+        entries = [
+            entry_template({'key': entry['key'], 'amount': whole_money(entry['amount']), 'count': entry['count']})
+            for entry in util_data['top']
+        ]
+        lines.append(line_template({'util': util_data['util'], 'entries': " • ".join(entries)}))
+    return lines + more_utilities_line(hidden)
+
+
+def vending_health_section(revenue_data, locale_name='en_NG', max_lines=None):
+    if not revenue_data.get('failed_transactions') and not revenue_data.get('pending_transactions'):
+        return []
+
+    money = currency_formatter(locale_name)
+    lines = [
+        HEALTH_TITLE,
+        TEMPLATES['health_rate']({'rate': format_rate(revenue_data.get('fulfillment_rate'))}),
+        TEMPLATES['health_failed']({
+            'failed_amount': money(revenue_data['failed_amount']),
+            'failed_transactions': revenue_data['failed_transactions']
+        }),
+        TEMPLATES['health_pending']({
+            'pending_transactions': revenue_data['pending_transactions'],
+            'pending_amount': money(revenue_data['pending_amount'])
+        })
+    ]
+    line_template = TEMPLATES['health_line']
+    shown, hidden = capped([
+        util_data for util_data in revenue_data.get('status_breakdown', [])
+        if util_data['failed_transactions'] or util_data['pending_transactions']
+    ], max_lines)
+    for util_data in shown:
+        lines.append(line_template({
+            'util': util_data['util'],
+            'rate': format_rate(util_data['fulfillment_rate']),
+            'failed_amount': money(util_data['failed_amount']),
+            'failed_transactions': util_data['failed_transactions'],
+            'pending_transactions': util_data['pending_transactions']
+        }))
+    return lines + more_utilities_line(hidden)
+
+
+def build_report_sections(revenue_data, period_name, start_time, end_time, locale_name='en_NG',
+                          max_utility_lines=DEFAULT_MAX_UTILITY_LINES):
+    """The report as a list of sections (lists of lines) shared by the text and Block Kit renderers
+
+    Per-utility sections list at most ``max_utility_lines`` utilities (``None``
+    lists them all); the utility breakdown totals the rest in one line.
+    """
+
+    money = currency_formatter(locale_name)
+    time_display = TEMPLATES['time_display']({'start': start_time, 'end': end_time})
+    sections = [[TEMPLATES['period']({'period_name': period_name, 'time_display': time_display})]]
+    fidelity = revenue_data.get('fidelity', 'full')
+
+    if fidelity == 'unavailable':
+        sections.append([TEMPLATES['unavailable']({'note': FIDELITY_NOTES['unavailable']})])
+    elif revenue_data['total_transactions'] == 0:
+        sections.append([NO_TRANSACTIONS_TEXT])
+    else:
+        sections.append([TEMPLATES['totals']({
+            'total_amount': money(revenue_data['total_amount']),
+            'total_transactions': revenue_data['total_transactions']
+        })])
+        line_template = TEMPLATES['utility_line']
+        utility_section = [UTILITY_TITLE]
+        shown, hidden = capped(revenue_data['utility_breakdown'], max_utility_lines)
+        for util_data in shown:
+            utility_section.append(line_template({
+                'util': util_data['util'],
+                'amount': money(util_data['amount']),
+                'transactions': util_data['transactions']
+            }))
+        if hidden:
+            rest = revenue_data['utility_breakdown'][len(shown):]
+            utility_section.append(TEMPLATES['utility_rest']({
+                'count': hidden,
+                'amount': money(sum(util_data['amount'] for util_data in rest)),
+                'transactions': sum(util_data['transactions'] for util_data in rest)
+            }))
+        sections.append(utility_section)
+
+    if fidelity not in ('full', 'unavailable'):
+        sections.append([TEMPLATES['degraded']({'fidelity': fidelity, 'note': FIDELITY_NOTES[fidelity]})])
+
+    if revenue_data['total_transactions']:
+        sections.append(hourly_revenue_section(revenue_data, locale_name, max_utility_lines))
+        sections.append(top_contributors_section(revenue_data, locale_name, max_utility_lines))
+        sections.append(amount_stats_section(revenue_data, locale_name, max_utility_lines))
+    sections.append(vending_health_section(revenue_data, locale_name, max_utility_lines))
+
+    read_source = revenue_data.get('read_source')
+    if read_source and read_source.get('staleness_seconds'):
+        sections.append([TEMPLATES['read_source']({
+            'read_preference': read_source['read_preference'],
+            'staleness': read_source['staleness_seconds']
+        })])
+
+    return [section for section in sections if section]
+
+
+def truncate(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def chunk_lines(lines, limit):
+    """Group lines into newline-joined chunks of at most ``limit`` characters"""
+
+    chunks = []
+    current = []
+    size = 0
+    for line in lines:
+        line = truncate(line, limit)
+        added = len(line) + (1 if current else 0)
+        if current and size + added > limit:
+            chunks.append("\n".join(current))
+            current = []
+            added = len(line)
+            size = 0
+        current.append(line)
+        size += added
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def render_text_messages(sections, page_limit=SLACK_TEXT_PAGE_LIMIT):
+    title = TITLE
+    text = "\n\n".join([title] + ["\n".join(section) for section in sections])
+    if len(text) <= page_limit:
+        return [{"text": text}]
+
+    # Keep section spacing by paging over lines with blank separators between sections
+    lines = [title, ""]
+    for section in sections:
+        lines.extend(section)
+        lines.append("")
+    pages = chunk_lines(lines[:-1], page_limit - len(title) - 32)
+
+    messages = [{"text": pages[0]}]
+    continued = TEMPLATES['continued']
+    for page, page_text in enumerate(pages[1:], start=2):
+        header = continued({'title': title, 'page': page, 'pages': len(pages)})
+        messages.append({"text": f"{header}\n\n{page_text.strip()}"})
+    return messages
+
+
+def render_block_messages(sections, fallback_text):
+    blocks = [
+        {'type': 'header', 'text': {'type': 'plain_text', 'text': "⚡ Power Transaction Revenue Report", 'emoji': True}}
+    ]
+    for index, section in enumerate(sections):
+        if index:
+            blocks.append({'type': 'divider'})
+        for chunk in chunk_lines(section, SLACK_SECTION_TEXT_LIMIT):
+            blocks.append({'type': 'section', 'text': {'type': 'mrkdwn', 'text': chunk}})
+
+    if len(blocks) <= SLACK_MAX_BLOCKS:
+        return [{"text": fallback_text, "blocks": blocks}]
+
+    # Each page after the first carries a context block saying where it is
+    per_page = SLACK_MAX_BLOCKS - 1
+    pages = [blocks[i:i + per_page] for i in range(0, len(blocks), per_page)]
+    page_context = TEMPLATES['page_context']
+    messages = []
+    for page, page_blocks in enumerate(pages, start=1):
+        context = {'type': 'context', 'elements': [
+            {'type': 'mrkdwn', 'text': page_context({'page': page, 'pages': len(pages)})}
+        ]}
+        messages.append({"text": fallback_text, "blocks": page_blocks + [context]})
+    return messages
+
+
+def render_revenue_report(revenue_data, period_name, start_time, end_time, message_format='text', locale_name='en_NG',
+                          max_utility_lines=DEFAULT_MAX_UTILITY_LINES):
+    """Slack webhook payloads for the report; more than one when it exceeds Slack's limits"""
+
+    sections = build_report_sections(revenue_data, period_name, start_time, end_time, locale_name, max_utility_lines)
+    if message_format == 'blocks':
+        fallback_text = f"{TITLE} - {period_name}"
+        return render_block_messages(sections, fallback_text)
+    return render_text_messages(sections)
+
+
+def render_error_message(error_message, now):
+    clean_error_msg = str(error_message).replace('"', "'").replace('\n', ' ')
+    return {"text": TEMPLATES['error']({'error': truncate(clean_error_msg, SLACK_SECTION_TEXT_LIMIT), 'time': now})}
@@ -0,0 +1,120 @@
+"""Cold-start benchmark for the Lambda init phase.
+
+Run from the repository root:
+
+    python benchmarks/bench_cold_start.py [runs] [latency_ms]
+
+Uses the test harness (in-process fake MongoDB, SSM, Secrets Manager and a
+local Slack stub). With ``latency_ms`` > 0 every SSM/Secrets Manager call and
+the first MongoDB round trip of each client sleep that long, standing in for
+the network and TLS/auth handshake a real cold start pays. Reports the median
+over ``runs`` for:
+
+- import: importing lambda_function in a fresh interpreter
+- lazy cold invoke: first invocation when nothing was set up at init
+- initialize(): the init-phase work that now runs outside the handler
+- invoke after init: first invocation once initialize() has run
+- warm invoke: a repeat invocation in the same environment
+- snapshot + restore: before_snapshot() followed by after_restore()
+- invoke after restore: first invocation in a restored environment
+"""
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import lambda_function
+from fake_mongo import FakeDatabase, FakeMongoClient
+from harness import LambdaHarness, generate_transactions
+
+
+def add_latency(harness, seconds):
+    """Charge ``seconds`` per AWS call and for each Mongo client's first round trip"""
+
+    def delayed(fn):
+        def wrapper(*args, **kwargs):
+            time.sleep(seconds)
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def handshake(client):
+        if not getattr(client, 'handshake_done', False):
+            client.handshake_done = True
+            time.sleep(seconds)
+
+    harness.aws.ssm.get_parameter = delayed(harness.aws.ssm.get_parameter)
+    harness.aws.secretsmanager.get_secret_value = delayed(harness.aws.secretsmanager.get_secret_value)
+
+    server_info, command = FakeMongoClient.server_info, FakeDatabase.command
+
+    def slow_server_info(self):
+        handshake(self)
+        return server_info(self)
+
+    def slow_command(self, *args, **kwargs):
+        handshake(self.client)
+        return command(self, *args, **kwargs)
+
+    harness._patch(FakeMongoClient, 'server_info', slow_server_info)
+    harness._patch(FakeDatabase, 'command', slow_command)
+
+
+def measure_import():
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import lambda_function'], cwd=ROOT, check=True)
+    return time.perf_counter() - started
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def measure_invocations(harness):
+    timings = {}
+
+    harness.reset_warm_state()
+    timings['lazy cold invoke'] = harness.invoke()[1]
+
+    harness.reset_warm_state()
+    timings['initialize()'] = timed(lambda_function.initialize)
+    timings['invoke after init'] = harness.invoke()[1]
+    timings['warm invoke'] = harness.invoke()[1]
+
+    timings['snapshot + restore'] = timed(lambda: (lambda_function.before_snapshot(), lambda_function.after_restore()))
+    timings['invoke after restore'] = harness.invoke()[1]
+    return timings
+
+
+def main(runs, latency_ms):
+    results = {'import': [measure_import() for _ in range(runs)]}
+
+    with LambdaHarness() as harness:
+        if latency_ms:
+            add_latency(harness, latency_ms / 1000)
+        harness.seed(generate_transactions(500, harness.now - timedelta(hours=6), harness.now))
+        for _ in range(runs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = measure_invocations(harness)
+            for label, seconds in timings.items():
+                results.setdefault(label, []).append(seconds)
+
+    print(f"{'stage':>22} {'median ms':>10}")
+    for label, timings in results.items():
+        print(f"{label:>22} {statistics.median(timings) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    )
@@ -0,0 +1,83 @@
+"""Columnar decoding benchmark: summing transaction amounts from raw batches.
+
+Run from the repository root:
+
+    python benchmarks/bench_columnar.py [documents]
+
+Encodes transaction documents into raw batches of 10,000 (the shape
+aggregate_raw_batches returns) and sums the amounts three ways: bson.decode_all
+plus a loop over the dicts, bson.columnar.decode_columns with the C extension,
+and decode_columns with the pure-Python decoder. It reports the total time and
+the traced peak memory of decoding one batch.
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+import bson.columnar as columnar
+from bson import ObjectId, encode
+from bson.columnar import DATETIME_MS, FLOAT64, STRING, decode_columns
+
+BATCH_SIZE = 10000
+SCHEMA = {'amount': FLOAT64, 'createdAt': DATETIME_MS, 'util': STRING}
+
+
+def build_batches(documents):
+    start = datetime(2025, 6, 1, 12, 0)
+    batches = []
+    for first in range(0, documents, BATCH_SIZE):
+        batches.append(b''.join(
+            encode({
+                '_id': ObjectId(),
+                'createdAt': start + timedelta(seconds=i),
+                'util': ('IKEDC', 'EKEDC', 'AEDC')[i % 3],
+                'status': 'fulfilled',
+                'amount': 1000.0 + i % 9000,
+                'meterNumber': f"4501{i:07d}"
+            })
+            for i in range(first, min(first + BATCH_SIZE, documents))
+        ))
+    return batches
+
+
+def sum_documents(batches):
+    return sum(doc['amount'] for batch in batches for doc in bson.decode_all(batch))
+
+
+def sum_columns(batches):
+    return sum(sum(decode_columns(batch, SCHEMA)['amount']) for batch in batches)
+
+
+def measure(label, total, batches):
+    started = time.perf_counter()
+    result = total(batches)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    total(batches[:1])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:>16} {elapsed * 1000:>9.0f} {peak / 1024 / 1024:>13.2f} {result:>16,.0f}")
+
+
+def main(documents):
+    batches = build_batches(documents)
+    print(f"{documents:,} documents in {len(batches)} batches, {sum(map(len, batches)) / 1024 / 1024:.0f} MB")
+    print(f"{'decoder':>16} {'ms':>9} {'batch peak MB':>13} {'sum':>16}")
+
+    measure('decode_all', sum_documents, batches)
+    measure('columns (C)', sum_columns, batches)
+    c_decode_columns = columnar._c_decode_columns
+    columnar._c_decode_columns = None
+    try:
+        measure('columns (python)', sum_columns, batches)
+    finally:
+        columnar._c_decode_columns = c_decode_columns
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
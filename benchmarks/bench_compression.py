@@ -0,0 +1,97 @@
+"""Wire-compression benchmark on revenue report replies.
+
+Run from the repository root:
+
+    python benchmarks/bench_compression.py [transactions ...]
+
+For each transaction count, runs the report's $facet pipeline against the
+test fakes and BSON-encodes the reply the way the server would send it, plus
+a small getMore-sized reply. Each available compressor (snappy needs
+python-snappy, zstd needs zstandard) then compresses and decompresses the
+reply through pymongo.compression_support. "fresh" builds a new context per
+message, which is what compression_support did before contexts were cached
+per thread.
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import bson
+from pymongo import compression_support
+from pymongo.compression_support import SnappyContext, ZlibContext, ZstdContext, decompress
+
+from harness import LambdaHarness, generate_transactions
+from lambda_function import build_revenue_pipeline, get_status_groups
+
+
+def facet_reply(transactions):
+    """BSON of the aggregate reply carrying the report's $facet document"""
+
+    with LambdaHarness() as harness, contextlib.redirect_stdout(io.StringIO()):
+        end_time = harness.now
+        start_time = end_time - timedelta(hours=6)
+        harness.seed(generate_transactions(transactions, start_time, end_time, utilities=[f"UTIL-{i:02d}" for i in range(12)]))
+        failed_statuses, pending_statuses = get_status_groups()
+        pipeline = build_revenue_pipeline(start_time, end_time, failed_statuses, pending_statuses, True, 10, 'meterNumber')
+        [facet] = list(harness.database['power_transaction_items'].aggregate(pipeline))
+
+    return bson.encode({'cursor': {'firstBatch': [facet], 'id': 0, 'ns': 'power_alerts.power_transaction_items'}, 'ok': 1.0})
+
+
+def small_reply():
+    return bson.encode({'cursor': {'nextBatch': [], 'id': 0, 'ns': 'power_alerts.power_transaction_items'}, 'ok': 1.0})
+
+
+def fresh_zstd_roundtrip(data):
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompress(zstandard.ZstdCompressor().compress(data))
+
+
+def contexts():
+    available = []
+    if compression_support._have_snappy():
+        available.append(('snappy', SnappyContext(), None))
+    available.append(('zlib', ZlibContext(-1), None))
+    if compression_support._have_zstd():
+        available.append(('zstd', ZstdContext(), fresh_zstd_roundtrip))
+    return available
+
+
+def bench(fn, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(transaction_counts):
+    replies = [('getMore', small_reply())]
+    replies += [(f"$facet/{count}", facet_reply(count)) for count in transaction_counts]
+
+    print(f"{'reply':>14} {'bytes':>8} {'codec':>7} {'ratio':>6} {'pooled us':>10} {'fresh us':>9} {'MB/s':>8}")
+    for label, data in replies:
+        repeat = 2000 if len(data) < 4096 else 200
+        for name, ctx, fresh in contexts():
+            compressed = ctx.compress(data)
+            assert decompress(compressed, ctx.compressor_id) == data
+            pooled = bench(lambda d: decompress(ctx.compress(d), ctx.compressor_id), data, repeat)
+            fresh_us = f"{bench(fresh, data, repeat) * 1e6:>9.1f}" if fresh else f"{'-':>9}"
+            print(
+                f"{label:>14} {len(data):>8} {name:>7} {len(data) / len(compressed):>6.2f} "
+                f"{pooled * 1e6:>10.1f} {fresh_us} {len(data) / pooled / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [500, 5000, 20000])
@@ -0,0 +1,87 @@
+"""Selective BSON decoding benchmark on wide transaction documents.
+
+Run from the repository root:
+
+    python benchmarks/bench_field_selection.py [documents]
+
+Encodes a batch of 40-field transaction documents (the report fields plus
+customer, meter and payment metadata) and decodes it with bson.decode_all,
+selecting 1, 2, 4, 8, 16 and all 40 fields through
+CodecOptions(field_selection=...), with the C extension and with the
+pure-Python decoder. "full" is the same batch decoded without a selection.
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from bson import ObjectId, encode
+from bson.codec_options import CodecOptions
+
+REPORT_FIELDS = ['createdAt', 'amount', 'util', 'status']
+
+
+def wide_transaction(index, start):
+    doc = {
+        '_id': ObjectId(),
+        'createdAt': start + timedelta(seconds=index),
+        'amount': f"{1000 + index % 9000}.00",
+        'util': ('IKEDC', 'EKEDC', 'AEDC')[index % 3],
+        'status': 'fulfilled',
+        'meterNumber': f"4501{index:07d}",
+        'customer': {'name': f"Customer {index}", 'phone': '+2348000000000', 'address': '12 Allen Avenue, Ikeja'},
+        'payment': {'channel': 'card', 'reference': f"PAY-{index:010d}", 'gateway': 'paystack', 'fee': 100.0},
+        'token': f"{index:020d}",
+        'units': 42.5,
+    }
+    for extra in range(40 - len(doc)):
+        doc[f"field{extra:02d}"] = f"value {extra} for transaction {index}"
+    return doc
+
+
+def python_decode_all(data, opts):
+    """bson's pure-Python batch decoder, bypassing the C extension"""
+    data, view = bson.get_data_and_view(data)
+    docs = []
+    position = 0
+    while position < len(data):
+        size = bson._UNPACK_INT_FROM(data, position)[0]
+        if opts.field_selection is None:
+            docs.append(bson._elements_to_dict(data, view, position + 4, position + size - 1, opts))
+        else:
+            docs.append(bson._selected_elements_to_dict(data, view, position + 4, position + size - 1, opts, opts.field_selection))
+        position += size
+    return docs
+
+
+def timed(decode, data, opts, repeat=7):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(data, opts)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(documents):
+    start = datetime(2025, 6, 1, 12, 0)
+    docs = [wide_transaction(i, start) for i in range(documents)]
+    data = b''.join(encode(doc) for doc in docs)
+    names = REPORT_FIELDS + [name for name in docs[0] if name not in REPORT_FIELDS]
+    print(f"{documents:,} documents, {len(data) / documents:.0f} bytes each, {len(names)} fields")
+    print(f"{'fields':>6} {'C ms':>8} {'python ms':>10}")
+
+    for label, opts in [('full', CodecOptions())] + [
+        (str(count), CodecOptions(field_selection=names[:count])) for count in (1, 2, 4, 8, 16, len(names))
+    ]:
+        c_time = timed(bson._decode_all, data, opts)
+        python_time = timed(python_decode_all, data, opts, repeat=3)
+        print(f"{label:>6} {c_time * 1000:>8.2f} {python_time * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
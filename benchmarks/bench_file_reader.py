@@ -0,0 +1,78 @@
+"""BSON file replay benchmark: decode_file_iter against the memory-mapped reader.
+
+Run from the repository root:
+
+    python benchmarks/bench_file_reader.py [documents] [processes ...]
+
+Writes a mongodump-style .bson file of transaction documents to a temporary
+directory (200,000 documents, about 25 MB, by default) and iterates over it
+with bson.decode_file_iter and with bson.file_reader.decode_mmap_iter, both in
+process and with a pool of each given size (2 and 4 by default). It reports
+the time to index the file, the median time per full pass, and documents per
+second.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mmap
+
+from bson import ObjectId, decode_file_iter, encode
+from bson.file_reader import decode_mmap_iter, index_chunks
+
+
+def write_dump(path, documents):
+    start = datetime(2025, 6, 1, 12, 0)
+    with open(path, 'wb') as dump:
+        for first in range(0, documents, 10000):
+            dump.write(b''.join(
+                encode({
+                    '_id': ObjectId(),
+                    'createdAt': start + timedelta(seconds=i),
+                    'util': ('IKEDC', 'EKEDC', 'AEDC')[i % 3],
+                    'status': 'fulfilled',
+                    'amount': f"{1000 + i % 9000}.00",
+                    'meterNumber': f"4501{i:07d}",
+                    'customer': {'name': f"Customer {i}", 'phone': '+2348000000000'}
+                })
+                for i in range(first, min(first + 10000, documents))
+            ))
+
+
+def timed(path, reader, repeat=3, **kwargs):
+    timings = []
+    for _ in range(repeat):
+        with open(path, 'rb') as dump:
+            started = time.perf_counter()
+            count = sum(1 for _ in reader(dump, **kwargs))
+            timings.append(time.perf_counter() - started)
+    return count, statistics.median(timings)
+
+
+def main(documents, pool_sizes):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'power_transaction_items.bson')
+        write_dump(path, documents)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        with open(path, 'rb') as dump, mmap.mmap(dump.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            started = time.perf_counter()
+            chunks = len(index_chunks(mapped)) - 1
+            index_ms = (time.perf_counter() - started) * 1000
+        print(f"{documents:,} documents, {size_mb:.0f} MB, {chunks} chunks indexed in {index_ms:.0f} ms")
+        print(f"{'reader':>22} {'ms':>8} {'docs/s':>10}")
+
+        runs = [('decode_file_iter', decode_file_iter, {}), ('decode_mmap_iter', decode_mmap_iter, {})]
+        runs += [(f"decode_mmap_iter x{size}", decode_mmap_iter, {'processes': size}) for size in pool_sizes]
+        for label, reader, kwargs in runs:
+            count, elapsed = timed(path, reader, **kwargs)
+            assert count == documents
+            print(f"{label:>22} {elapsed * 1000:>8.0f} {count / elapsed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000, [int(arg) for arg in sys.argv[2:]] or [2, 4])
@@ -0,0 +1,110 @@
+"""Extended JSON benchmark: the current json_util against an earlier revision.
+
+Run from the repository root of a git checkout:
+
+    python benchmarks/bench_json_util.py <baseline revision> [documents]
+
+The baseline revision is required, e.g. the parent of the commit whose
+json_util changes are being measured (`<commit>~1`).
+
+Builds 100,000 documents mixing strings, ints, floats, datetimes, ObjectIds,
+Decimal128, Int64, nested sub-documents and arrays. The baseline is the real
+bson/json_util.py from the given git revision, loaded as a separate module. It
+times exporting the documents as Relaxed and Canonical Extended JSON with each
+module's dumps and with json_util.dump_documents into a StringIO, then parsing
+the Relaxed output back with each module's loads.
+"""
+import gc
+import importlib.util
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bson import Decimal128, Int64, ObjectId, json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS, RELAXED_JSON_OPTIONS
+
+def load_baseline(revision):
+    """Import bson/json_util.py as it was at `revision`"""
+    source = subprocess.run(
+        ['git', 'show', f"{revision}:bson/json_util.py"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    spec = importlib.util.spec_from_loader('json_util_baseline', loader=None)
+    module = importlib.util.module_from_spec(spec)
+    exec(compile(source, f"{revision}:bson/json_util.py", 'exec'), module.__dict__)
+    return module
+
+
+def mixed_document(index, start):
+    return {
+        '_id': ObjectId(),
+        'createdAt': start + timedelta(seconds=index),
+        'util': ('IKEDC', 'EKEDC', 'AEDC')[index % 3],
+        'status': 'fulfilled',
+        'amount': Decimal128(f"{1000 + index % 9000}.00"),
+        'units': 42.5 + index % 7,
+        'attempts': index % 4,
+        'sequence': Int64(index),
+        'paid': index % 5 != 0,
+        'refund': None,
+        'meterNumber': f"4501{index:07d}",
+        'customer': {'name': f"Customer {index}", 'phone': '+2348000000000', 'tags': ['prepaid', 'lagos']},
+        'history': [{'at': start, 'status': 'pending'}, {'at': start + timedelta(minutes=1), 'status': 'fulfilled'}]
+    }
+
+
+def exporter(module):
+    def export(docs, options):
+        return [module.dumps(doc, json_options=options) for doc in docs]
+    return export
+
+
+def parser(module):
+    def parse(lines, options):
+        return [module.loads(line, json_options=options) for line in lines]
+    return parse
+
+
+def export_stream(docs, options):
+    json_util.dump_documents(docs, io.StringIO(), json_options=options)
+
+
+def timed(func, data, options, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func(data, options)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(documents, revision):
+    baseline = load_baseline(revision)
+    start = datetime(2025, 6, 1, 12, 0)
+    docs = [mixed_document(i, start) for i in range(documents)]
+    print(f"{documents:,} mixed documents, baseline {revision}")
+    print(f"{'mode':>10} {'baseline ms':>12} {'current ms':>11} {'change':>7} {'stream ms':>10}")
+    for label, options in (('relaxed', RELAXED_JSON_OPTIONS), ('canonical', CANONICAL_JSON_OPTIONS)):
+        before = timed(exporter(baseline), docs, options)
+        after = timed(exporter(json_util), docs, options)
+        stream = timed(export_stream, docs, options)
+        print(f"{label:>10} {before * 1000:>12.0f} {after * 1000:>11.0f} {after / before - 1:>+7.0%} {stream * 1000:>10.0f}")
+
+    lines = exporter(json_util)(docs, RELAXED_JSON_OPTIONS)
+    assert lines == exporter(baseline)(docs, RELAXED_JSON_OPTIONS)
+    before = timed(parser(baseline), lines, RELAXED_JSON_OPTIONS)
+    after = timed(parser(json_util), lines, RELAXED_JSON_OPTIONS)
+    print(f"{'loads':>10} {before * 1000:>12.0f} {after * 1000:>11.0f} {after / before - 1:>+7.0%}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(int(sys.argv[2]) if len(sys.argv) > 2 else 100000, sys.argv[1])
@@ -0,0 +1,47 @@
+"""ObjectId generation benchmark for bulk-insert workloads.
+
+Run from the repository root:
+
+    python benchmarks/bench_objectid.py [count ...]
+
+Generates each count of ObjectIds (10,000, 100,000 and 1,000,000 by default)
+with one ObjectId() call each and with a single ObjectId.generate_batch call,
+and reports the median time and ids per second of each.
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+
+def one_by_one(count):
+    return [ObjectId() for _ in range(count)]
+
+
+def batched(count):
+    return ObjectId.generate_batch(count)
+
+
+def timed(generate, count, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        generate(count)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(counts):
+    print(f"{'count':>10} {'ObjectId() ms':>14} {'batch ms':>9} {'batch ids/s':>12}")
+    for count in counts:
+        single = timed(one_by_one, count)
+        batch = timed(batched, count)
+        print(f"{count:>10,} {single * 1000:>14.1f} {batch * 1000:>9.1f} {count / batch:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
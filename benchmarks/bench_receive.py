@@ -0,0 +1,101 @@
+"""Receive-path benchmark for multi-MB aggregation replies.
+
+Run from the repository root:
+
+    python benchmarks/bench_receive.py [reply_mb ...]
+
+A thread writes OP_MSG replies (a firstBatch of transaction-shaped documents,
+plain and zlib-compressed) into a socketpair. The main thread reads them with
+pymongo.network_layer.receive_message, either through a connection's retained
+receive buffers ("ring") or with a fresh bytearray per read ("fresh", the
+previous behaviour). It reports the median per reply for receive only and for
+receive plus BSON decoding.
+"""
+import os
+import socket
+import statistics
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId, encode
+from pymongo.compression_support import CompressionSettings, ZlibContext
+from pymongo.network_layer import _ReceiveBuffers, receive_message
+
+
+def build_reply(target_bytes):
+    start = datetime(2025, 6, 1, 12, 0)
+    doc = {'_id': ObjectId(), 'createdAt': start, 'util': 'IKEDC', 'status': 'fulfilled', 'amount': '1500.00', 'meterNumber': '45012345678'}
+    per_doc = len(encode(doc))
+    batch = [
+        dict(doc, _id=ObjectId(), createdAt=start + timedelta(seconds=i), amount=f"{1000 + i % 9000}.00")
+        for i in range(max(1, target_bytes // per_doc))
+    ]
+    return {'cursor': {'firstBatch': batch, 'id': 0, 'ns': 'power_alerts.power_transaction_items'}, 'ok': 1.0}
+
+
+def op_msg(doc, compressor=None):
+    body = struct.pack('<iB', 0, 0) + encode(doc)
+    if compressor is None:
+        return struct.pack('<iiii', 16 + len(body), 1, 0, 2013) + body
+    compressed = compressor.compress(body)
+    return (
+        struct.pack('<iiii', 25 + len(compressed), 1, 0, 2012)
+        + struct.pack('<iiB', 2013, len(body), compressor.compressor_id)
+        + compressed
+    )
+
+
+def bench(message, repeat, ring, decode):
+    server, client = socket.socketpair()
+    for sock in (server, client):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    conn = SimpleNamespace(
+        conn=client,
+        set_conn_timeout=client.settimeout,
+        cancel_context=SimpleNamespace(cancelled=False),
+        is_sdam=False,
+        receive_buffers=_ReceiveBuffers(max_retained=32 * 1024 * 1024) if ring else None,
+        compression_settings=CompressionSettings(['zlib'], 6)
+    )
+    sender = threading.Thread(target=lambda: [server.sendall(message) for _ in range(repeat)], daemon=True)
+    sender.start()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        reply = receive_message(conn, None, max_message_size=64 * 1024 * 1024)
+        if decode:
+            reply.unpack_response()
+        timings.append(time.perf_counter() - started)
+        del reply
+
+    sender.join()
+    server.close()
+    client.close()
+    return statistics.median(timings)
+
+
+def main(sizes_mb, repeat=30):
+    print(f"{'reply MB':>8} {'wire':>6} {'stage':>15} {'fresh ms':>9} {'ring ms':>8} {'ring MB/s':>10}")
+    for size_mb in sizes_mb:
+        doc = build_reply(int(size_mb * 1024 * 1024))
+        for wire, compressor in (('plain', None), ('zlib', ZlibContext(1))):
+            message = op_msg(doc, compressor)
+            for stage, decode in (('receive', False), ('receive+decode', True)):
+                fresh = bench(message, repeat, ring=False, decode=decode)
+                ring = bench(message, repeat, ring=True, decode=decode)
+                print(
+                    f"{size_mb:>8g} {wire:>6} {stage:>15} {fresh * 1000:>9.2f} {ring * 1000:>8.2f} "
+                    f"{size_mb / ring:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or [1, 4, 16])
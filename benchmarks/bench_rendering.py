@@ -0,0 +1,87 @@
+"""Micro-benchmark for alert_rendering.
+
+Run from the repository root:
+
+    python benchmarks/bench_rendering.py [utility_count ...]
+
+Reports the median time to render the full report (text and Block Kit)
+for each utility count, with the default per-section utility cap and with
+every utility listed; the target is < 1 ms for a few hundred utilities.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alert_rendering import DEFAULT_MAX_UTILITY_LINES, render_revenue_report
+from lambda_function import empty_revenue_summary, summarize_amount_stats
+
+
+def build_revenue_data(utility_count, seed=3):
+    rng = random.Random(seed)
+    revenue_data = empty_revenue_summary()
+    sketches = {}
+    for index in range(utility_count):
+        util = f"UTILITY-{index:04d}"
+        transactions = rng.randrange(1, 5000)
+        revenue_data['utility_breakdown'].append({
+            'util': util,
+            'amount': transactions * rng.uniform(1000, 8000),
+            'transactions': transactions
+        })
+        revenue_data['status_breakdown'].append({
+            'util': util,
+            'fulfillment_rate': rng.uniform(0.8, 1.0),
+            'failed_amount': rng.uniform(0, 50000),
+            'failed_transactions': rng.randrange(0, 20),
+            'pending_transactions': rng.randrange(0, 20)
+        })
+        sketches[util] = {rng.randrange(340, 560): rng.randrange(1, 50) for _ in range(40)}
+
+    revenue_data['utility_breakdown'].sort(key=lambda u: u['amount'], reverse=True)
+    revenue_data['total_amount'] = sum(u['amount'] for u in revenue_data['utility_breakdown'])
+    revenue_data['total_transactions'] = sum(u['transactions'] for u in revenue_data['utility_breakdown'])
+    revenue_data['failed_transactions'] = sum(u['failed_transactions'] for u in revenue_data['status_breakdown'])
+    revenue_data['failed_amount'] = sum(u['failed_amount'] for u in revenue_data['status_breakdown'])
+    revenue_data['fulfillment_rate'] = 0.95
+    revenue_data['amount_stats'] = summarize_amount_stats(sketches)
+    return revenue_data
+
+
+def bench(revenue_data, message_format, max_utility_lines, repeat=200):
+    start_time = datetime(2025, 6, 1, 12, 1)
+    end_time = datetime(2025, 6, 1, 17, 59)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        messages = render_revenue_report(
+            revenue_data, "Afternoon Period", start_time, end_time,
+            message_format=message_format, max_utility_lines=max_utility_lines
+        )
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, len(messages)
+
+
+def main(utility_counts):
+    print(f"{'utilities':>10} {'format':>15} {'median ms':>10} {'messages':>9}")
+    for utility_count in utility_counts:
+        revenue_data = build_revenue_data(utility_count)
+        # Revenue lines only, without the distribution and health sections
+        revenue_only = dict(revenue_data, amount_stats=None, failed_transactions=0, pending_transactions=0)
+        runs = (
+            ('full', revenue_data, DEFAULT_MAX_UTILITY_LINES),
+            ('revenue', revenue_only, DEFAULT_MAX_UTILITY_LINES),
+            ('uncapped', revenue_data, None)
+        )
+        for label, data, max_utility_lines in runs:
+            for message_format in ('text', 'blocks'):
+                median_ms, message_count = bench(data, message_format, max_utility_lines)
+                print(f"{utility_count:>10} {message_format + '/' + label:>15} {median_ms:>10.3f} {message_count:>9}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 300, 1000])
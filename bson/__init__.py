@@ -531,6 +531,50 @@ _ELEMENT_GETTER: dict[int, Callable[..., Tuple[Any, int]]] = {
 }
 
 
+# Width of fixed-size values, and the bytes that follow the int32 length
+# prefix of variable-size ones, for skipping fields outside a field selection.
+_FIXED_VALUE_SIZE: dict[int, int] = {
+    ord(BSONNUM): 8,
+    ord(BSONUND): 0,
+    ord(BSONOID): 12,
+    ord(BSONBOO): 1,
+    ord(BSONDAT): 8,
+    ord(BSONNUL): 0,
+    ord(BSONINT): 4,
+    ord(BSONTIM): 8,
+    ord(BSONLON): 8,
+    ord(BSONDEC): 16,
+    ord(BSONMIN): 0,
+    ord(BSONMAX): 0,
+}
+_LENGTH_PREFIXED_EXTRA: dict[int, int] = {
+    ord(BSONSTR): 4,
+    ord(BSONOBJ): 0,
+    ord(BSONARR): 0,
+    ord(BSONBIN): 5,
+    ord(BSONREF): 16,
+    ord(BSONCOD): 4,
+    ord(BSONSYM): 4,
+    ord(BSONCWS): 0,
+}
+
+
+def _skip_value(data: Any, position: int, element_type: int, obj_end: int) -> Optional[int]:
+    """Return the position after a value without decoding it, or None for an unknown type."""
+    size = _FIXED_VALUE_SIZE.get(element_type)
+    if size is None:
+        extra = _LENGTH_PREFIXED_EXTRA.get(element_type)
+        if extra is not None:
+            size = _UNPACK_INT_FROM(data, position)[0] + extra
+        elif element_type == ord(BSONRGX):
+            size = data.index(b"\x00", data.index(b"\x00", position) + 1) + 1 - position
+        else:
+            return None
+    if size < 0 or position + size > obj_end:
+        raise InvalidBSON("invalid object length")
+    return position + size
+
+
 if _USE_C:
 
     def _element_to_dict(
@@ -618,6 +662,56 @@ def _elements_to_dict(
     return result
 
 
+def _selected_elements_to_dict(
+    data: Any,
+    view: Any,
+    position: int,
+    obj_end: int,
+    opts: CodecOptions[Any],
+    selection: Mapping[str, Any],
+) -> Any:
+    """Decode the fields of a BSON document named in selection, skipping the rest."""
+    result = opts.document_class()
+    # Match names as bytes so skipped fields are never decoded to str.
+    encoded = {name.encode(): name for name in selection}
+    index = data.index
+    decoder_map = opts.type_registry._decoder_map
+    end = obj_end - 1
+    while position < end:
+        element_type = data[position]
+        name_end = index(b"\x00", position + 1)
+        name = encoded.get(data[position + 1 : name_end])
+        if name is None:
+            skipped = _skip_value(data, name_end + 1, element_type, obj_end)
+            if skipped is None:
+                _raise_unknown_type(element_type, _get_c_string(data, view, position + 1, opts)[0])
+            position = skipped
+            continue
+        value_position = name_end + 1
+        subselection = selection[name]
+        if subselection is not None and element_type == ord(BSONOBJ):
+            obj_size, obj_stop = _get_object_size(data, value_position, obj_end)
+            result[name] = _selected_elements_to_dict(
+                data, view, value_position + 4, obj_stop, opts, subselection
+            )
+            position = value_position + obj_size
+        else:
+            try:
+                value, position = _ELEMENT_GETTER[element_type](
+                    data, view, value_position, obj_end, opts, name
+                )
+            except KeyError:
+                _raise_unknown_type(element_type, name)
+            if decoder_map:
+                custom_decoder = decoder_map.get(type(value))
+                if custom_decoder is not None:
+                    value = custom_decoder(value)
+            result[name] = value
+    if position != obj_end:
+        raise InvalidBSON("bad object or element length")
+    return result
+
+
 def _bson_to_dict(data: Any, opts: CodecOptions[_DocumentType]) -> _DocumentType:
     """Decode a BSON string to document_class."""
     data, view = get_data_and_view(data)
@@ -625,6 +719,11 @@ def _bson_to_dict(data: Any, opts: CodecOptions[_DocumentType]) -> _DocumentType
         if _raw_document_class(opts.document_class):
             return opts.document_class(data, opts)  # type:ignore[call-arg]
         _, end = _get_object_size(data, 0, len(data))
+        if opts.field_selection is not None:
+            return cast(
+                "_DocumentType",
+                _selected_elements_to_dict(data, view, 4, end, opts, opts.field_selection),
+            )
         return cast("_DocumentType", _elements_to_dict(data, view, 4, end, opts))
     except InvalidBSON:
         raise
@@ -634,8 +733,23 @@ def _bson_to_dict(data: Any, opts: CodecOptions[_DocumentType]) -> _DocumentType
         raise InvalidBSON(str(exc_value)).with_traceback(exc_tb) from None
 
 
+def _c_decoder(c_decode: Callable[..., Any], py_decode: Callable[..., Any]) -> Callable[..., Any]:
+    """Return the C decoder, or a wrapper that leaves field selections to the
+    Python decoder when _cbson was built before it understood them.
+    """
+    if hasattr(_cbson, "_FIELD_SELECTION"):
+        return c_decode
+
+    def decode(data: Any, opts: CodecOptions[Any]) -> Any:
+        if opts.field_selection is None:
+            return c_decode(data, opts)
+        return py_decode(data, opts)
+
+    return decode
+
+
 if _USE_C:
-    _bson_to_dict = _cbson._bson_to_dict
+    _bson_to_dict = _c_decoder(_cbson._bson_to_dict, _bson_to_dict)
 
 
 _PACK_FLOAT = struct.Struct("<d").pack
@@ -1105,6 +1219,7 @@ def _decode_all(data: _ReadableBuffer, opts: CodecOptions[_DocumentType]) -> lis
     position = 0
     end = data_len - 1
     use_raw = _raw_document_class(opts.document_class)
+    selection = opts.field_selection
     try:
         while position < end:
             obj_size = _UNPACK_INT_FROM(data, position)[0]
@@ -1115,6 +1230,10 @@ def _decode_all(data: _ReadableBuffer, opts: CodecOptions[_DocumentType]) -> lis
                 raise InvalidBSON("bad eoo")
             if use_raw:
                 docs.append(opts.document_class(data[position : obj_end + 1], opts))  # type: ignore
+            elif selection is not None:
+                docs.append(
+                    _selected_elements_to_dict(data, view, position + 4, obj_end, opts, selection)
+                )
             else:
                 docs.append(_elements_to_dict(data, view, position + 4, obj_end, opts))
             position += obj_size
@@ -1128,7 +1247,7 @@ def _decode_all(data: _ReadableBuffer, opts: CodecOptions[_DocumentType]) -> lis
 
 
 if _USE_C:
-    _decode_all = _cbson._decode_all
+    _decode_all = _c_decoder(_cbson._decode_all, _decode_all)
 
 
 @overload
@@ -1199,6 +1318,39 @@ def _decode_selective(
     return doc
 
 
+def _decode_selected_documents(
+    rawdoc: Any, fields: Any, codec_options: CodecOptions[_DocumentType]
+) -> _DocumentType:
+    """Decode a command reply, applying codec_options.field_selection only to
+    the user documents at fields. rawdoc is a _RawArrayBSONDocument.
+    """
+    from bson.raw_bson import RawBSONDocument
+
+    others = [key for key in rawdoc if key not in fields]
+    reply_options = codec_options.with_options(type_registry=None, field_selection=others)
+    doc = _bson_to_dict(rawdoc.raw, reply_options)
+    for key, subfields in fields.items():
+        if key not in rawdoc:
+            continue
+        value = rawdoc[key]
+        if isinstance(value, RawBSONDocument):
+            if subfields == 1:
+                doc[key] = _bson_to_dict(value.raw, codec_options)
+            else:
+                doc[key] = _decode_selected_documents(value, subfields, codec_options)
+        elif isinstance(value, (bytes, memoryview)):
+            # An array left undecoded by _RawArrayBSONDocument, usually a batch.
+            try:
+                doc[key] = _decode_all(_array_of_documents_to_buffer(value), codec_options)
+            except InvalidBSON:
+                # Not all documents, e.g. distinct values.
+                whole = codec_options.with_options(field_selection=None)
+                doc[key] = list(_bson_to_dict(value, whole).values())
+        else:
+            doc[key] = value
+    return doc
+
+
 def _array_of_documents_to_buffer(data: Union[memoryview, bytes]) -> bytes:
     # Extract the raw bytes of each document.
     position = 0
@@ -1263,6 +1415,18 @@ def _decode_all_selective(
 
     .. versionadded:: 3.8
     """
+    if (
+        fields
+        and codec_options.field_selection is not None
+        and not _raw_document_class(codec_options.document_class)
+    ):
+        from bson.raw_bson import _RAW_ARRAY_BSON_OPTIONS
+
+        raw_options = _RAW_ARRAY_BSON_OPTIONS.with_options(
+            unicode_decode_error_handler=codec_options.unicode_decode_error_handler
+        )
+        return [_decode_selected_documents(_bson_to_dict(data, raw_options), fields, codec_options)]
+
     if not codec_options.type_registry._decoder_map:
         return decode_all(data, codec_options)
 
@@ -82,6 +82,7 @@ struct module_state {
     PyObject* _from_uuid_str;
     PyObject* _as_uuid_str;
     PyObject* _from_bid_str;
+    PyObject* _field_selection_str;
     int64_t min_millis;
     int64_t max_millis;
 };
@@ -629,7 +630,8 @@ static int _load_python_objects(PyObject* module) {
         (state->_utcoffset_str = PyUnicode_FromString("utcoffset")) &&
         (state->_from_uuid_str = PyUnicode_FromString("from_uuid")) &&
         (state->_as_uuid_str = PyUnicode_FromString("as_uuid")) &&
-        (state->_from_bid_str = PyUnicode_FromString("from_bid")))) {
+        (state->_from_bid_str = PyUnicode_FromString("from_bid")) &&
+        (state->_field_selection_str = PyUnicode_FromString("field_selection")))) {
             return 1;
     }
 
@@ -2760,6 +2762,320 @@ static PyObject* elements_to_dict(PyObject* self, const char* string,
     return result;
 }
 
+/*
+ * Advance *position past a value of the given type without creating any
+ * Python objects. max is the number of bytes left in the enclosing document.
+ *
+ * Returns 0 on success, -1 with InvalidBSON set if the value does not fit.
+ */
+static int _skip_value(const char* buffer, unsigned* position,
+                       unsigned char type, unsigned max) {
+    uint32_t length;
+    uint32_t size;
+
+    switch (type) {
+    case 6:
+    case 10:
+    case 127:
+    case 255:
+        size = 0;
+        break;
+    case 8:
+        size = 1;
+        break;
+    case 16:
+        size = 4;
+        break;
+    case 1:
+    case 9:
+    case 17:
+    case 18:
+        size = 8;
+        break;
+    case 7:
+        size = 12;
+        break;
+    case 19:
+        size = 16;
+        break;
+    case 2:
+    case 5:
+    case 12:
+    case 13:
+    case 14:
+        if (max < 4) {
+            goto invalid;
+        }
+        memcpy(&length, buffer + *position, 4);
+        length = BSON_UINT32_FROM_LE(length);
+        if (length > max) {
+            goto invalid;
+        }
+        /* Length prefix + value, plus the subtype byte (binary) or the
+         * ObjectId (DBPointer). */
+        size = 4 + length + (type == 5 ? 1 : 0) + (type == 12 ? 12 : 0);
+        break;
+    case 3:
+    case 4:
+    case 15:
+        if (max < 4) {
+            goto invalid;
+        }
+        memcpy(&size, buffer + *position, 4);
+        size = BSON_UINT32_FROM_LE(size);
+        if (size < BSON_MIN_SIZE) {
+            goto invalid;
+        }
+        break;
+    case 11:
+        {
+            /* Pattern and flags, two C strings. */
+            const char* start = buffer + *position;
+            const char* pattern_end = memchr(start, 0, max);
+            const char* flags_end;
+            if (!pattern_end) {
+                goto invalid;
+            }
+            flags_end = memchr(pattern_end + 1, 0, max - (pattern_end + 1 - start));
+            if (!flags_end) {
+                goto invalid;
+            }
+            size = (uint32_t)(flags_end - start) + 1;
+            break;
+        }
+    default:
+        goto invalid;
+    }
+
+    if (size > max) {
+        goto invalid;
+    }
+    *position += size;
+    return 0;
+
+invalid:
+    {
+        PyObject* InvalidBSON = _error("InvalidBSON");
+        if (InvalidBSON) {
+            PyErr_SetString(InvalidBSON, "invalid length or type code");
+            Py_DECREF(InvalidBSON);
+        }
+    }
+    return -1;
+}
+
+/* Selections up to this size are matched by comparing UTF-8 bytes, which
+ * avoids creating a str per field; larger ones use a dict lookup. */
+#define SELECTION_SCAN_MAX 8
+
+typedef struct selected_field_t {
+    const char* name;
+    Py_ssize_t name_length;
+    PyObject* key;
+    PyObject* value;
+} selected_field_t;
+
+/*
+ * Look up a field in a field selection.
+ *
+ * Returns the selection entry (None or a nested selection dict), borrowed,
+ * and sets *name to a new reference to the field name. Returns NULL if the
+ * field is not selected, or NULL with an exception set on error.
+ */
+static PyObject* _selected_field(PyObject* selection,
+                                 const selected_field_t* fields,
+                                 Py_ssize_t field_count,
+                                 const char* field, size_t field_length,
+                                 const codec_options_t* options,
+                                 PyObject** name) {
+    PyObject* value;
+    Py_ssize_t i;
+
+    if (field_count >= 0) {
+        for (i = 0; i < field_count; i++) {
+            if ((size_t)fields[i].name_length == field_length &&
+                    !memcmp(fields[i].name, field, field_length)) {
+                *name = fields[i].key;
+                Py_INCREF(*name);
+                return fields[i].value;
+            }
+        }
+        return NULL;
+    }
+
+    *name = PyUnicode_DecodeUTF8(field, field_length,
+                                 options->unicode_decode_error_handler);
+    if (!*name) {
+        return NULL;
+    }
+    value = PyDict_GetItemWithError(selection, *name);
+    if (!value) {
+        Py_CLEAR(*name);
+    }
+    return value;
+}
+
+static PyObject* selected_elements_to_dict(PyObject* self, const char* string,
+                                           unsigned max,
+                                           const codec_options_t* options,
+                                           PyObject* selection);
+
+static PyObject* _selected_elements_to_dict(PyObject* self, const char* string,
+                                            unsigned max,
+                                            const codec_options_t* options,
+                                            PyObject* selection) {
+    unsigned position = 0;
+    selected_field_t fields[SELECTION_SCAN_MAX];
+    Py_ssize_t field_count = -1;
+    PyObject* name = NULL;
+    PyObject* dict;
+
+    if (PyDict_GET_SIZE(selection) <= SELECTION_SCAN_MAX) {
+        Py_ssize_t pos = 0;
+        field_count = 0;
+        while (PyDict_Next(selection, &pos, &fields[field_count].key,
+                           &fields[field_count].value)) {
+            fields[field_count].name = PyUnicode_AsUTF8AndSize(
+                fields[field_count].key, &fields[field_count].name_length);
+            if (!fields[field_count].name) {
+                return NULL;
+            }
+            field_count++;
+        }
+    }
+
+    dict = PyObject_CallObject(options->document_class, NULL);
+    if (!dict) {
+        return NULL;
+    }
+    while (position < max) {
+        PyObject* value = NULL;
+        PyObject* subselection;
+        unsigned char type = (unsigned char)string[position];
+        size_t name_length = strlen(string + position + 1);
+
+        if (name_length > BSON_MAX_SIZE || position + 1 + name_length >= max) {
+            PyObject* InvalidBSON = _error("InvalidBSON");
+            if (InvalidBSON) {
+                PyErr_SetString(InvalidBSON, "field name too large");
+                Py_DECREF(InvalidBSON);
+            }
+            Py_DECREF(dict);
+            return NULL;
+        }
+
+        subselection = _selected_field(selection, fields, field_count,
+                                       string + position + 1, name_length,
+                                       options, &name);
+        position += (unsigned)name_length + 2;
+        if (!subselection) {
+            if (PyErr_Occurred()) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            /* Not selected: skip the value by length. */
+            if (_skip_value(string, &position, type, max - position) < 0) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            continue;
+        }
+
+        if (type == 3 && PyDict_Check(subselection)) {
+            /* Sub-document with its own selection. */
+            uint32_t size;
+            if (max - position < 4) {
+                goto invalid;
+            }
+            memcpy(&size, string + position, 4);
+            size = BSON_UINT32_FROM_LE(size);
+            if (size < BSON_MIN_SIZE || max - position < size ||
+                    string[position + size - 1]) {
+                goto invalid;
+            }
+            value = selected_elements_to_dict(self, string + position, size,
+                                              options, subselection);
+            position += size;
+        } else {
+            value = get_value(self, name, string, &position, type,
+                              max - position, options, 0);
+        }
+        if (!value) {
+            Py_DECREF(name);
+            Py_DECREF(dict);
+            return NULL;
+        }
+
+        if (PyObject_SetItem(dict, name, value) < 0) {
+            Py_DECREF(name);
+            Py_DECREF(value);
+            Py_DECREF(dict);
+            return NULL;
+        }
+        Py_CLEAR(name);
+        Py_DECREF(value);
+    }
+    return dict;
+
+invalid:
+    {
+        PyObject* InvalidBSON = _error("InvalidBSON");
+        if (InvalidBSON) {
+            PyErr_SetString(InvalidBSON, "invalid length or type code");
+            Py_DECREF(InvalidBSON);
+        }
+    }
+    Py_XDECREF(name);
+    Py_DECREF(dict);
+    return NULL;
+}
+
+/*
+ * Like elements_to_dict, but only decode the fields in selection, a dict
+ * mapping field names to None (decode the whole value) or to a nested
+ * selection for a sub-document. Other fields are skipped by length.
+ */
+static PyObject* selected_elements_to_dict(PyObject* self, const char* string,
+                                           unsigned max,
+                                           const codec_options_t* options,
+                                           PyObject* selection) {
+    PyObject* result;
+    if (!selection || options->is_raw_bson) {
+        return elements_to_dict(self, string, max, options);
+    }
+    if (Py_EnterRecursiveCall(" while decoding a BSON document"))
+        return NULL;
+    result = _selected_elements_to_dict(self, string + 4, max - 5, options,
+                                        selection);
+    Py_LeaveRecursiveCall();
+    return result;
+}
+
+/*
+ * The field selection of a CodecOptions, or NULL when every field should be
+ * decoded. It is an attribute rather than a tuple field so codec_options_t
+ * and the tuple layout parsed by convert_codec_options stay unchanged.
+ *
+ * Returns a new reference.
+ */
+static PyObject* _field_selection(PyObject* self, const codec_options_t* options) {
+    struct module_state *state = GETSTATE(self);
+    PyObject* selection;
+    if (!state || options->is_raw_bson) {
+        return NULL;
+    }
+    selection = PyObject_GetAttr(options->options_obj, state->_field_selection_str);
+    if (!selection) {
+        PyErr_Clear();
+        return NULL;
+    }
+    if (!PyDict_Check(selection)) {
+        Py_DECREF(selection);
+        return NULL;
+    }
+    return selection;
+}
+
 static int _get_buffer(PyObject *exporter, Py_buffer *view) {
     if (PyObject_GetBuffer(exporter, view, PyBUF_SIMPLE) == -1) {
         return 0;
@@ -2792,6 +3108,7 @@ static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
     codec_options_t options;
     PyObject* result = NULL;
     PyObject* options_obj;
+    PyObject* selection;
     Py_buffer view = {0};
 
     if (! (PyArg_ParseTuple(args, "OO", &bson, &options_obj) &&
@@ -2846,7 +3163,10 @@ static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
         goto done;
     }
 
-    result = elements_to_dict(self, string, (unsigned)size, &options);
+    selection = _field_selection(self, &options);
+    result = selected_elements_to_dict(self, string, (unsigned)size, &options,
+                                       selection);
+    Py_XDECREF(selection);
 done:
     PyBuffer_Release(&view);
     destroy_codec_options(&options);
@@ -2862,6 +3182,7 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
     PyObject* result = NULL;
     codec_options_t options;
     PyObject* options_obj = NULL;
+    PyObject* selection = NULL;
     Py_buffer view = {0};
 
     if (!(PyArg_ParseTuple(args, "OO", &bson, &options_obj) &&
@@ -2873,6 +3194,7 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
         destroy_codec_options(&options);
         return NULL;
     }
+    selection = _field_selection(self, &options);
     total_size = view.len;
     string = (char*)view.buf;
 
@@ -2924,7 +3246,8 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
             goto fail;
         }
 
-        dict = elements_to_dict(self, string, (unsigned)size, &options);
+        dict = selected_elements_to_dict(self, string, (unsigned)size,
+                                         &options, selection);
         if (!dict) {
             Py_DECREF(result);
             goto fail;
@@ -2942,11 +3265,347 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
 fail:
     result = NULL;
 done:
+    Py_XDECREF(selection);
     PyBuffer_Release(&view);
     destroy_codec_options(&options);
     return result;
 }
 
+/* Distinct values per str column matched by bytes before falling back to
+ * a dict lookup. */
+#define COLUMN_STRING_CACHE 32
+/* Stored in int64 and datetime columns for missing or mistyped values. */
+#define COLUMN_MISSING_INT64 INT64_MIN
+
+typedef struct column_t {
+    const char* name;
+    Py_ssize_t name_length;
+    char kind; /* 'd' float64, 'q' int64, 'M' datetime ms, 's' str */
+    PyObject* values; /* bytearray for numeric kinds, list for 's' */
+    PyObject* interned; /* str values seen so far, 's' only */
+    int cache_size;
+    const char* cache_data[COLUMN_STRING_CACHE];
+    uint32_t cache_length[COLUMN_STRING_CACHE];
+    PyObject* cache_value[COLUMN_STRING_CACHE];
+} column_t;
+
+/* Parse a numeric string such as "1500.00"; return 1 and set *out on success. */
+static int _parse_double(const char* data, uint32_t length, double* out) {
+    char text[64];
+    char* end;
+    double value;
+    while (length && Py_ISSPACE(*data)) {
+        data++;
+        length--;
+    }
+    while (length && Py_ISSPACE(data[length - 1])) {
+        length--;
+    }
+    if (!length || length >= sizeof(text)) {
+        return 0;
+    }
+    memcpy(text, data, length);
+    text[length] = '\0';
+    value = PyOS_string_to_double(text, &end, NULL);
+    if (PyErr_Occurred()) {
+        PyErr_Clear();
+        return 0;
+    }
+    if (end != text + length) {
+        return 0;
+    }
+    *out = value;
+    return 1;
+}
+
+/* An interned str for a BSON string value, as a borrowed reference. */
+static PyObject* _column_string(column_t* column, const char* data, uint32_t length) {
+    PyObject* value;
+    PyObject* seen;
+    int i;
+    for (i = 0; i < column->cache_size; i++) {
+        if (column->cache_length[i] == length &&
+                !memcmp(column->cache_data[i], data, length)) {
+            return column->cache_value[i];
+        }
+    }
+    value = PyUnicode_DecodeUTF8(data, length, "strict");
+    if (!value) {
+        return NULL;
+    }
+    seen = PyDict_SetDefault(column->interned, value, value);
+    Py_DECREF(value);
+    if (seen && column->cache_size < COLUMN_STRING_CACHE) {
+        column->cache_data[column->cache_size] = data;
+        column->cache_length[column->cache_size] = length;
+        column->cache_value[column->cache_size] = seen;
+        column->cache_size++;
+    }
+    return seen;
+}
+
+/* Store the value at data (of BSON type) in row of column. Values of other
+ * types leave the row missing. Returns -1 on error. */
+static int _fill_column(column_t* column, Py_ssize_t row, unsigned char type,
+                        const char* data) {
+    int32_t i32;
+    int64_t i64;
+    uint32_t length;
+    double d;
+
+    switch (column->kind) {
+    case 'd':
+        if (type == 1) {
+            memcpy(&d, data, 8);
+            d = BSON_DOUBLE_FROM_LE(d);
+        } else if (type == 16) {
+            memcpy(&i32, data, 4);
+            d = (double)(int32_t)BSON_UINT32_FROM_LE(i32);
+        } else if (type == 18) {
+            memcpy(&i64, data, 8);
+            d = (double)(int64_t)BSON_UINT64_FROM_LE(i64);
+        } else if (type == 2) {
+            memcpy(&length, data, 4);
+            length = BSON_UINT32_FROM_LE(length);
+            if (length < 1 || !_parse_double(data + 4, length - 1, &d)) {
+                return 0;
+            }
+        } else {
+            return 0;
+        }
+        memcpy(PyByteArray_AS_STRING(column->values) + row * 8, &d, 8);
+        return 0;
+    case 'q':
+        if (type == 16) {
+            memcpy(&i32, data, 4);
+            i64 = (int32_t)BSON_UINT32_FROM_LE(i32);
+        } else if (type == 18) {
+            memcpy(&i64, data, 8);
+            i64 = (int64_t)BSON_UINT64_FROM_LE(i64);
+        } else if (type == 1) {
+            memcpy(&d, data, 8);
+            d = BSON_DOUBLE_FROM_LE(d);
+            /* Only whole numbers that fit. */
+            if (!(d >= -9223372036854775808.0 && d < 9223372036854775808.0) ||
+                    d != (double)(int64_t)d) {
+                return 0;
+            }
+            i64 = (int64_t)d;
+        } else {
+            return 0;
+        }
+        memcpy(PyByteArray_AS_STRING(column->values) + row * 8, &i64, 8);
+        return 0;
+    case 'M':
+        if (type != 9) {
+            return 0;
+        }
+        memcpy(&i64, data, 8);
+        i64 = (int64_t)BSON_UINT64_FROM_LE(i64);
+        memcpy(PyByteArray_AS_STRING(column->values) + row * 8, &i64, 8);
+        return 0;
+    case 's':
+        {
+            PyObject* value;
+            if (type != 2 && type != 14) {
+                return 0;
+            }
+            memcpy(&length, data, 4);
+            length = BSON_UINT32_FROM_LE(length);
+            if (length < 1) {
+                return 0;
+            }
+            value = _column_string(column, data + 4, length - 1);
+            if (!value) {
+                return -1;
+            }
+            Py_INCREF(value);
+            /* Steals the reference and releases the None placeholder. */
+            if (PyList_SetItem(column->values, row, value) < 0) {
+                return -1;
+            }
+            return 0;
+        }
+    }
+    return 0;
+}
+
+static void _free_columns(column_t* columns, Py_ssize_t count) {
+    Py_ssize_t i;
+    for (i = 0; i < count; i++) {
+        Py_XDECREF(columns[i].values);
+        Py_XDECREF(columns[i].interned);
+    }
+    PyMem_Free(columns);
+}
+
+/*
+ * Decode concatenated BSON documents (a raw cursor batch) into one column per
+ * requested top-level field, without creating a dict per document.
+ *
+ * Arguments: the data, a tuple of field names and a bytes of column kinds.
+ * Returns (document count, list of columns): a bytearray of native float64 or
+ * int64 values for numeric kinds, a list for str columns.
+ */
+static PyObject* _cbson_decode_columns(PyObject* self, PyObject* args) {
+    PyObject* bson;
+    PyObject* names;
+    const char* kinds;
+    Py_ssize_t kinds_length;
+    Py_buffer view = {0};
+    const char* string;
+    Py_ssize_t total_size;
+    Py_ssize_t offset;
+    Py_ssize_t count = 0;
+    Py_ssize_t column_count;
+    Py_ssize_t row;
+    Py_ssize_t i;
+    column_t* columns = NULL;
+    PyObject* result = NULL;
+    PyObject* column_list = NULL;
+
+    if (!PyArg_ParseTuple(args, "OO!y#", &bson, &PyTuple_Type, &names,
+                          &kinds, &kinds_length)) {
+        return NULL;
+    }
+    column_count = PyTuple_GET_SIZE(names);
+    if (column_count != kinds_length) {
+        PyErr_SetString(PyExc_ValueError, "one column kind is required per field");
+        return NULL;
+    }
+    if (!_get_buffer(bson, &view)) {
+        return NULL;
+    }
+    string = (const char*)view.buf;
+    total_size = view.len;
+
+    /* First pass: validate the document lengths and count them. */
+    for (offset = 0; offset < total_size; count++) {
+        uint32_t size;
+        if (total_size - offset < BSON_MIN_SIZE) {
+            goto invalid;
+        }
+        memcpy(&size, string + offset, 4);
+        size = BSON_UINT32_FROM_LE(size);
+        if (size < BSON_MIN_SIZE || size > total_size - offset ||
+                string[offset + size - 1]) {
+            goto invalid;
+        }
+        offset += size;
+    }
+
+    columns = PyMem_Calloc(column_count ? column_count : 1, sizeof(column_t));
+    if (!columns) {
+        PyErr_NoMemory();
+        goto done;
+    }
+    for (i = 0; i < column_count; i++) {
+        column_t* column = &columns[i];
+        column->kind = kinds[i];
+        column->name = PyUnicode_AsUTF8AndSize(PyTuple_GET_ITEM(names, i),
+                                               &column->name_length);
+        if (!column->name) {
+            goto done;
+        }
+        if (column->kind == 's') {
+            column->values = PyList_New(count);
+            column->interned = PyDict_New();
+            if (!column->values || !column->interned) {
+                goto done;
+            }
+            for (row = 0; row < count; row++) {
+                Py_INCREF(Py_None);
+                PyList_SET_ITEM(column->values, row, Py_None);
+            }
+        } else if (column->kind == 'd' || column->kind == 'q' || column->kind == 'M') {
+            column->values = PyByteArray_FromStringAndSize(NULL, count * 8);
+            if (!column->values) {
+                goto done;
+            }
+            for (row = 0; row < count; row++) {
+                char* slot = PyByteArray_AS_STRING(column->values) + row * 8;
+                if (column->kind == 'd') {
+                    double missing = Py_NAN;
+                    memcpy(slot, &missing, 8);
+                } else {
+                    int64_t missing = COLUMN_MISSING_INT64;
+                    memcpy(slot, &missing, 8);
+                }
+            }
+        } else {
+            PyErr_Format(PyExc_ValueError, "unknown column kind '%c'", column->kind);
+            goto done;
+        }
+    }
+
+    /* Second pass: walk each document's elements once. */
+    offset = 0;
+    for (row = 0; row < count; row++) {
+        uint32_t size;
+        unsigned position = 4;
+        unsigned max;
+        const char* doc = string + offset;
+        memcpy(&size, doc, 4);
+        size = BSON_UINT32_FROM_LE(size);
+        max = size - 1;
+        while (position < max) {
+            unsigned char type = (unsigned char)doc[position];
+            const char* name = doc + position + 1;
+            const char* end = memchr(name, 0, max - position - 1);
+            size_t name_length;
+            unsigned value_position;
+            if (!end) {
+                goto invalid;
+            }
+            name_length = end - name;
+            value_position = position + 2 + (unsigned)name_length;
+            position = value_position;
+            if (_skip_value(doc, &position, type, max - value_position) < 0) {
+                goto done;
+            }
+            for (i = 0; i < column_count; i++) {
+                if ((size_t)columns[i].name_length == name_length &&
+                        !memcmp(columns[i].name, name, name_length)) {
+                    if (_fill_column(&columns[i], row, type, doc + value_position) < 0) {
+                        goto done;
+                    }
+                    break;
+                }
+            }
+        }
+        if (position != max) {
+            goto invalid;
+        }
+        offset += size;
+    }
+
+    column_list = PyList_New(column_count);
+    if (!column_list) {
+        goto done;
+    }
+    for (i = 0; i < column_count; i++) {
+        PyList_SET_ITEM(column_list, i, columns[i].values);
+        columns[i].values = NULL;
+    }
+    result = Py_BuildValue("nN", count, column_list);
+    goto done;
+
+invalid:
+    {
+        PyObject* InvalidBSON = _error("InvalidBSON");
+        if (InvalidBSON) {
+            PyErr_SetString(InvalidBSON, "invalid length or type code");
+            Py_DECREF(InvalidBSON);
+        }
+    }
+done:
+    if (columns) {
+        _free_columns(columns, column_count);
+    }
+    PyBuffer_Release(&view);
+    return result;
+}
+
 
 static PyObject* _cbson_array_of_documents_to_buffer(PyObject* self, PyObject* args) {
     uint32_t size;
@@ -3087,6 +3746,7 @@ static PyMethodDef _CBSONMethods[] = {
     {"_element_to_dict", _cbson_element_to_dict, METH_VARARGS,
      "Decode a single key, value pair."},
     {"_array_of_documents_to_buffer", _cbson_array_of_documents_to_buffer, METH_VARARGS, "Convert raw array of documents to a stream of BSON documents"},
+    {"_decode_columns", _cbson_decode_columns, METH_VARARGS, "Decode a raw batch of documents into per-field columns."},
     {"_test_long_long_to_str", _test_long_long_to_str, METH_VARARGS, "Test conversion of extreme and common Py_ssize_t values to str."},
     {NULL, NULL, 0, NULL}
 };
@@ -3133,6 +3793,7 @@ static int _cbson_traverse(PyObject *m, visitproc visit, void *arg) {
     Py_VISIT(state->_from_uuid_str);
     Py_VISIT(state->_as_uuid_str);
     Py_VISIT(state->_from_bid_str);
+    Py_VISIT(state->_field_selection_str);
     Py_VISIT(state->min_datetime);
     Py_VISIT(state->max_datetime);
     Py_VISIT(state->replace_args);
@@ -3181,6 +3842,7 @@ static int _cbson_clear(PyObject *m) {
     Py_CLEAR(state->_from_uuid_str);
     Py_CLEAR(state->_as_uuid_str);
     Py_CLEAR(state->_from_bid_str);
+    Py_CLEAR(state->_field_selection_str);
     Py_CLEAR(state->min_datetime);
     Py_CLEAR(state->max_datetime);
     Py_CLEAR(state->replace_args);
@@ -3216,6 +3878,11 @@ _cbson_exec(PyObject *m)
         (void *) buffer_write_int32_at_position;
     _cbson_API[_cbson_downcast_and_check_INDEX] = (void *) _downcast_and_check;
 
+    /* Lets bson fall back to Python for field selections on older builds. */
+    if (PyModule_AddIntConstant(m, "_FIELD_SELECTION", 1) < 0) {
+        INITERROR;
+    }
+
     c_api_object = PyCapsule_New((void *) _cbson_API, "_cbson._C_API", NULL);
     if (c_api_object == NULL)
         INITERROR;
@@ -223,6 +223,50 @@ class DatetimeConversion(int, enum.Enum):
     """
 
 
+def _parse_field_selection(fields: Any) -> Optional[dict[str, Any]]:
+    """Normalize a field selection to a trie of field names.
+
+    Each name maps to ``None`` (decode the whole value) or to a nested trie
+    for a sub-document. Accepts an iterable of names, where dotted paths
+    select inside sub-documents, or a mapping like ``{"a": 1, "b": {"c": 1}}``
+    (an already normalized trie is returned unchanged).
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, (str, bytes)) or not isinstance(fields, Iterable):
+        raise TypeError(
+            f"field_selection must be an iterable of field names or a mapping, not {type(fields)}"
+        )
+    if isinstance(fields, Mapping):
+        paths: list[Tuple[str, Any]] = list(fields.items())
+    else:
+        paths = [(path, 1) for path in fields]
+
+    trie: dict[str, Any] = {}
+    for path, sub in paths:
+        if not isinstance(path, str):
+            raise TypeError(f"field_selection names must be str, not {type(path)}")
+        if isinstance(sub, Mapping):
+            sub = _parse_field_selection(sub)
+        elif sub is None or sub:
+            sub = None
+        else:
+            raise ValueError(f"field_selection only supports inclusion, got {path!r}: {sub!r}")
+        *parents, leaf = path.split(".")
+        node = trie
+        for part in parents:
+            if part in node and node[part] is None:
+                # An ancestor is already selected whole.
+                break
+            node = node.setdefault(part, {})
+        else:
+            if sub is None or node.get(leaf, {}) is None:
+                node[leaf] = None
+            else:
+                node.setdefault(leaf, {}).update(sub)
+    return trie
+
+
 class _BaseCodecOptions(NamedTuple):
     document_class: Type[Mapping[str, Any]]
     tz_aware: bool
@@ -243,6 +287,7 @@ if TYPE_CHECKING:
         tzinfo: Optional[datetime.tzinfo]
         type_registry: TypeRegistry
         datetime_conversion: Optional[int]
+        field_selection: Optional[dict[str, Any]]
 
         def __new__(
             cls: Type[CodecOptions[_DocumentType]],
@@ -253,6 +298,7 @@ if TYPE_CHECKING:
             tzinfo: Optional[datetime.tzinfo] = ...,
             type_registry: Optional[TypeRegistry] = ...,
             datetime_conversion: Optional[int] = ...,
+            field_selection: Optional[Iterable[str] | Mapping[str, Any]] = ...,
         ) -> CodecOptions[_DocumentType]:
             ...
 
@@ -285,6 +331,10 @@ else:
     class CodecOptions(_BaseCodecOptions):
         """Encapsulates options used encoding and / or decoding BSON."""
 
+        # Kept outside the tuple so the C extensions, which unpack the tuple
+        # positionally, see the same layout whether or not they support it.
+        field_selection: Optional[dict[str, Any]] = None
+
         def __init__(self, *args, **kwargs):
             """Encapsulates options used encoding and / or decoding BSON.
 
@@ -352,6 +402,13 @@ else:
                 return DatetimeMS objects when the underlying datetime is
                 out-of-range and 'datetime_clamp' to clamp to the minimum and
                 maximum possible datetimes. Defaults to 'datetime'.
+            :param field_selection: Only decode these top-level fields of each
+                document; the others are skipped by length without building
+                Python objects. An iterable of field names, where dotted names
+                such as ``"meta.source"`` select inside sub-documents, or a
+                mapping such as ``{"status": 1, "meta": {"source": 1}}``.
+                Applies to the documents a query returns, not to the command
+                reply around them. Defaults to ``None`` (decode every field).
 
             .. versionchanged:: 4.0
                The default for `uuid_representation` was changed from
@@ -378,6 +435,7 @@ else:
             tzinfo: Optional[datetime.tzinfo] = None,
             type_registry: Optional[TypeRegistry] = None,
             datetime_conversion: Optional[DatetimeConversion] = DatetimeConversion.DATETIME,
+            field_selection: Optional[Iterable[str] | Mapping[str, Any]] = None,
         ) -> CodecOptions:
             doc_class = document_class or dict
             # issubclass can raise TypeError for generic aliases like SON[str, Any].
@@ -419,7 +477,9 @@ else:
                     f"type_registry must be an instance of TypeRegistry, not {type(type_registry)}"
                 )
 
-            return tuple.__new__(
+            field_selection = _parse_field_selection(field_selection)
+
+            options = tuple.__new__(
                 cls,
                 (
                     doc_class,
@@ -431,6 +491,9 @@ else:
                     datetime_conversion,
                 ),
             )
+            if field_selection is not None:
+                options.field_selection = field_selection
+            return options
 
         def _arguments_repr(self) -> str:
             """Representation of the arguments used to create this object."""
@@ -442,7 +505,7 @@ else:
                 self.uuid_representation, self.uuid_representation
             )
 
-            return (
+            arguments = (
                 "document_class={}, tz_aware={!r}, uuid_representation={}, "
                 "unicode_decode_error_handler={!r}, tzinfo={!r}, "
                 "type_registry={!r}, datetime_conversion={!s}".format(
@@ -455,6 +518,9 @@ else:
                     self.datetime_conversion,
                 )
             )
+            if self.field_selection is not None:
+                arguments += f", field_selection={self.field_selection!r}"
+            return arguments
 
         def _options_dict(self) -> dict[str, Any]:
             """Dictionary of the arguments used to create this object."""
@@ -467,11 +533,24 @@ else:
                 "tzinfo": self.tzinfo,
                 "type_registry": self.type_registry,
                 "datetime_conversion": self.datetime_conversion,
+                "field_selection": self.field_selection,
             }
 
         def __repr__(self) -> str:
             return f"{self.__class__.__name__}({self._arguments_repr()})"
 
+        def __eq__(self, other: Any) -> bool:
+            if not isinstance(other, tuple):
+                return NotImplemented
+            return tuple.__eq__(self, other) and self.field_selection == getattr(
+                other, "field_selection", None
+            )
+
+        def __ne__(self, other: Any) -> bool:
+            if not isinstance(other, tuple):
+                return NotImplemented
+            return not self == other
+
         def with_options(self, **kwargs: Any) -> CodecOptions:
             """Make a copy of this CodecOptions, overriding some options::
 
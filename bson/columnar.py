@@ -0,0 +1,200 @@
+"""Decode raw BSON batches into per-field columns instead of documents.
+
+Analytics over many documents usually needs a few fields as flat arrays. With
+:func:`decode_columns` a raw batch from
+:meth:`~pymongo.collection.Collection.find_raw_batches` or
+:meth:`~pymongo.collection.Collection.aggregate_raw_batches` is walked once,
+straight into preallocated columns, without a dict per document::
+
+  >>> from bson.columnar import DATETIME_MS, FLOAT64, STRING, decode_columns
+  >>> schema = {"amount": FLOAT64, "createdAt": DATETIME_MS, "util": STRING}
+  >>> total = 0.0
+  >>> for batch in coll.aggregate_raw_batches([{"$match": {"status": "fulfilled"}}]):
+  ...     columns = decode_columns(batch, schema)
+  ...     total += sum(columns["amount"])
+
+Only top-level fields are supported. Values of a type a column cannot hold,
+and fields missing from a document, are stored as NaN in float64 columns,
+:data:`MISSING_INT64` in int64 and datetime columns and ``None`` in str
+columns.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Mapping, Tuple, Union
+
+from bson import (
+    _UNPACK_FLOAT_FROM,
+    _UNPACK_INT_FROM,
+    _UNPACK_LONG_FROM,
+    _USE_C,
+    _skip_value,
+    get_data_and_view,
+)
+from bson.errors import InvalidBSON
+
+if _USE_C:
+    from bson import _cbson  # type: ignore[attr-defined]
+
+    _c_decode_columns = getattr(_cbson, "_decode_columns", None)
+else:
+    _c_decode_columns = None
+
+FLOAT64 = "float64"
+"""Doubles, int32 and int64 values and numeric strings such as ``"1500.00"``."""
+
+INT64 = "int64"
+"""int32 and int64 values, and doubles that are whole numbers."""
+
+DATETIME_MS = "datetime_ms"
+"""BSON datetimes as int64 milliseconds since the Unix epoch."""
+
+STRING = "str"
+"""Strings; repeated values share one ``str`` object."""
+
+MISSING_INT64 = -(2**63)
+"""Stored in :data:`INT64` and :data:`DATETIME_MS` columns for missing values."""
+
+_COLUMN_KINDS = {FLOAT64: "d", INT64: "q", DATETIME_MS: "M", STRING: "s"}
+
+
+def _parse_schema(schema: Mapping[str, str]) -> Tuple[Tuple[str, ...], bytes]:
+    if not isinstance(schema, Mapping) or not schema:
+        raise ValueError("schema must be a non-empty mapping of field name to column type")
+    names = tuple(schema)
+    kinds = []
+    for name in names:
+        if not isinstance(name, str):
+            raise TypeError(f"schema field names must be str, not {type(name)}")
+        kind = _COLUMN_KINDS.get(schema[name])
+        if kind is None:
+            raise ValueError(
+                f"unknown column type {schema[name]!r} for {name!r}, expected one of {sorted(_COLUMN_KINDS)}"
+            )
+        kinds.append(kind)
+    return names, "".join(kinds).encode()
+
+
+def _numeric_string(data: Any, start: int, end: int) -> float:
+    # Same rules as the C decoder: ASCII only, surrounding ASCII whitespace.
+    text = data[start:end].strip(b" \t\n\r\x0b\x0c")
+    if not text or not text.isascii() or b"_" in text or len(text) >= 64:
+        return float("nan")
+    try:
+        return float(text)
+    except ValueError:
+        return float("nan")
+
+
+def _decode_columns(
+    data: Any, names: Tuple[str, ...], kinds: bytes
+) -> Tuple[int, list[Union[array[Any], list[Any]]]]:
+    """Pure-Python equivalent of _cbson._decode_columns."""
+    data, _ = get_data_and_view(data)
+    total = len(data)
+    offsets = []
+    position = 0
+    while position < total:
+        if total - position < 5:
+            raise InvalidBSON("invalid length or type code")
+        size = _UNPACK_INT_FROM(data, position)[0]
+        if size < 5 or size > total - position or data[position + size - 1] != 0:
+            raise InvalidBSON("invalid length or type code")
+        offsets.append(position)
+        position += size
+    count = len(offsets)
+
+    columns: list[Any] = []
+    by_name = {}
+    for index, (name, kind) in enumerate(zip(names, kinds.decode())):
+        if kind == "s":
+            columns.append([None] * count)
+        elif kind == "d":
+            columns.append(array("d", [float("nan")]) * count)
+        else:
+            columns.append(array("q", [MISSING_INT64]) * count)
+        by_name[name.encode()] = (index, kind)
+    interned: dict[bytes, str] = {}
+
+    index_of = data.index
+    for row, start in enumerate(offsets):
+        obj_end = start + _UNPACK_INT_FROM(data, start)[0] - 1
+        position = start + 4
+        while position < obj_end:
+            element_type = data[position]
+            name_end = index_of(b"\x00", position + 1, obj_end)
+            value_position = name_end + 1
+            next_position = _skip_value(data, value_position, element_type, obj_end)
+            if next_position is None:
+                raise InvalidBSON("invalid length or type code")
+            column = by_name.get(data[position + 1 : name_end])
+            position = next_position
+            if column is None:
+                continue
+            index, kind = column
+            if kind == "d":
+                if element_type == 1:
+                    columns[index][row] = _UNPACK_FLOAT_FROM(data, value_position)[0]
+                elif element_type == 16:
+                    columns[index][row] = _UNPACK_INT_FROM(data, value_position)[0]
+                elif element_type == 18:
+                    columns[index][row] = _UNPACK_LONG_FROM(data, value_position)[0]
+                elif element_type == 2:
+                    columns[index][row] = _numeric_string(
+                        data, value_position + 4, next_position - 1
+                    )
+            elif kind == "q":
+                if element_type == 16:
+                    columns[index][row] = _UNPACK_INT_FROM(data, value_position)[0]
+                elif element_type == 18:
+                    columns[index][row] = _UNPACK_LONG_FROM(data, value_position)[0]
+                elif element_type == 1:
+                    value = _UNPACK_FLOAT_FROM(data, value_position)[0]
+                    if value.is_integer() and -(2**63) <= value < 2**63:
+                        columns[index][row] = int(value)
+            elif kind == "M":
+                if element_type == 9:
+                    columns[index][row] = _UNPACK_LONG_FROM(data, value_position)[0]
+            elif element_type in (2, 14):
+                raw = data[value_position + 4 : next_position - 1]
+                text = interned.get(raw)
+                if text is None:
+                    text = interned[raw] = raw.decode()
+                columns[index][row] = text
+        if position != obj_end:
+            raise InvalidBSON("invalid length or type code")
+    return count, columns
+
+
+def decode_columns(data: Any, schema: Mapping[str, str]) -> dict[str, Any]:
+    """Decode concatenated BSON documents (a raw batch) into one column per field.
+
+    :param data: bytes-like BSON data, such as one batch of a raw batch cursor.
+    :param schema: Mapping of top-level field name to column type, one of
+        :data:`FLOAT64`, :data:`INT64`, :data:`DATETIME_MS` or :data:`STRING`.
+
+    :return: A dict of field name to column, each with one entry per
+        document. Numeric columns are ``memoryview`` objects of format
+        ``'d'`` or ``'q'``, so ``sum()`` and indexing work directly and
+        ``numpy.frombuffer`` can wrap them without a copy. str columns are
+        lists.
+    """
+    names, kinds = _parse_schema(schema)
+    if _c_decode_columns is not None:
+        _, values = _c_decode_columns(data, names, kinds)
+    else:
+        try:
+            _, values = _decode_columns(data, names, kinds)
+        except (InvalidBSON, UnicodeDecodeError):
+            raise
+        except Exception as exc:
+            raise InvalidBSON(str(exc)) from None
+
+    columns = {}
+    for name, kind, value in zip(names, kinds.decode(), values):
+        if kind != "s":
+            value = memoryview(value)
+            if value.format == "B":
+                value = value.cast("d" if kind == "d" else "q")
+        columns[name] = value
+    return columns
@@ -0,0 +1,213 @@
+"""Decode large BSON files, such as mongodump output, through a memory map.
+
+:func:`decode_mmap_iter` is a drop-in replacement for
+:func:`bson.decode_file_iter` for files on disk::
+
+  >>> from bson.file_reader import decode_mmap_iter
+  >>> with open("dump/power_alerts/power_transaction_items.bson", "rb") as f:
+  ...     for doc in decode_mmap_iter(f, processes=4):
+  ...         replay(doc)
+
+Instead of two ``read`` calls per document, the file is mapped once and
+document boundaries are found from the length prefixes alone. They are
+recorded as an index of chunk offsets, each chunk holding whole documents.
+Each chunk is decoded with one :func:`bson.decode_all` call, optionally in a
+process pool, and documents are yielded in file order.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+from array import array
+from collections import deque
+from typing import IO, Any, BinaryIO, Iterator, Optional, Union
+
+from bson import (
+    _UNPACK_INT_FROM,
+    DEFAULT_CODEC_OPTIONS,
+    _bson_to_dict,
+    decode_all,
+    decode_file_iter,
+)
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidBSON
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+"""Target size in bytes of each chunk decoded with one decode_all call.
+
+Small chunks keep each batch of decoded documents in the CPU caches.
+"""
+
+POOL_CHUNK_SIZE = 256 * 1024
+"""Default chunk size with ``processes``, where every chunk is a pool task."""
+
+# Chunks decoded ahead of the consumer per worker process.
+_CHUNKS_IN_FLIGHT_PER_PROCESS = 2
+
+# The file mapped by each pool worker, opened once by _open_worker_map.
+_worker_map: Optional[mmap.mmap] = None
+
+
+def index_chunks(
+    buffer: Any, start: int = 0, end: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> array[int]:
+    """Scan concatenated BSON documents by length prefix into chunk offsets.
+
+    :param buffer: A bytes-like object or mmap holding the documents.
+    :param start: Offset of the first document.
+    :param end: Offset just past the last document. Defaults to ``len(buffer)``.
+    :param chunk_size: Target chunk size in bytes. A chunk ends at the first
+        document boundary at or past this size.
+
+    :return: An ``array('q')`` of offsets, from `start` to `end`. Chunk ``i``
+        holds the documents in ``buffer[offsets[i]:offsets[i + 1]]``. If a
+        length prefix is invalid, the final chunk starts at that document, so
+        decoding it raises the same error :func:`bson.decode_file_iter` would.
+    """
+    if end is None:
+        end = len(buffer)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    offsets = array("q", [start])
+    position = start
+    while position < end:
+        if end - position < 5:
+            break
+        size = _UNPACK_INT_FROM(buffer, position)[0]
+        if size < 5 or size > end - position:
+            break
+        position += size
+        if position - offsets[-1] >= chunk_size:
+            offsets.append(position)
+    if position < end and position != offsets[-1]:
+        # Keep the documents before the bad prefix in their own chunk.
+        offsets.append(position)
+    if offsets[-1] != end:
+        offsets.append(end)
+    return offsets
+
+
+def _decode_documents(data: bytes, codec_options: CodecOptions[Any]) -> Iterator[Any]:
+    """Decode one document at a time, as decode_file_iter does."""
+    position = 0
+    while position < len(data):
+        if len(data) - position < 4:
+            raise InvalidBSON("cut off in middle of objsize")
+        size = max(4, _UNPACK_INT_FROM(data, position)[0])
+        yield _bson_to_dict(data[position : position + size], codec_options)
+        position += size
+
+
+def _decode_chunk(data: bytes, codec_options: CodecOptions[Any]) -> Iterator[Any]:
+    try:
+        docs = decode_all(data, codec_options)
+    except Exception:
+        # Yield every document before the bad one, then raise its error.
+        yield from _decode_documents(data, codec_options)
+        return
+    yield from docs
+
+
+def _open_worker_map(path: str) -> None:
+    global _worker_map
+    with open(path, "rb") as file_obj:
+        _worker_map = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _decode_mapped_chunk(start: int, end: int, codec_options: CodecOptions[Any]) -> list[Any]:
+    assert _worker_map is not None
+    return decode_all(_worker_map[start:end], codec_options)
+
+
+def _file_map(file_obj: Any) -> Optional[mmap.mmap]:
+    try:
+        fileno = file_obj.fileno()
+        if os.fstat(fileno).st_size == 0:
+            return None
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        # BytesIO, sockets, pipes and other objects that cannot be mapped.
+        return None
+
+
+def decode_mmap_iter(
+    file_obj: Union[BinaryIO, IO[bytes]],
+    codec_options: Optional[CodecOptions[Any]] = None,
+    processes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[Any]:
+    """Decode BSON data from a file to multiple documents as a generator.
+
+    Yields the same documents as :func:`bson.decode_file_iter`, starting at
+    the file's current position. When the generator is exhausted, the file
+    is positioned after the last document. Objects that cannot be memory
+    mapped, such as :class:`io.BytesIO`, are read with
+    :func:`bson.decode_file_iter` instead.
+
+    :param file_obj: A file object containing BSON data.
+    :param codec_options: An instance of
+        :class:`~bson.codec_options.CodecOptions`. It must be picklable when
+        `processes` is used.
+    :param processes: Decode chunks in a pool of this many processes. The
+        default decodes in the calling process. Decoded documents are
+        pickled back to the caller, so a pool only pays off when decoding
+        costs more than that, e.g. without the C extension.
+    :param chunk_size: Target size in bytes of each chunk of documents.
+        Defaults to :data:`DEFAULT_CHUNK_SIZE`, or :data:`POOL_CHUNK_SIZE`
+        with `processes`.
+    """
+    opts = codec_options or DEFAULT_CODEC_OPTIONS
+    use_pool = bool(processes and processes > 1)
+    if chunk_size is None:
+        chunk_size = POOL_CHUNK_SIZE if use_pool else DEFAULT_CHUNK_SIZE
+    mapped = _file_map(file_obj)
+    if mapped is None:
+        yield from decode_file_iter(file_obj, opts)
+        return
+    try:
+        start = file_obj.tell()
+        end = len(mapped)
+        offsets = index_chunks(mapped, start, end, chunk_size)
+        path = getattr(file_obj, "name", None)
+        if use_pool and isinstance(path, str) and len(offsets) > 2:
+            yield from _decode_in_pool(mapped, path, offsets, opts, processes)  # type:ignore[arg-type]
+        else:
+            for index in range(len(offsets) - 1):
+                yield from _decode_chunk(mapped[offsets[index] : offsets[index + 1]], opts)
+        file_obj.seek(end)
+    finally:
+        mapped.close()
+
+
+def _decode_in_pool(
+    mapped: mmap.mmap, path: str, offsets: array[int], opts: CodecOptions[Any], processes: int
+) -> Iterator[Any]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending: deque = deque()
+    with ProcessPoolExecutor(processes, initializer=_open_worker_map, initargs=(path,)) as pool:
+        try:
+            for index in range(len(offsets) - 1):
+                future = pool.submit(_decode_mapped_chunk, offsets[index], offsets[index + 1], opts)
+                pending.append((index, future))
+                if len(pending) < processes * _CHUNKS_IN_FLIGHT_PER_PROCESS:
+                    continue
+                yield from _pool_result(mapped, offsets, opts, *pending.popleft())
+            while pending:
+                yield from _pool_result(mapped, offsets, opts, *pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _pool_result(
+    mapped: mmap.mmap, offsets: array[int], opts: CodecOptions[Any], index: int, future: Any
+) -> Iterator[Any]:
+    try:
+        docs = future.result()
+    except Exception:
+        # Decode the failed chunk here, which yields the documents before a
+        # bad one and raises the same error decode_file_iter would.
+        yield from _decode_chunk(mapped[offsets[index] : offsets[index + 1]], opts)
+        return
+    yield from docs
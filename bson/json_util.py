@@ -16,7 +16,8 @@
 
 This module provides two helper methods `dumps` and `loads` that wrap the
 native :mod:`json` methods and provide explicit BSON conversion to and from
-JSON. :class:`~bson.json_util.JSONOptions` provides a way to control how JSON
+JSON, and :func:`dump_documents`, which streams documents to a file object as
+newline-delimited JSON. :class:`~bson.json_util.JSONOptions` provides a way to control how JSON
 is emitted and parsed, with the default being the Relaxed Extended JSON format.
 :mod:`~bson.json_util` can also generate Canonical or legacy `Extended JSON`_
 when :const:`CANONICAL_JSON_OPTIONS` or :const:`LEGACY_JSON_OPTIONS` is
@@ -142,6 +143,9 @@ from bson.son import RE_TYPE
 from bson.timestamp import Timestamp
 from bson.tz_util import utc
 
+_ISO_SECONDS = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d", re.ASCII)
+_DUMP_CHUNK_SIZE = 1000
+
 _RE_OPT_TABLE = {
     "i": re.I,
     "l": re.L,
@@ -507,6 +511,44 @@ def loads(s: Union[str, bytes, bytearray], *args: Any, **kwargs: Any) -> Any:
     return json.loads(s, *args, **kwargs)
 
 
+def dump_documents(
+    documents: Any, fp: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS, **kwargs: Any
+) -> int:
+    """Write documents to a text file object as newline-delimited Extended JSON.
+
+    Each document is converted and encoded on its own and the lines are
+    written in chunks, so a cursor can be exported without holding all of
+    its results in memory. The output is the same as one :func:`dumps` call
+    per document, one per line.
+
+    :param documents: An iterable of documents, such as a
+        :class:`~pymongo.cursor.Cursor`.
+    :param fp: A file object opened for writing text.
+    :param json_options: A :class:`JSONOptions` instance used to modify the
+        encoding of MongoDB Extended JSON types. Defaults to
+        :const:`DEFAULT_JSON_OPTIONS`.
+    :param kwargs: Passed to :class:`json.JSONEncoder`, e.g. ``sort_keys``.
+        ``indent`` is not supported.
+
+    :return: The number of documents written.
+    """
+    if kwargs.get("indent") is not None:
+        raise ValueError("indent is not supported for newline-delimited output")
+    encode = json.JSONEncoder(**kwargs).encode
+    lines = []
+    count = 0
+    for document in documents:
+        lines.append(encode(_json_convert(document, json_options)))
+        if len(lines) == _DUMP_CHUNK_SIZE:
+            fp.write("\n".join(lines) + "\n")
+            count += len(lines)
+            lines = []
+    if lines:
+        fp.write("\n".join(lines) + "\n")
+        count += len(lines)
+    return count
+
+
 def _json_convert(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
     """Recursive helper method that converts BSON types so they can be
     converted into json.
@@ -524,20 +566,29 @@ def _json_convert(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) ->
 def object_pairs_hook(
     pairs: Sequence[Tuple[str, Any]], json_options: JSONOptions = DEFAULT_JSON_OPTIONS
 ) -> Any:
-    return object_hook(json_options.document_class(pairs), json_options)  # type:ignore[call-arg]
-
-
-def object_hook(dct: Mapping[str, Any], json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
+    # Classify the keys while they are still a list, before building the
+    # document, so plain documents cost one pass.
     match = None
-    for k in dct:
+    for k, _ in pairs:
         if k in _PARSERS_SET:
             match = k
             break
+    dct = json_options.document_class(pairs)  # type:ignore[call-arg]
     if match:
         return _PARSERS[match](dct, json_options)
     return dct
 
 
+def object_hook(dct: Mapping[str, Any], json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
+    # Most documents have no type wrapper keys; isdisjoint checks in C.
+    if _PARSERS_SET.isdisjoint(dct):
+        return dct
+    for k in dct:
+        if k in _PARSERS_SET:
+            return _PARSERS[k](dct, json_options)
+    return dct
+
+
 def _parse_legacy_regex(doc: Any, dummy0: Any) -> Any:
     pattern = doc["$regex"]
     # Check if this is the $regex query operator.
@@ -647,9 +698,13 @@ def _parse_canonical_datetime(
             microsecond = int(float(dt[dot_index:]) * 1000000)
             dt = dt[:dot_index]
 
-        aware = datetime.datetime.strptime(dt, "%Y-%m-%dT%H:%M:%S").replace(
-            microsecond=microsecond, tzinfo=utc
-        )
+        # fromisoformat is much cheaper than strptime for the exact format
+        # dumps emits; anything looser still goes through strptime.
+        if _ISO_SECONDS.fullmatch(dt):
+            aware = datetime.datetime.fromisoformat(dt)
+        else:
+            aware = datetime.datetime.strptime(dt, "%Y-%m-%dT%H:%M:%S")
+        aware = aware.replace(microsecond=microsecond, tzinfo=utc)
 
         if offset and offset != "Z":
             if len(offset) == 6:
@@ -32,6 +32,7 @@ _MAX_COUNTER_VALUE = 0xFFFFFF
 _PACK_INT = struct.Struct(">I").pack
 _PACK_INT_RANDOM = struct.Struct(">I5s").pack
 _UNPACK_INT = struct.Struct(">I").unpack
+_MAX_TIMESTAMP = 0xFFFFFFFF
 
 
 def _raise_invalid_id(oid: str) -> NoReturn:
@@ -137,6 +138,70 @@ class ObjectId:
         )
         return cls(oid)
 
+    @classmethod
+    def range_filter(
+        cls: Type[ObjectId],
+        start: datetime.datetime,
+        end: datetime.datetime,
+        inclusive_end: bool = True,
+    ) -> dict[str, ObjectId]:
+        """Query operators matching ObjectIds generated within a time window.
+
+        ObjectIds only store whole seconds, so the bounds are the tightest
+        ones covering every ObjectId generated from `start` to `end`: they
+        may also match ObjectIds from the same second just before `start` or
+        just after `end`. Combine them with a filter on the datetime field
+        for exact results:
+
+        >>> window = {"$gte": start, "$lte": end}
+        >>> result = collection.find(
+        ...     {"_id": ObjectId.range_filter(start, end), "createdAt": window}
+        ... )
+
+        Naive datetimes are treated as UTC, as in :meth:`from_datetime`.
+
+        :param start: The first generation time to match.
+        :param end: The last generation time to match.
+        :param inclusive_end: Whether ObjectIds generated exactly at `end`
+            match.
+        """
+        end_millis = _datetime_to_millis(end)
+        if inclusive_end:
+            upper = end_millis // 1000 + 1
+        else:
+            upper = -(-end_millis // 1000)
+        if upper > _MAX_TIMESTAMP:
+            return {"$gte": cls.from_datetime(start), "$lte": cls(b"\xff" * 12)}
+        return {"$gte": cls.from_datetime(start), "$lt": cls(_PACK_INT(upper) + b"\x00" * 8)}
+
+    @classmethod
+    def generate_batch(cls: Type[ObjectId], count: int) -> list[ObjectId]:
+        """Generate `count` new ObjectIds at once, e.g. for a bulk insert.
+
+        The ObjectIds are the same as `count` calls to ``ObjectId()`` in the
+        same second, but the counter lock is taken once for the whole batch.
+
+        :param count: The number of ObjectIds, at most 16,777,216 (the
+            counter's range, beyond which ObjectIds would repeat).
+        """
+        if not 0 <= count <= _MAX_COUNTER_VALUE + 1:
+            raise ValueError(f"count must be between 0 and {_MAX_COUNTER_VALUE + 1}")
+        with ObjectId._inc_lock:
+            first = ObjectId._inc
+            ObjectId._inc = (first + count) % (_MAX_COUNTER_VALUE + 1)
+
+        prefix = _PACK_INT_RANDOM(int(time.time()), ObjectId._random())
+        counters = struct.pack(
+            ">%dI" % count, *[(first + i) & _MAX_COUNTER_VALUE for i in range(count)]
+        )
+        new = object.__new__
+        oids = []
+        for offset in range(1, 4 * count, 4):
+            oid = new(cls)
+            oid.__id = prefix + counters[offset : offset + 3]
+            oids.append(oid)
+        return oids
+
     @classmethod
     def is_valid(cls: Type[ObjectId], oid: Any) -> bool:
         """Checks if a `oid` string is valid or not.
@@ -0,0 +1,116 @@
+import os
+import resource
+import time
+
+import bson
+
+
+# Every raw-document path only needs these; callers may add a few more
+TRANSACTION_FIELDS = ('createdAt', 'amount', 'util', 'status')
+
+INITIAL_BATCH_SIZE = 1000
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 20000
+
+# Share of the Lambda's free memory one decoded batch may occupy, and how much
+# larger a decoded Python dict is than its BSON bytes.
+CURSOR_MEMORY_FRACTION = float(os.environ.get('CURSOR_MEMORY_FRACTION', '0.05'))
+DECODED_SIZE_FACTOR = 4
+DEFAULT_MEMORY_MB = 512
+
+
+class CursorStats:
+    """Throughput counters for one or more streamed cursors"""
+
+    def __init__(self):
+        self.docs = 0
+        self.bytes = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.batch_sizes = []
+
+    def record(self, docs, size, seconds):
+        self.docs += docs
+        self.bytes += size
+        self.batches += 1
+        self.seconds += seconds
+
+    @property
+    def docs_per_second(self):
+        return self.docs / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'docs': self.docs,
+            'bytes': self.bytes,
+            'batches': self.batches,
+            'seconds': round(self.seconds, 3),
+            'docs_per_second': round(self.docs_per_second, 1),
+            'bytes_per_second': round(self.bytes_per_second, 1),
+            'batch_sizes': self.batch_sizes
+        }
+
+
+def available_memory_bytes():
+    """Lambda memory not yet used by this process (peak RSS, so it errs on the low side)"""
+    limit_mb = int(os.environ.get('AWS_LAMBDA_FUNCTION_MEMORY_SIZE', str(DEFAULT_MEMORY_MB)))
+    # ru_maxrss is in kilobytes on Linux
+    used_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return max(0, limit_mb * 2**20 - used_bytes)
+
+
+def adaptive_batch_size(average_doc_bytes, free_bytes=None, max_batch_size=MAX_BATCH_SIZE):
+    """Documents per batch so a decoded batch stays within its share of free memory"""
+
+    if free_bytes is None:
+        free_bytes = available_memory_bytes()
+    budget = free_bytes * CURSOR_MEMORY_FRACTION
+    size = int(budget / max(1.0, average_doc_bytes * DECODED_SIZE_FACTOR))
+    return max(1, min(max(size, MIN_BATCH_SIZE), max_batch_size))
+
+
+def stream_transactions(collection, match, extra_fields=(), stats=None, batch_size=INITIAL_BATCH_SIZE, max_batch_size=MAX_BATCH_SIZE):
+    """Yield projected transactions matching ``match`` as lists, one list per server batch
+
+    Batches arrive as raw BSON so their exact size is known before decoding;
+    the batch size for the next getMore is then re-derived from the average
+    document size and the memory left in the Lambda.
+    """
+
+    stats = stats if stats is not None else CursorStats()
+    projection = {field: 1 for field in TRANSACTION_FIELDS + tuple(extra_fields)}
+    batch_size = min(batch_size, max_batch_size)
+    stats.batch_sizes.append(batch_size)
+
+    fetch_started = time.monotonic()
+    cursor = collection.aggregate_raw_batches(
+        [{'$match': match}, {'$project': projection}],
+        batchSize=batch_size
+    )
+    raw_batches = iter(cursor)
+    try:
+        while True:
+            raw_batch = next(raw_batches, None)
+            if raw_batch is None:
+                break
+            docs = bson.decode_all(raw_batch, collection.codec_options)
+            stats.record(len(docs), len(raw_batch), time.monotonic() - fetch_started)
+
+            if docs:
+                next_batch_size = adaptive_batch_size(len(raw_batch) / len(docs), max_batch_size=max_batch_size)
+                if next_batch_size != batch_size:
+                    batch_size = next_batch_size
+                    cursor.batch_size(batch_size)
+                    stats.batch_sizes.append(batch_size)
+                yield docs
+            fetch_started = time.monotonic()
+    finally:
+        cursor.close()
+        print(
+            f"🚚 Streamed {stats.docs:,} docs ({stats.bytes:,} bytes) in {stats.batches} batches: "
+            f"{stats.docs_per_second:,.0f} docs/s, {stats.bytes_per_second / 2**20:,.2f} MB/s"
+        )
@@ -0,0 +1,99 @@
+import os
+import time
+from contextlib import contextmanager
+
+import pymongo
+
+
+# Kept back from every budget so the handler can still report (or send the
+# error alert) before Lambda kills the invocation.
+SAFETY_MARGIN_SECONDS = float(os.environ.get('DEADLINE_SAFETY_MARGIN_SECONDS', '2'))
+
+# Used when there is no Lambda context, e.g. local runs and tests.
+DEFAULT_INVOCATION_SECONDS = float(os.environ.get('DEFAULT_INVOCATION_SECONDS', '300'))
+
+# botocore retries after the first attempt, when the budget leaves room for them
+BOTO_RETRIES = 2
+# Below this per-attempt timeout a call gets one attempt instead of retries
+BOTO_MIN_TIMEOUT_SECONDS = 1.0
+
+invocation_deadline = None
+# Set by phase_budget while a phase with a hard total limit runs
+phase_deadline = None
+
+
+def start_invocation_budget(context=None):
+    global invocation_deadline
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        available_seconds = context.get_remaining_time_in_millis() / 1000
+    else:
+        available_seconds = DEFAULT_INVOCATION_SECONDS
+
+    invocation_deadline = time.monotonic() + available_seconds - SAFETY_MARGIN_SECONDS
+    print(f"⏳ Invocation budget: {available_seconds - SAFETY_MARGIN_SECONDS:.1f}s")
+    return invocation_deadline
+
+
+@contextmanager
+def phase_budget(seconds):
+    """Bound all the work inside the block by ``seconds`` in total, e.g. Lambda's 10s init phase
+
+    Budgets inside ignore ``reserve``, since nothing else runs in the phase,
+    and boto calls get a single attempt so they cannot overrun it.
+    """
+    global phase_deadline
+    phase_deadline = time.monotonic() + seconds
+    try:
+        yield
+    finally:
+        phase_deadline = None
+
+
+def remaining_seconds():
+    if invocation_deadline is None:
+        return DEFAULT_INVOCATION_SECONDS - SAFETY_MARGIN_SECONDS
+    return max(0.0, invocation_deadline - time.monotonic())
+
+
+def stage_budget(cap, reserve=0.0):
+    """Seconds a stage may use: at most ``cap`` while leaving ``reserve`` for the stages after it"""
+    if phase_deadline is not None:
+        return max(0.0, min(cap, phase_deadline - time.monotonic()))
+    return max(0.0, min(cap, remaining_seconds() - reserve))
+
+
+def mongo_budget(cap, reserve=0.0):
+    """CSOT block bounding every MongoDB operation inside it (server selection, connect, cursor batches)"""
+    # pymongo treats a timeout of 0 as "no timeout", so an exhausted budget must stay positive
+    return pymongo.timeout(max(0.001, stage_budget(cap, reserve)))
+
+
+def http_timeout(cap, reserve=0.0, minimum=1.0):
+    """requests timeout for an HTTP call; never below ``minimum`` so a near-expired budget still tries once"""
+    return max(minimum, stage_budget(cap, reserve))
+
+
+def boto_config(cap, reserve=0.0, calls=1):
+    """botocore config whose connect/read timeouts fit the remaining budget
+
+    The client's ``calls`` requests, every attempt's connect and read
+    included, fit in the stage budget. Inside a phase_budget block they get no
+    retries; otherwise BOTO_RETRIES when the split leaves each attempt at
+    least BOTO_MIN_TIMEOUT_SECONDS, and a single attempt when it does not.
+    """
+    from botocore.config import Config
+
+    if phase_deadline is not None:
+        seconds = stage_budget(cap) / calls / 2
+        if seconds <= 0:
+            raise TimeoutError("Phase budget exhausted")
+        return Config(connect_timeout=seconds, read_timeout=seconds, retries={'max_attempts': 0})
+
+    budget = stage_budget(cap, reserve)
+    seconds = budget / calls / (1 + BOTO_RETRIES) / 2
+    if seconds >= BOTO_MIN_TIMEOUT_SECONDS:
+        return Config(connect_timeout=seconds, read_timeout=seconds, retries={'max_attempts': BOTO_RETRIES})
+    # A near-expired budget still tries once
+    seconds = max(BOTO_MIN_TIMEOUT_SECONDS, budget / calls / 2)
+    return Config(connect_timeout=seconds, read_timeout=seconds, retries={'max_attempts': 0})
@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+
+import dns.asyncresolver
+import dns.resolver
+
+
+DNS_CACHE_MAX_SIZE = int(os.environ.get('DNS_CACHE_MAX_SIZE', '512'))
+# NXDOMAIN/NoAnswer lifetime cap; the zone's SOA minimum can be hours, and a
+# record that appears later (e.g. a new shard) should not stay hidden that long.
+# 0 disables negative caching.
+DNS_NEGATIVE_TTL_SECONDS = float(os.environ.get('DNS_NEGATIVE_TTL_SECONDS', '30'))
+
+shared_cache = None
+install_lock = threading.Lock()
+
+
+class SharedLRUCache(dns.resolver.LRUCache):
+    """dnspython LRUCache that bounds how long negative answers are kept and counts them"""
+
+    def __init__(self, max_size=DNS_CACHE_MAX_SIZE, negative_ttl=DNS_NEGATIVE_TTL_SECONDS):
+        super().__init__(max_size)
+        self.negative_ttl = negative_ttl
+        self.negative_puts = 0
+
+    def put(self, key, value):
+        if value.rrset is None:
+            if self.negative_ttl <= 0:
+                return
+            value.expiration = min(value.expiration, time.time() + self.negative_ttl)
+            with self.lock:
+                self.negative_puts += 1
+        super().put(key, value)
+
+
+def install_dns_cache():
+    """Give dnspython's default resolvers (sync and asyncio) one shared cache; pymongo's SRV lookups use them"""
+
+    global shared_cache
+
+    with install_lock:
+        if shared_cache is None:
+            shared_cache = SharedLRUCache()
+            dns.resolver.get_default_resolver().cache = shared_cache
+            dns.asyncresolver.get_default_resolver().cache = shared_cache
+            print(f"🧭 DNS cache installed (max {DNS_CACHE_MAX_SIZE} entries, negative TTL {DNS_NEGATIVE_TTL_SECONDS:g}s)")
+    return shared_cache
+
+
+def dns_cache_stats():
+    """Hit rate and size of the shared cache, or None before it is installed"""
+
+    if shared_cache is None:
+        return None
+    snapshot = shared_cache.get_statistics_snapshot()
+    lookups = snapshot.hits + snapshot.misses
+    with shared_cache.lock:
+        size = len(shared_cache.data)
+        negative_puts = shared_cache.negative_puts
+    return {
+        'hits': snapshot.hits,
+        'misses': snapshot.misses,
+        'hit_rate': round(snapshot.hits / lookups, 3) if lookups else None,
+        'entries': size,
+        'max_size': shared_cache.max_size,
+        'negative_answers_cached': negative_puts
+    }
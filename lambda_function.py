@@ -1,19 +1,99 @@
+import importlib
 import json
+import math
 import os
+import time
 import boto3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from pymongo import MongoClient
-import requests
+from pymongo import MongoClient, network_layer
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from pymongo.server_type import SERVER_TYPE
 from bson import ObjectId
+from deadline import start_invocation_budget, stage_budget, mongo_budget, http_timeout, boto_config, phase_budget
+from alert_rendering import DEFAULT_MAX_UTILITY_LINES, render_revenue_report, render_error_message
+from revenue_export import export_window
+from reconciliation import reconcile_window, split_range
+from dns_cache import dns_cache_stats, install_dns_cache
+from srv_cache import install_srv_cache, srv_cache_stats
+from wire_compression import attach_policy, client_compression_options
+from notifiers import SlackWebhookSink, build_sinks, get_sink_configs, dispatch_report, borrow_http_session, prepare_http_session, reset_http_sessions
+from revenue_stats import (
+    REPORT_PERCENTILES,
+    percentile_key,
+    sketch_bucket_expression,
+    sketches_from_rows,
+    merge_sketches,
+    sketch_quantiles,
+    sketch_histogram,
+    histogram_labels,
+    encode_sketch,
+    decode_sketch
+)
+
+
+# SnapStart hooks only exist inside the Lambda Python runtime
+try:
+    from snapshot_restore_py import register_before_snapshot, register_after_restore
+except ImportError:
+    register_before_snapshot = register_after_restore = None
 
 
 mongodb_client = None
 database = None
+# Resolved once per container; sockets are re-created around snapshots, config is not
+mongodb_config = None
+slack_webhook_cache = None
+percentile_supported = None
+server_version = None
+compression_policy = None
+
+# Per-stage caps in seconds; each stage also gets no more than what is left of
+# the Lambda's remaining time after reserving room for the stages behind it.
+AGGREGATION_MAX_SECONDS = float(os.environ.get('AGGREGATION_MAX_SECONDS', '120'))
+MIN_AGGREGATION_SECONDS = float(os.environ.get('MIN_AGGREGATION_SECONDS', '5'))
+FALLBACK_MAX_SECONDS = float(os.environ.get('FALLBACK_MAX_SECONDS', '10'))
+SLACK_MAX_SECONDS = float(os.environ.get('SLACK_MAX_SECONDS', '30'))
+NOTIFY_RESERVE_SECONDS = float(os.environ.get('NOTIFY_RESERVE_SECONDS', '15'))
+PERSIST_MAX_SECONDS = float(os.environ.get('PERSIST_MAX_SECONDS', '5'))
+
+# Fallback tiers run in this order, each with its own cap, so the worst case
+# is bounded by their sum (FALLBACK_MAX_SECONDS covers the $group-only tier).
+ROLLUP_FALLBACK_MAX_SECONDS = float(os.environ.get('ROLLUP_FALLBACK_MAX_SECONDS', '3'))
+COUNT_FALLBACK_MAX_SECONDS = float(os.environ.get('COUNT_FALLBACK_MAX_SECONDS', '5'))
+ESTIMATE_FALLBACK_MAX_SECONDS = float(os.environ.get('ESTIMATE_FALLBACK_MAX_SECONDS', '2'))
+
+# Init-phase work must finish well inside Lambda's 10s init limit: SSM, Secrets
+# Manager and the Mongo ping share INIT_MAX_SECONDS, the ping at most INIT_CONNECT_MAX_SECONDS
+INIT_MAX_SECONDS = float(os.environ.get('INIT_MAX_SECONDS', '7'))
+INIT_CONNECT_MAX_SECONDS = float(os.environ.get('INIT_CONNECT_MAX_SECONDS', '4'))
+SLACK_SECRET_TTL_SECONDS = float(os.environ.get('SLACK_SECRET_TTL_SECONDS', '300'))
+# Imported lazily by their libraries on first use; loading them during init keeps that off the first invocation
+PREIMPORT_MODULES = ('botocore.config', 'dns.resolver', 'pymongo.synchronous.srv_resolver')
+
+# Windows of at least PARALLEL_AGGREGATION_MIN_HOURS are split into createdAt
+# sub-ranges of roughly PARTITION_TARGET_DOCUMENTS each, judged from the
+# per-minute volume of stored rollups, and aggregated concurrently.
+PARALLEL_AGGREGATION_MIN_HOURS = float(os.environ.get('PARALLEL_AGGREGATION_MIN_HOURS', '12'))
+PARALLEL_AGGREGATION_MAX_PARTITIONS = int(os.environ.get('PARALLEL_AGGREGATION_MAX_PARTITIONS', '16'))
+PARTITION_TARGET_DOCUMENTS = int(os.environ.get('PARTITION_TARGET_DOCUMENTS', '250000'))
+AGGREGATION_POOL_SIZE = int(os.environ.get('AGGREGATION_POOL_SIZE', '4'))
+
+# With REPORT_ID_RANGE_PRUNING=true the revenue $match also bounds _id by the
+# window, widened by ID_RANGE_SLACK_SECONDS to allow for createdAt being set a
+# little before or after the insert that generated the _id.
+ID_RANGE_SLACK_SECONDS = float(os.environ.get('ID_RANGE_SLACK_SECONDS', '300'))
+# Largest receive buffer each pooled connection keeps for reuse (two per
+# connection), so at most 2 * maxPoolSize * this stays allocated
+RECEIVE_BUFFER_MAX_BYTES = int(os.environ.get('RECEIVE_BUFFER_MAX_BYTES', str(1024 * 1024)))
 
 def lambda_handler(event, context):
     
     try:
         
+        start_invocation_budget(context)
+        
         init_mongodb_connection()
         
         
@@ -27,7 +107,14 @@ def lambda_handler(event, context):
         revenue_data = get_power_transaction_revenue(start_time, end_time)
         
         
-        send_revenue_alert(revenue_data, period_name, start_time, end_time)
+        notification_results = send_revenue_alert(revenue_data, period_name, start_time, end_time)
+        
+        persist_window_sketch(start_time, end_time, revenue_data)
+        
+        export_results = export_revenue_window(start_time, end_time, revenue_data)
+        
+        compression_metrics = log_compression_metrics()
+        dns_metrics = log_dns_metrics()
         
         return {
             'statusCode': 200,
@@ -35,7 +122,16 @@ def lambda_handler(event, context):
                 'message': 'Power transaction alert sent successfully',
                 'period': period_name,
                 'total_revenue': float(revenue_data['total_amount']),
-                'transaction_count': revenue_data['total_transactions']
+                'transaction_count': revenue_data['total_transactions'],
+                'fulfillment_rate': revenue_data['fulfillment_rate'],
+                'failed_amount': float(revenue_data['failed_amount']),
+                'pending_transactions': revenue_data['pending_transactions'],
+                'read_source': revenue_data['read_source'],
+                'fidelity': revenue_data['fidelity'],
+                'notifications': notification_results,
+                'exports': export_results,
+                'wire_compression': compression_metrics,
+                'dns_cache': dns_metrics
             })
         }
         
@@ -48,39 +144,106 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
+def parse_read_preference_tags(raw_tags):
+    """'nodeType:ANALYTICS;' -> [{'nodeType': 'ANALYTICS'}, {}]; tag sets are tried in order"""
+    
+    if not raw_tags:
+        return None
+    
+    tag_sets = []
+    for raw_set in raw_tags.split(';'):
+        tag_set = {}
+        for pair in raw_set.split(','):
+            if ':' in pair:
+                name, value = pair.split(':', 1)
+                tag_set[name.strip()] = value.strip()
+        tag_sets.append(tag_set)
+    return tag_sets
+
+def get_read_preference(prefix='MONGODB'):
+    mode = os.environ.get(f'{prefix}_READ_PREFERENCE')
+    if not mode:
+        return None
+    
+    tag_sets = parse_read_preference_tags(os.environ.get(f'{prefix}_READ_PREFERENCE_TAGS'))
+    max_staleness = int(os.environ.get(f'{prefix}_MAX_STALENESS_SECONDS', '-1'))
+    return make_read_preference(read_pref_mode_from_name(mode), tag_sets, max_staleness)
+
+def get_read_concern(prefix='MONGODB'):
+    level = os.environ.get(f'{prefix}_READ_CONCERN')
+    return ReadConcern(level) if level else None
+
+def load_mongodb_config():
+    """URI and database name from SSM, read once per container"""
+    
+    global mongodb_config
+    
+    if mongodb_config is None:
+        ssm_client = boto3.client('ssm', config=boto_config(10, reserve=NOTIFY_RESERVE_SECONDS, calls=2))
+        param_base = os.environ.get('MONGODB_PARAM_BASE', '/power-alerts/dev/mongodb')
+        
+        uri_param = ssm_client.get_parameter(
+            Name=f"{param_base}/uri",
+            WithDecryption=True
+        )
+        db_param = ssm_client.get_parameter(
+            Name=f"{param_base}/database",
+        )
+        mongodb_config = {
+            'uri': uri_param['Parameter']['Value'],
+            'database': db_param['Parameter']['Value']
+        }
+    
+    return mongodb_config
+
 def init_mongodb_connection():
     
-    global mongodb_client, database
+    global mongodb_client, database, compression_policy
     
     if mongodb_client is None:
         
-        ssm_client = boto3.client('ssm')
-        param_base = os.environ.get('MONGODB_PARAM_BASE', '/power-alerts/dev/mongodb')
-
         try:
 
-            uri_param = ssm_client.get_parameter(
-                Name=f"{param_base}/uri",
-                WithDecryption=True
-            )
-            mongodb_uri = uri_param['Parameter']['Value']
-
-            db_param = ssm_client.get_parameter(
-                Name=f"{param_base}/database",
-            )
-            database_name = db_param['Parameter']['Value']
+            config = load_mongodb_config()
+            mongodb_uri = config['uri']
+            database_name = config['database']
             
             print(f"📡 Connecting to MongoDB database: {database_name}")
+            
+            if mongodb_uri.startswith('mongodb+srv://'):
+                # SRV polling shares one cached resolver; the last SRV/TXT answers
+                # are reused within their TTL instead of hitting DNS on every cold start
+                install_dns_cache()
+                install_srv_cache()
         
+            # Unset options fall back to whatever the URI specifies
+            read_options = {}
+            read_preference = get_read_preference()
+            if read_preference is not None:
+                read_options['read_preference'] = read_preference
+                print(f"📖 Client read preference: {read_preference}")
+            read_concern = get_read_concern()
+            if read_concern is not None:
+                read_options['readConcernLevel'] = read_concern.level
+            
+            compression_options, policy = client_compression_options()
+            if compression_options:
+                print(f"🗜️ Wire compressors: {','.join(compression_options['compressors'])} ({'adaptive' if policy else 'static'})")
         
-        
+            network_layer._MAX_RETAINED_RECEIVE_BUFFER = RECEIVE_BUFFER_MAX_BYTES
             mongodb_client = MongoClient(
                 mongodb_uri,
                 serverSelectionTimeoutMS=15000,
                 connectTimeoutMS=15000,
                 maxPoolSize=5,
-                retryWrites=True
+                retryWrites=True,
+                # With an adaptive policy, discovery waits for the first operation,
+                # so every handshake and pooled connection sees the policy
+                connect=policy is None,
+                **read_options,
+                **compression_options
             )
+            compression_policy = policy if policy is not None and attach_policy(mongodb_client, policy) else None
         
         
             database = mongodb_client[database_name]
@@ -91,6 +254,33 @@ def init_mongodb_connection():
             print(f"❌ Error initializing MongoDB connection: {e}")
             raise
 
+def log_compression_metrics():
+    """Wire-compression counters since the client was created, or None without the adaptive policy"""
+    
+    if compression_policy is None:
+        return None
+    metrics = compression_policy.metrics()
+    print(
+        f"🗜️ Wire compression saved {metrics['bytes_saved'] / 1024:,.1f} KB for "
+        f"{metrics['compress_cpu_ms'] + metrics['decompress_cpu_ms']:.1f}ms CPU "
+        f"({metrics['uncompressed_commands']} small commands sent uncompressed)"
+    )
+    return metrics
+
+def log_dns_metrics():
+    """Shared DNS cache and SRV cache counters, or None when the URI needs no DNS lookups"""
+    
+    metrics = dns_cache_stats()
+    if metrics is None:
+        return None
+    metrics['srv'] = srv_cache_stats()
+    hit_rate = 'n/a' if metrics['hit_rate'] is None else f"{metrics['hit_rate']:.0%}"
+    print(
+        f"🧭 DNS cache hit rate {hit_rate} ({metrics['hits']} hits, {metrics['misses']} misses), "
+        f"SRV cache {metrics['srv']['hits']} hits / {metrics['srv']['misses']} lookups"
+    )
+    return metrics
+
 def get_report_period(current_time):
     hour = current_time.hour
     
@@ -126,235 +316,937 @@ def get_report_period(current_time):
     print(f"📅 Period calculation - Hour: {hour}, Start: {start_time}, End: {end_time}")
     return start_time, end_time, period_name
 
-def get_power_transaction_revenue(start_time, end_time):
-    collection = database['power_transaction_items']
+def get_status_groups():
+    failed_statuses = [s.strip() for s in os.environ.get('REPORT_FAILED_STATUSES', 'failed').split(',') if s.strip()]
+    pending_statuses = [s.strip() for s in os.environ.get('REPORT_PENDING_STATUSES', 'pending').split(',') if s.strip()]
+    return failed_statuses, pending_statuses
+
+def empty_revenue_summary():
+    return {
+        'total_amount': 0.0,
+        'total_transactions': 0,
+        'utility_breakdown': [],
+        'fulfillment_rate': None,
+        'failed_amount': 0.0,
+        'failed_transactions': 0,
+        'pending_amount': 0.0,
+        'pending_transactions': 0,
+        'status_breakdown': [],
+        'amount_stats': None,
+        'amount_sketch': {},
+        'hourly_revenue': None,
+        'top_contributors': None,
+        'read_source': None,
+        'partitions': 1,
+        'fidelity': 'full'
+    }
+
+def summarize_status_mix(rows, failed_statuses, pending_statuses):
+    """Fold (util, status) group rows into totals, utility breakdown and vending health"""
     
-    print(f"🔍 Querying transactions from {start_time} to {end_time}")
+    summary = empty_revenue_summary()
+    per_util = {}
     
-    try:
-        pipeline = [
+    for row in rows:
+        key = row.get('_id') or {}
+        util = key.get('util')
+        status = key.get('status')
+        amount = float(row.get('amount') or 0)
+        count = int(row.get('count') or 0)
+        
+        if status == 'fulfilled':
+            bucket = 'fulfilled'
+        elif status in failed_statuses:
+            bucket = 'failed'
+        elif status in pending_statuses:
+            bucket = 'pending'
+        else:
+            continue
+        
+        if bucket == 'fulfilled':
+            summary['total_amount'] += amount
+            summary['total_transactions'] += count
+        else:
+            summary[f'{bucket}_amount'] += amount
+            summary[f'{bucket}_transactions'] += count
+        
+        if not util:
+            continue
+        
+        util_data = per_util.setdefault(util, {
+            'util': util,
+            'fulfilled_amount': 0.0,
+            'fulfilled_transactions': 0,
+            'failed_amount': 0.0,
+            'failed_transactions': 0,
+            'pending_amount': 0.0,
+            'pending_transactions': 0
+        })
+        util_data[f'{bucket}_amount'] += amount
+        util_data[f'{bucket}_transactions'] += count
+    
+    attempts = summary['total_transactions'] + summary['failed_transactions'] + summary['pending_transactions']
+    if attempts:
+        summary['fulfillment_rate'] = summary['total_transactions'] / attempts
+    
+    for util_data in per_util.values():
+        util_attempts = util_data['fulfilled_transactions'] + util_data['failed_transactions'] + util_data['pending_transactions']
+        util_data['fulfillment_rate'] = util_data['fulfilled_transactions'] / util_attempts if util_attempts else None
+        
+        if util_data['fulfilled_transactions']:
+            summary['utility_breakdown'].append({
+                'util': util_data['util'],
+                'amount': util_data['fulfilled_amount'],
+                'transactions': util_data['fulfilled_transactions']
+            })
+    
+    summary['utility_breakdown'].sort(key=lambda u: u['amount'], reverse=True)
+    summary['status_breakdown'] = sorted(
+        per_util.values(),
+        key=lambda u: (u['failed_amount'], u['pending_transactions']),
+        reverse=True
+    )
+    return summary
+
+def server_supports_percentile():
+    global percentile_supported
+    
+    mode = os.environ.get('AMOUNT_PERCENTILE_MODE', 'auto')
+    if mode == 'server':
+        return True
+    if mode == 'sketch':
+        return False
+    
+    if percentile_supported is None:
+        percentile_supported = get_server_version() >= [7, 0]
+        print(f"📐 Server-side $percentile supported: {percentile_supported}")
+    
+    return percentile_supported
+
+def get_server_version():
+    """[major, minor] of the connected server, read once per container; [0, 0] when unknown"""
+    global server_version
+    
+    if server_version is None:
+        try:
+            with mongo_budget(5, reserve=FALLBACK_MAX_SECONDS + NOTIFY_RESERVE_SECONDS):
+                version = mongodb_client.server_info().get('versionArray', [0])
+            server_version = (list(version[:2]) + [0])[:2]
+        except Exception as e:
+            print(f"⚠️ Could not read server version, assuming oldest supported features: {e}")
+            server_version = [0, 0]
+        print(f"🗄️ MongoDB server version: {server_version[0]}.{server_version[1]}")
+    
+    return server_version
+
+def build_amount_stats_facets(use_server_percentile):
+    facets = {
+        'amount_sketch': [
+            {'$match': {'status': 'fulfilled'}},
             {
-                '$match': {
-                    'createdAt': {
-                        '$gte': start_time,
-                        '$lte': end_time
-                    },
-                    'status': 'fulfilled',
-                    'amount': {'$exists': True, '$ne': ''}
+                '$group': {
+                    '_id': {'util': '$util', 'bucket': sketch_bucket_expression('$amount_numeric')},
+                    'count': {'$sum': 1}
                 }
-            },
+            }
+        ]
+    }
+    
+    if use_server_percentile:
+        percentile_accumulator = {
+            '$percentile': {
+                'input': '$amount_numeric',
+                'p': REPORT_PERCENTILES,
+                'method': 'approximate'
+            }
+        }
+        facets['amount_percentiles'] = [
+            {'$match': {'status': 'fulfilled'}},
+            {'$group': {'_id': '$util', 'percentiles': percentile_accumulator}}
+        ]
+        facets['amount_percentiles_total'] = [
+            {'$match': {'status': 'fulfilled'}},
+            {'$group': {'_id': None, 'percentiles': percentile_accumulator}}
+        ]
+    
+    return facets
+
+def hourly_heatmap_enabled():
+    return os.environ.get('REPORT_HOURLY_HEATMAP', 'true').lower() == 'true'
+
+def id_range_pruning_enabled():
+    # Only safe where _id is generated at insert time, close to createdAt
+    return os.environ.get('REPORT_ID_RANGE_PRUNING', 'false').lower() == 'true'
+
+def transaction_window_match(start_time, end_time, inclusive_end=True):
+    """createdAt range filter, plus an _id range the server can also prune by when enabled"""
+    
+    window = {
+        'createdAt': {
+            '$gte': start_time,
+            '$lte' if inclusive_end else '$lt': end_time
+        }
+    }
+    if id_range_pruning_enabled():
+        slack = timedelta(seconds=ID_RANGE_SLACK_SECONDS)
+        window['_id'] = ObjectId.range_filter(start_time - slack, end_time + slack)
+    return window
+
+def revenue_window_match(start_time, end_time, statuses, inclusive_end=True):
+    """$match shared by the main pipeline and its fallback tiers, so every tier counts the same documents"""
+    
+    return {
+        **transaction_window_match(start_time, end_time, inclusive_end),
+        'status': {'$in': statuses},
+        'amount': {'$exists': True, '$ne': ''}
+    }
+
+def amount_numeric_expression():
+    # Strings convert as they are; numbers and Decimal128 go through their string form
+    return {
+        '$toDouble': {
+            '$cond': {
+                'if': {'$eq': [{'$type': '$amount'}, 'string']},
+                'then': '$amount',
+                'else': {'$toString': '$amount'}
+            }
+        }
+    }
+
+def build_hourly_facet():
+    # $dateTrunc needs MongoDB 5.0+, so callers skip this facet on older servers;
+    # the hour rides on the same scan as the other facets
+    return [
+        {'$match': {'status': 'fulfilled'}},
+        {
+            '$group': {
+                '_id': {'util': '$util', 'hour': {'$dateTrunc': {'date': '$createdAt', 'unit': 'hour'}}},
+                'amount': {'$sum': '$amount_numeric'},
+                'count': {'$sum': 1}
+            }
+        }
+    ]
+
+def summarize_hourly_revenue(rows, start_time, end_time, utility_order=None):
+    """Fold (util, hour) group rows into per-utility hourly amounts aligned on the window's hours"""
+    
+    hours = []
+    hour = start_time.replace(minute=0, second=0, microsecond=0)
+    while hour <= end_time:
+        hours.append(hour)
+        hour += timedelta(hours=1)
+    slots = {hour: position for position, hour in enumerate(hours)}
+    
+    per_util = {}
+    for row in rows:
+        key = row.get('_id') or {}
+        position = slots.get(key.get('hour'))
+        if position is None:
+            continue
+        util_data = per_util.setdefault(key.get('util') or 'Unknown', {
+            'amounts': [0.0] * len(hours),
+            'transactions': [0] * len(hours)
+        })
+        util_data['amounts'][position] += float(row.get('amount') or 0)
+        util_data['transactions'][position] += int(row.get('count') or 0)
+    
+    order = [util for util in (utility_order or []) if util in per_util]
+    order += sorted(util for util in per_util if util not in order)
+    return {
+        'hours': hours,
+        'by_utility': [{'util': util, **per_util[util]} for util in order]
+    }
+
+def get_top_contributor_settings():
+    """(N, field) for the top contributors facet; N of 0 disables it"""
+    top_n = int(os.environ.get('REPORT_TOP_N', '0'))
+    field = os.environ.get('REPORT_TOP_FIELD', 'meterNumber')
+    return max(0, top_n), field
+
+def build_top_contributors_facet(top_n, field, use_top_n):
+    entry = {'key': '$_id.key', 'amount': '$amount', 'count': '$count'}
+    facet = [
+        {'$match': {'status': 'fulfilled'}},
+        {
+            '$group': {
+                '_id': {'util': '$util', 'key': f"${field}"},
+                'amount': {'$sum': '$amount_numeric'},
+                'count': {'$sum': 1}
+            }
+        }
+    ]
+    
+    if use_top_n:
+        # $topN keeps only N entries per utility in the second group
+        facet.append({
+            '$group': {
+                '_id': '$_id.util',
+                'top': {'$topN': {'n': top_n, 'sortBy': {'amount': -1}, 'output': entry}}
+            }
+        })
+    else:
+        # Before 5.2: sort, collect and trim so still only N rows per utility come back
+        facet.extend([
+            {'$sort': {'amount': -1}},
+            {'$group': {'_id': '$_id.util', 'top': {'$push': entry}}},
+            {'$project': {'top': {'$slice': ['$top', top_n]}}}
+        ])
+    
+    return facet
+
+def summarize_top_contributors(rows, field, utility_order=None):
+    per_util = {row['_id'] or 'Unknown': row.get('top', []) for row in rows}
+    order = [util for util in (utility_order or []) if util in per_util]
+    order += sorted(util for util in per_util if util not in order)
+    return {
+        'field': field,
+        'by_utility': [
             {
-                '$addFields': {
-                    'amount_numeric': {
-                        '$toDouble': {
-                            '$cond': {
-                                'if': {'$eq': [{'$type': '$amount'}, 'string']},
-                                'then': '$amount',
-                                'else': {'$toString': '$amount'}
-                            }
+                'util': util,
+                'top': [
+                    {'key': entry.get('key'), 'amount': float(entry.get('amount') or 0), 'count': int(entry.get('count') or 0)}
+                    for entry in per_util[util]
+                ]
+            }
+            for util in order
+        ]
+    }
+
+def summarize_amount_stats(sketches, server_percentiles=None, server_total_percentiles=None):
+    """Per-utility p50/p90/p99 and histograms; server $percentile values win over sketch estimates"""
+    
+    if not sketches:
+        return None
+    
+    def percentile_dict(values):
+        return {percentile_key(q): value for q, value in zip(REPORT_PERCENTILES, values)}
+    
+    by_utility = []
+    for util, counts in sketches.items():
+        if not util:
+            continue
+        values = (server_percentiles or {}).get(util) or sketch_quantiles(counts)
+        util_stats = percentile_dict(values)
+        util_stats['util'] = util
+        util_stats['histogram'] = sketch_histogram(counts)
+        by_utility.append(util_stats)
+    
+    by_utility.sort(key=lambda u: sum(u['histogram']), reverse=True)
+    
+    overall_values = server_total_percentiles or sketch_quantiles(merge_sketches(*sketches.values()))
+    return {
+        'source': 'server' if server_total_percentiles else 'sketch',
+        'overall': percentile_dict(overall_values),
+        'by_utility': by_utility,
+        'histogram_labels': histogram_labels()
+    }
+
+def measure_read_staleness(address):
+    """Estimate how far behind the primary the server that answered a read is (max-staleness spec formula)"""
+    
+    if address is None:
+        return None
+    
+    servers = mongodb_client.topology_description.server_descriptions()
+    server = servers.get(address)
+    if server is None:
+        return None
+    if server.server_type in (SERVER_TYPE.RSPrimary, SERVER_TYPE.Standalone):
+        return 0.0
+    if server.server_type != SERVER_TYPE.RSSecondary or not server.last_write_date:
+        # mongos and unknown members do not report replication progress
+        return None
+    
+    heartbeat_frequency = mongodb_client.options.heartbeat_frequency
+    primary = next((s for s in servers.values() if s.server_type == SERVER_TYPE.RSPrimary), None)
+    if primary is not None and primary.last_write_date:
+        staleness = (
+            (server.last_update_time - server.last_write_date)
+            - (primary.last_update_time - primary.last_write_date)
+            + heartbeat_frequency
+        )
+    else:
+        newest_write = max(
+            s.last_write_date for s in servers.values()
+            if s.server_type == SERVER_TYPE.RSSecondary and s.last_write_date
+        )
+        staleness = newest_write - server.last_write_date + heartbeat_frequency
+    
+    return max(0.0, staleness)
+
+def build_revenue_pipeline(start_time, end_time, failed_statuses, pending_statuses, use_server_percentile, top_n, top_field, inclusive_end=True):
+    # One pass over the {createdAt, status} index range: every status we
+    # report on is grouped together instead of issuing a query per status.
+    return [
+        {'$match': revenue_window_match(start_time, end_time, ['fulfilled'] + failed_statuses + pending_statuses, inclusive_end)},
+        {'$addFields': {'amount_numeric': amount_numeric_expression()}},
+        {
+            '$facet': {
+                'by_util_status': [
+                    {
+                        '$group': {
+                            '_id': {'util': '$util', 'status': '$status'},
+                            'amount': {'$sum': '$amount_numeric'},
+                            'count': {'$sum': 1}
                         }
                     }
-                }
-            },
-            {
-                '$facet': {
-                    'total': [
-                        {
-                            '$group': {
-                                '_id': None,
-                                'total_amount': {'$sum': '$amount_numeric'},
-                                'total_transactions': {'$sum': 1}
-                            }
-                        }
-                    ],
-                    'by_utility': [
-                        {
-                            '$group': {
-                                '_id': '$util',
-                                'amount': {'$sum': '$amount_numeric'},
-                                'count': {'$sum': 1}
-                            }
-                        },
-                        {
-                            '$sort': {'amount': -1}
-                        }
-                    ]
-                }
+                ],
+                # Bucket counts only: raw amounts never leave the server
+                **build_amount_stats_facets(use_server_percentile),
+                **({'by_util_hour': build_hourly_facet()} if hourly_heatmap_enabled() and get_server_version() >= [5, 0] else {}),
+                **({'top_contributors': build_top_contributors_facet(top_n, top_field, get_server_version() >= [5, 2])} if top_n else {})
             }
-        ]
+        }
+    ]
+
+def run_revenue_aggregation(collection, pipeline, deadline, aggregate_options):
+    """The pipeline's single $facet document and the address that served it"""
+    
+    # pymongo.timeout() is a contextvar, so pool threads enter their own
+    with mongo_budget(deadline - time.monotonic()):
+        cursor = collection.aggregate(pipeline, **aggregate_options)
+        result = list(cursor)
+    return (result[0] if result else None), cursor.address
+
+def merge_group_rows(row_lists):
+    """Add up amount/count of group rows with the same _id across partitions"""
+    
+    merged = {}
+    for rows in row_lists:
+        for row in rows:
+            key = row['_id']
+            frozen = tuple(sorted(key.items())) if isinstance(key, dict) else key
+            if frozen not in merged:
+                merged[frozen] = dict(row)
+                continue
+            for field in ('amount', 'count'):
+                if field in row:
+                    merged[frozen][field] += row[field]
+    return list(merged.values())
+
+def merge_top_contributors(row_lists, top_n):
+    """Per-partition top N summed by key; a key just outside one partition's top N can be undercounted"""
+    
+    per_util = {}
+    for rows in row_lists:
+        for row in rows:
+            entries = per_util.setdefault(row['_id'], {})
+            for entry in row.get('top', []):
+                merged = entries.setdefault(entry['key'], {'key': entry['key'], 'amount': 0.0, 'count': 0})
+                merged['amount'] += entry['amount']
+                merged['count'] += entry['count']
+    return [
+        {'_id': util, 'top': sorted(entries.values(), key=lambda entry: entry['amount'], reverse=True)[:top_n]}
+        for util, entries in per_util.items()
+    ]
+
+def merge_facet_results(partials, top_n=0):
+    """Combine the $facet documents of sub-range aggregations into one"""
+    
+    partials = [partial for partial in partials if partial]
+    merged = {}
+    for facet in ('by_util_status', 'amount_sketch', 'by_util_hour'):
+        if any(facet in partial for partial in partials):
+            merged[facet] = merge_group_rows([partial.get(facet, []) for partial in partials])
+    if any('top_contributors' in partial for partial in partials):
+        merged['top_contributors'] = merge_top_contributors([partial.get('top_contributors', []) for partial in partials], top_n)
+    return merged
+
+def get_historical_transaction_rate(before_time, max_seconds=ESTIMATE_FALLBACK_MAX_SECONDS):
+    """Fulfilled transactions per minute over the most recent stored windows ending before ``before_time``"""
+    
+    sketch_collection = database[os.environ.get('SKETCH_COLLECTION', 'revenue_window_sketches')]
+    
+    with mongo_budget(max_seconds, reserve=NOTIFY_RESERVE_SECONDS):
+        windows = list(sketch_collection.find(
+            {'window_end': {'$lte': before_time}},
+            {'window_start': 1, 'window_end': 1, 'total_transactions': 1}
+        ).sort('window_end', -1).limit(28))
+    
+    covered_minutes = sum((w['window_end'] - w['window_start']).total_seconds() for w in windows) / 60
+    if not covered_minutes:
+        return None
+    return sum(w.get('total_transactions', 0) for w in windows) / covered_minutes
+
+def choose_partition_count(start_time, end_time):
+    """Sub-ranges for the revenue aggregation, sized from historical per-minute volume"""
+    
+    if os.environ.get('AGGREGATION_PARTITIONS'):
+        return max(1, int(os.environ['AGGREGATION_PARTITIONS']))
+    
+    window_minutes = (end_time - start_time).total_seconds() / 60
+    if window_minutes < PARALLEL_AGGREGATION_MIN_HOURS * 60:
+        return 1
+    
+    try:
+        per_minute = get_historical_transaction_rate(end_time)
+    except Exception as e:
+        print(f"⚠️ Could not read historical volume, aggregating in one pass: {e}")
+        return 1
+    if per_minute is None:
+        return 1
+    
+    expected_documents = per_minute * window_minutes
+    partitions = max(1, min(PARALLEL_AGGREGATION_MAX_PARTITIONS, math.ceil(expected_documents / PARTITION_TARGET_DOCUMENTS)))
+    print(f"🧩 ~{expected_documents:,.0f} transactions expected ({per_minute:,.1f}/min), using {partitions} partition(s)")
+    return partitions
+
+def get_power_transaction_revenue(start_time, end_time, read_preference=None, read_concern=None):
+    # Reporting reads can be pointed at secondaries / analytics nodes independently of the client default
+    collection = database.get_collection(
+        'power_transaction_items',
+        read_preference=read_preference or get_read_preference('REPORT'),
+        read_concern=read_concern or get_read_concern('REPORT')
+    )
+    failed_statuses, pending_statuses = get_status_groups()
+    
+    print(f"🔍 Querying transactions from {start_time} to {end_time}")
+    
+    aggregation_budget = stage_budget(AGGREGATION_MAX_SECONDS, reserve=FALLBACK_MAX_SECONDS + NOTIFY_RESERVE_SECONDS)
+    if aggregation_budget < MIN_AGGREGATION_SECONDS:
+        print(f"⏳ Only {aggregation_budget:.1f}s left for aggregation, skipping to fallback")
+        return get_fallback_revenue(collection, start_time, end_time)
+    
+    top_n, top_field = get_top_contributor_settings()
+    partitions = choose_partition_count(start_time, end_time)
+    # $percentile results cannot be merged across partitions; the sketch can
+    use_server_percentile = partitions == 1 and server_supports_percentile()
+    # Grouping by meter/customer can outgrow the 100MB in-memory $group limit
+    aggregate_options = {'allowDiskUse': True} if top_n else {}
+    
+    try:
+        print(f"⏳ Aggregation budget: {aggregation_budget:.1f}s")
+        aggregation_deadline = time.monotonic() + aggregation_budget
         
-        result = list(collection.aggregate(pipeline))
-        print(f"📊 Raw aggregation result: {result}")
+        if partitions == 1:
+            pipeline = build_revenue_pipeline(
+                start_time, end_time, failed_statuses, pending_statuses, use_server_percentile, top_n, top_field
+            )
+            data, address = run_revenue_aggregation(collection, pipeline, aggregation_deadline, aggregate_options)
+        else:
+            pipelines = [
+                build_revenue_pipeline(
+                    sub_start, sub_end, failed_statuses, pending_statuses, False, top_n, top_field, inclusive_end
+                )
+                for sub_start, sub_end, inclusive_end in split_range(start_time, end_time, partitions)
+            ]
+            with ThreadPoolExecutor(max_workers=min(partitions, AGGREGATION_POOL_SIZE), thread_name_prefix='aggregate') as executor:
+                partials = list(executor.map(
+                    lambda pipeline: run_revenue_aggregation(collection, pipeline, aggregation_deadline, aggregate_options),
+                    pipelines
+                ))
+            data = merge_facet_results([partial for partial, _ in partials], top_n)
+            address = partials[0][1]
+        print(f"📊 Raw aggregation result: {data}")
         
-        if not result:
+        read_source = {
+            'address': f"{address[0]}:{address[1]}" if address else None,
+            'read_preference': collection.read_preference.mongos_mode,
+            'staleness_seconds': measure_read_staleness(address)
+        }
+        print(f"📖 Read served by {read_source['address']} (staleness: {read_source['staleness_seconds']}s)")
+        
+        if not data:
             print("⚠️ No result from aggregation pipeline")
-            return {
-                'total_amount': 0.0,
-                'total_transactions': 0,
-                'utility_breakdown': []
-            }
+            empty_summary = empty_revenue_summary()
+            empty_summary['read_source'] = read_source
+            return empty_summary
         
-        data = result[0]
         print(f"📊 Processed data structure: {data}")
         
-        total_data_list = data.get('total', [])
-        if not total_data_list:
-            print("⚠️ No total data found")
-            total_amount = 0.0
-            total_transactions = 0
-        else:
-            total_data = total_data_list[0]
-            total_amount = float(total_data.get('total_amount', 0))
-            total_transactions = int(total_data.get('total_transactions', 0))
-        
-        utility_breakdown = []
-        by_utility_list = data.get('by_utility', [])
-        for util_data in by_utility_list:
-            if util_data.get('_id'):
-                utility_breakdown.append({
-                    'util': util_data['_id'],
-                    'amount': float(util_data['amount']),
-                    'transactions': int(util_data['count'])
-                })
-        
-        result_summary = {
-            'total_amount': total_amount,
-            'total_transactions': total_transactions,
-            'utility_breakdown': utility_breakdown
+        by_util_status_list = data.get('by_util_status', [])
+        if not by_util_status_list:
+            print("⚠️ No status data found")
+        
+        result_summary = summarize_status_mix(by_util_status_list, failed_statuses, pending_statuses)
+        
+        sketches = sketches_from_rows(data.get('amount_sketch', []))
+        server_percentiles = {
+            row['_id']: row['percentiles'] for row in data.get('amount_percentiles', []) if row.get('_id')
         }
+        total_percentiles_list = data.get('amount_percentiles_total', [])
+        server_total_percentiles = total_percentiles_list[0]['percentiles'] if total_percentiles_list else None
+        
+        result_summary['read_source'] = read_source
+        result_summary['partitions'] = partitions
+        result_summary['amount_sketch'] = sketches
+        result_summary['amount_stats'] = summarize_amount_stats(sketches, server_percentiles, server_total_percentiles)
+        if 'by_util_hour' in data:
+            result_summary['hourly_revenue'] = summarize_hourly_revenue(
+                data['by_util_hour'],
+                start_time,
+                end_time,
+                [util_data['util'] for util_data in result_summary['utility_breakdown']]
+            )
+        if 'top_contributors' in data:
+            result_summary['top_contributors'] = summarize_top_contributors(
+                data['top_contributors'],
+                top_field,
+                [util_data['util'] for util_data in result_summary['utility_breakdown']]
+            )
         
         print(f"📊 Final result summary: {result_summary}")
         return result_summary
         
     except Exception as e:
         print(f"❌ Error in aggregation: {str(e)}")
-        print(f"📊 Falling back to simple count query")
-        
-        try:
-            simple_count = collection.count_documents({
-                'createdAt': {
-                    '$gte': start_time,
-                    '$lte': end_time
-                },
-                'status': 'fulfilled'
+        return get_fallback_revenue(collection, start_time, end_time)
+
+def windows_cover_range(windows, start_time, end_time, tolerance=timedelta(minutes=2)):
+    """True when the sorted rollup windows cover [start_time, end_time] without gaps beyond the tolerance"""
+    
+    covered_until = start_time
+    for window in sorted(windows, key=lambda w: w['window_start']):
+        if window['window_start'] - covered_until > tolerance:
+            return False
+        covered_until = max(covered_until, window['window_end'])
+    return end_time - covered_until <= tolerance
+
+def get_rollup_revenue(start_time, end_time):
+    sketch_collection = database[os.environ.get('SKETCH_COLLECTION', 'revenue_window_sketches')]
+    
+    with mongo_budget(ROLLUP_FALLBACK_MAX_SECONDS, reserve=NOTIFY_RESERVE_SECONDS):
+        windows = list(sketch_collection.find(
+            {'window_start': {'$gte': start_time - timedelta(minutes=2)}, 'window_end': {'$lte': end_time + timedelta(minutes=2)}}
+        ))
+    
+    if not windows or not windows_cover_range(windows, start_time, end_time):
+        print(f"📦 Rollups do not cover the window ({len(windows)} found)")
+        return None
+    
+    rows = []
+    sketches = {}
+    for window in windows:
+        for util, util_data in window.get('utilities', {}).items():
+            rows.append({
+                '_id': {'util': util, 'status': 'fulfilled'},
+                'amount': util_data.get('amount', 0.0),
+                'count': util_data.get('transactions', 0)
             })
-            print(f"📊 Simple count result: {simple_count} transactions")
-            
-            return {
-                'total_amount': 0.0,
-                'total_transactions': simple_count,
-                'utility_breakdown': []
-            }
-        except Exception as e2:
-            print(f"❌ Error in simple count: {str(e2)}")
-            return {
-                'total_amount': 0.0,
-                'total_transactions': 0,
-                'utility_breakdown': []
+            sketches[util] = merge_sketches(sketches.get(util, {}), decode_sketch(util_data.get('buckets')))
+    
+    rollup_summary = summarize_status_mix(rows, [], [])
+    rollup_summary['fulfillment_rate'] = None
+    rollup_summary['amount_stats'] = summarize_amount_stats(sketches)
+    return rollup_summary
+
+def get_group_only_revenue(collection, start_time, end_time):
+    # No $facet and no status mix: just the fulfilled revenue per utility
+    pipeline = [
+        {'$match': revenue_window_match(start_time, end_time, ['fulfilled'])},
+        {
+            '$group': {
+                '_id': '$util',
+                'amount': {'$sum': amount_numeric_expression()},
+                'count': {'$sum': 1}
             }
+        }
+    ]
+    
+    with mongo_budget(FALLBACK_MAX_SECONDS, reserve=NOTIFY_RESERVE_SECONDS):
+        rows = list(collection.aggregate(pipeline))
+    
+    group_summary = summarize_status_mix(
+        [{'_id': {'util': row['_id'], 'status': 'fulfilled'}, 'amount': row['amount'], 'count': row['count']} for row in rows],
+        [],
+        []
+    )
+    group_summary['fulfillment_rate'] = None
+    return group_summary
 
-def send_revenue_alert(revenue_data, period_name, start_time, end_time):
-    try:
-        secrets_client = boto3.client('secretsmanager')
-        secret_name = os.environ.get('SLACK_SECRET_NAME', 'power-alerts/dev/slack-webhook')
-        secret_response = secrets_client.get_secret_value(SecretId=secret_name)
+def get_count_revenue(collection, start_time, end_time):
+    with mongo_budget(COUNT_FALLBACK_MAX_SECONDS, reserve=NOTIFY_RESERVE_SECONDS):
+        simple_count = collection.count_documents(revenue_window_match(start_time, end_time, ['fulfilled']))
+    
+    count_summary = empty_revenue_summary()
+    count_summary['total_transactions'] = simple_count
+    return count_summary
 
-        secret_string = secret_response['SecretString']
-        print(f"🔐 Raw secret string: {secret_string[:50]}...")
-        
+def get_estimated_revenue(start_time, end_time):
+    """Scale the average transaction rate of the most recent stored windows to this window"""
+    
+    per_minute = get_historical_transaction_rate(start_time)
+    if per_minute is None:
+        return None
+    
+    estimate_summary = empty_revenue_summary()
+    estimate_summary['total_transactions'] = round(per_minute * (end_time - start_time).total_seconds() / 60)
+    return estimate_summary
+
+def get_fallback_revenue(collection, start_time, end_time):
+    tiers = [
+        ('rollup', lambda: get_rollup_revenue(start_time, end_time)),
+        ('group_only', lambda: get_group_only_revenue(collection, start_time, end_time)),
+        ('count_only', lambda: get_count_revenue(collection, start_time, end_time)),
+        ('estimated', lambda: get_estimated_revenue(start_time, end_time))
+    ]
+    
+    for fidelity, tier in tiers:
+        print(f"📊 Falling back to {fidelity} tier")
         try:
-            secrets = json.loads(secret_string)
-            webhook_url = secrets['webhook_url']
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON decode error: {e}")
-            webhook_url = secret_string.strip().strip('"')
-            print(f"🔗 Using raw webhook URL")
-        
-        print(f"🔗 Webhook URL length: {len(webhook_url)}")
+            tier_summary = tier()
+        except Exception as e:
+            print(f"❌ Error in {fidelity} tier: {str(e)}")
+            continue
         
+        if tier_summary is not None:
+            tier_summary['fidelity'] = fidelity
+            print(f"📊 {fidelity} result: {tier_summary['total_transactions']} transactions, ₦{tier_summary['total_amount']:,.2f}")
+            return tier_summary
+    
+    unavailable_summary = empty_revenue_summary()
+    unavailable_summary['fidelity'] = 'unavailable'
+    return unavailable_summary
+
+def persist_window_sketch(start_time, end_time, revenue_data):
+    """Store the window's amount sketch so day/week percentiles can be merged from 6-hour windows"""
+    
+    if os.environ.get('PERSIST_AMOUNT_SKETCHES', 'true').lower() != 'true':
+        return
+    if revenue_data.get('fidelity') != 'full':
+        # Only complete results become rollups; degraded ones would poison later fallbacks
+        return
+    
+    sketch_collection = database[os.environ.get('SKETCH_COLLECTION', 'revenue_window_sketches')]
+    
+    utilities = {}
+    for util_data in revenue_data['utility_breakdown']:
+        utilities[util_data['util']] = {
+            'amount': util_data['amount'],
+            'transactions': util_data['transactions']
+        }
+    for util, counts in revenue_data['amount_sketch'].items():
+        utilities.setdefault(util or 'unknown', {'amount': 0.0, 'transactions': 0})['buckets'] = encode_sketch(counts)
+    
+    if stage_budget(PERSIST_MAX_SECONDS) < 1:
+        print("⏳ Not enough time left to persist amount sketch")
+        return
+    
+    try:
+        with mongo_budget(PERSIST_MAX_SECONDS):
+            sketch_collection.replace_one(
+                {'_id': f"{start_time.isoformat()}/{end_time.isoformat()}"},
+                {
+                    'window_start': start_time,
+                    'window_end': end_time,
+                    'total_amount': revenue_data['total_amount'],
+                    'total_transactions': revenue_data['total_transactions'],
+                    'utilities': utilities,
+                    'updatedAt': datetime.utcnow()
+                },
+                upsert=True
+            )
+        print(f"💾 Persisted amount sketch for {len(utilities)} utilities")
+    except Exception as e:
+        print(f"⚠️ Could not persist amount sketch: {e}")
+
+def export_revenue_window(start_time, end_time, revenue_data):
+    # Exports feed BI history; a failed export must not fail the report
+    try:
+        return export_window(database, start_time, end_time, revenue_data)
+    except Exception as e:
+        print(f"⚠️ Could not export window: {e}")
+        return []
+
+def reconcile_revenue(start_time, end_time):
+    """Recompute the window's fulfilled revenue with exact sums and report drift against the aggregation"""
+    
+    revenue_data = get_power_transaction_revenue(start_time, end_time)
+    collection = database.get_collection(
+        'power_transaction_items',
+        read_preference=get_read_preference('REPORT'),
+        read_concern=get_read_concern('REPORT')
+    )
+    return reconcile_window(collection, start_time, end_time, revenue_data)
+
+def get_merged_amount_stats(start_time, end_time):
+    """Merge persisted 6-hour sketches that fall inside [start_time, end_time]"""
+    
+    sketch_collection = database[os.environ.get('SKETCH_COLLECTION', 'revenue_window_sketches')]
+    windows = sketch_collection.find(
+        {'window_start': {'$gte': start_time}, 'window_end': {'$lte': end_time}},
+        {'utilities': 1}
+    )
+    
+    sketches = {}
+    window_count = 0
+    for window in windows:
+        window_count += 1
+        for util, util_data in window.get('utilities', {}).items():
+            sketches[util] = merge_sketches(sketches.get(util, {}), decode_sketch(util_data.get('buckets')))
+    
+    print(f"🧮 Merged amount sketches from {window_count} windows")
+    amount_stats = summarize_amount_stats(sketches)
+    if amount_stats:
+        amount_stats['windows'] = window_count
+    return amount_stats
+
+def get_slack_webhook_url():
+    """Webhook URL from Secrets Manager, cached for SLACK_SECRET_TTL_SECONDS so rotations still land"""
+    
+    global slack_webhook_cache
+    
+    if slack_webhook_cache is not None and time.monotonic() - slack_webhook_cache[1] < SLACK_SECRET_TTL_SECONDS:
+        return slack_webhook_cache[0]
+    
+    secrets_client = boto3.client('secretsmanager', config=boto_config(5))
+    secret_name = os.environ.get('SLACK_SECRET_NAME', 'power-alerts/dev/slack-webhook')
+    secret_response = secrets_client.get_secret_value(SecretId=secret_name)
+
+    secret_string = secret_response['SecretString']
+    print(f"🔐 Raw secret string: {secret_string[:50]}...")
+    
+    try:
+        secrets = json.loads(secret_string)
+        webhook_url = secrets['webhook_url']
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON decode error: {e}")
+        webhook_url = secret_string.strip().strip('"')
+        print(f"🔗 Using raw webhook URL")
+    
+    print(f"🔗 Webhook URL length: {len(webhook_url)}")
+    slack_webhook_cache = (webhook_url, time.monotonic())
+    return webhook_url
+
+def send_revenue_alert(revenue_data, period_name, start_time, end_time):
+    try:
+        webhook_url = get_slack_webhook_url()
     except Exception as e:
         print(f"❌ Error getting webhook URL: {e}")
-        return
+        webhook_url = None
     
-    time_display = f"{start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')} UTC on {start_time.strftime('%Y-%m-%d')}"
+    sinks = [
+        sink for sink in build_sinks(get_sink_configs(), webhook_url)
+        if not (isinstance(sink, SlackWebhookSink) and not sink.webhook_url)
+    ]
+    if not sinks:
+        print("❌ No notification sinks available")
+        return []
+    
+    # Plain text by default since it works everywhere; 'blocks' sends Block Kit
+    message_format = os.environ.get('SLACK_MESSAGE_FORMAT', 'text')
+    locale_name = os.environ.get('REPORT_LOCALE', 'en_NG')
+    # 0 lists every utility in every section
+    max_utility_lines = int(os.environ.get('REPORT_MAX_UTILITY_LINES', DEFAULT_MAX_UTILITY_LINES)) or None
+    slack_messages = render_revenue_report(
+        revenue_data, period_name, start_time, end_time, message_format, locale_name, max_utility_lines
+    )
+    text_messages = slack_messages if message_format == 'text' else render_revenue_report(
+        revenue_data, period_name, start_time, end_time, 'text', locale_name, max_utility_lines
+    )
+    
+    report = {
+        'subject': f"Power Transaction Revenue Report - {period_name}",
+        'text': "\n\n".join(message['text'] for message in text_messages),
+        'slack_messages': slack_messages,
+        'summary': {
+            'period': period_name,
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'total_amount': revenue_data['total_amount'],
+            'total_transactions': revenue_data['total_transactions'],
+            'utility_breakdown': revenue_data['utility_breakdown'],
+            'fidelity': revenue_data['fidelity']
+        }
+    }
+    
+    print(f"📤 Dispatching report to {len(sinks)} sink(s): {', '.join(sink.name for sink in sinks)}")
+    print(f"📤 Message content: {json.dumps(slack_messages, indent=2)}")
+    
+    results = dispatch_report(sinks, report, http_timeout(SLACK_MAX_SECONDS))
+    
+    failed_required = [result for result in results if result['required'] and not result['ok']]
+    if failed_required:
+        failures = "; ".join(f"{result['sink']}: {result['error']}" for result in failed_required)
+        print(f"❌ Error sending report: {failures}")
+        raise Exception(f"Notification failed - {failures}")
     
-    # Use simple text format instead of complex blocks
     if revenue_data['total_transactions'] == 0:
-        message_text = f"⚡ *Power Transaction Revenue Report*\n\n📅 *Period:* {period_name}\n🕐 *Time:* {time_display}\n\n📭 *No new transactions yet*\n\nNo power transactions were processed during this period."
+        print("📭 No transactions alert sent successfully!")
     else:
-        utility_lines = []
+        print(f"✅ Revenue alert sent successfully!")
+        print(f"💰 Total Revenue: ₦{revenue_data['total_amount']:,.2f}")
+        print(f"📊 Transactions: {revenue_data['total_transactions']}")
         for util_data in revenue_data['utility_breakdown']:
-            utility_lines.append(f"• *{util_data['util']}*: ₦{util_data['amount']:,.2f} ({util_data['transactions']} transactions)")
-        utility_text = "\n".join(utility_lines)
-        
-        message_text = f"⚡ *Power Transaction Revenue Report*\n\n📅 *Period:* {period_name}\n🕐 *Time:* {time_display}\n\n💰 *Total Revenue Generated:* ₦{revenue_data['total_amount']:,.2f}\n📊 *Total Transactions:* {revenue_data['total_transactions']:,}\n\n🏢 *Revenue Breakdown by Utility:*\n{utility_text}"
-
-    # Simple message format that works better with webhooks
-    message = {
-        "text": message_text
-    }
+            print(f"   {util_data['util']}: ₦{util_data['amount']:,.2f}")
     
-    try:
-        print(f"📤 Sending message to Slack...")
-        print(f"📤 Message content: {json.dumps(message, indent=2)}")
-        
-        response = requests.post(
-            webhook_url,
-            json=message,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
-        
-        print(f"📤 Slack response status: {response.status_code}")
-        print(f"📤 Slack response: {response.text}")
-        
-        if response.status_code != 200:
-            raise Exception(f"Slack API error: {response.status_code} - {response.text}")
-        
-        if response.text.strip() == "ok":
-            print("✅ Slack message sent successfully!")
-        else:
-            print("⚠️ Unexpected response from Slack")
-        
-        if revenue_data['total_transactions'] == 0:
-            print("📭 No transactions alert sent successfully!")
-        else:
-            print(f"✅ Revenue alert sent successfully!")
-            print(f"💰 Total Revenue: ₦{revenue_data['total_amount']:,.2f}")
-            print(f"📊 Transactions: {revenue_data['total_transactions']}")
-            for util_data in revenue_data['utility_breakdown']:
-                print(f"   {util_data['util']}: ₦{util_data['amount']:,.2f}")
-                
-    except Exception as e:
-        print(f"❌ Error sending to Slack: {e}")
-        raise e
+    return results
 
 def send_error_alert(error_message):
     try:
-        secrets_client = boto3.client('secretsmanager')
-        secret_name = os.environ.get('SLACK_SECRET_NAME', 'power-alerts/dev/slack-webhook')
-        secret_response = secrets_client.get_secret_value(SecretId=secret_name)
-        
-        try:
-            secrets = json.loads(secret_response['SecretString'])
-            webhook_url = secrets['webhook_url']
-        except json.JSONDecodeError:
-            webhook_url = secret_response['SecretString'].strip().strip('"')
-        
-        clean_error_msg = str(error_message).replace('"', "'").replace('\n', ' ')
-        
-        # Simple text format for error messages too
-        error_text = f"🚨 *Power Transaction Alert System Error*\n\n*Error:* {clean_error_msg}\n*Time:* {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-        
-        error_msg = {
-            "text": error_text
-        }
+        webhook_url = get_slack_webhook_url()
+        error_msg = render_error_message(error_message, datetime.utcnow())
         
-        response = requests.post(webhook_url, json=error_msg, timeout=30)
+        with borrow_http_session() as session:
+            response = session.post(webhook_url, json=error_msg, timeout=http_timeout(SLACK_MAX_SECONDS))
         print(f"Error alert sent to Slack - Response: {response.status_code} - {response.text}")
     except Exception as e:
         print(f"Failed to send error alert: {str(e)}")
 
+def warm_mongodb_connection():
+    """Open a pooled connection now (TLS + auth) instead of on the first query"""
+    with mongo_budget(INIT_CONNECT_MAX_SECONDS):
+        mongodb_client.admin.command('ping')
+
+def initialize():
+    """Init-phase work: config, Mongo client and connection, Slack URL, HTTP session and lazy imports
+
+    Runs at import inside Lambda, where init time is not billed against the
+    handler and is captured by provisioned concurrency and SnapStart. Anything
+    that fails here is retried lazily by the handler.
+    """
+    started = time.perf_counter()
+    
+    for module_name in PREIMPORT_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"⚠️ Could not pre-import {module_name}: {e}")
+    
+    try:
+        with phase_budget(INIT_MAX_SECONDS):
+            init_mongodb_connection()
+            warm_mongodb_connection()
+            get_slack_webhook_url()
+            prepare_http_session()
+    except Exception as e:
+        print(f"⚠️ Init-phase warm-up failed, the handler will retry: {e}")
+    
+    print(f"🚀 Init phase took {(time.perf_counter() - started) * 1000:.0f}ms")
+
+def close_connections():
+    global mongodb_client, database, compression_policy
+    
+    if mongodb_client is not None:
+        mongodb_client.close()
+    mongodb_client = None
+    database = None
+    compression_policy = None
+    reset_http_sessions()
+
+def before_snapshot():
+    """SnapStart: drop sockets so restored environments never share a connection"""
+    print("📸 Closing connections before snapshot")
+    close_connections()
+
+def after_restore():
+    """SnapStart: reconnect using the config resolved before the snapshot"""
+    started = time.perf_counter()
+    try:
+        with phase_budget(INIT_MAX_SECONDS):
+            init_mongodb_connection()
+            warm_mongodb_connection()
+            prepare_http_session()
+    except Exception as e:
+        print(f"⚠️ Reconnect after restore failed, the handler will retry: {e}")
+    print(f"♻️ Restore hook took {(time.perf_counter() - started) * 1000:.0f}ms")
+
+if register_before_snapshot is not None:
+    register_before_snapshot(before_snapshot)
+    register_after_restore(after_restore)
+
+if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') and os.environ.get('INIT_AT_IMPORT', 'true').lower() == 'true':
+    initialize()
 
 def test_locally():
     
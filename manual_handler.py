@@ -1,6 +1,8 @@
 
 import json
-from lambda_function import lambda_handler as main_handler, test_locally
+from datetime import datetime, timedelta
+from lambda_function import lambda_handler as main_handler, test_locally, init_mongodb_connection, get_merged_amount_stats, get_report_period, reconcile_revenue, get_power_transaction_revenue, send_revenue_alert
+from deadline import start_invocation_budget
 
 def lambda_handler(event, context):
     """Manual handler for testing and on-demand checks"""
@@ -27,6 +29,91 @@ def lambda_handler(event, context):
                 })
             }
     
+    elif check_type == 'amount_stats':
+        days = int(event.get('days', 1))
+        print(f"🧮 Merging amount percentiles for the last {days} day(s)...")
+        try:
+            init_mongodb_connection()
+            end_time = datetime.utcnow()
+            amount_stats = get_merged_amount_stats(end_time - timedelta(days=days), end_time)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Amount stats merged successfully',
+                    'days': days,
+                    'amount_stats': amount_stats
+                })
+            }
+        except Exception as e:
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'error': str(e),
+                    'message': 'Amount stats merge failed'
+                })
+            }
+    
+    elif check_type == 'reconcile':
+        print("🧾 Reconciling report totals against exact sums...")
+        try:
+            start_invocation_budget(context)
+            init_mongodb_connection()
+            if event.get('start_time') and event.get('end_time'):
+                start_time = datetime.fromisoformat(event['start_time'])
+                end_time = datetime.fromisoformat(event['end_time'])
+            else:
+                start_time, end_time, _ = get_report_period(datetime.utcnow())
+            reconciliation = reconcile_revenue(start_time, end_time)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Reconciliation matched' if reconciliation['ok'] else 'Reconciliation found drift',
+                    'start_time': start_time.isoformat(),
+                    'end_time': end_time.isoformat(),
+                    'reconciliation': reconciliation
+                })
+            }
+        except Exception as e:
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'error': str(e),
+                    'message': 'Reconciliation failed'
+                })
+            }
+    
+    elif check_type == 'range_report':
+        days = int(event.get('days', 1))
+        print(f"📆 Building revenue report for the last {days} day(s)...")
+        try:
+            start_invocation_budget(context)
+            init_mongodb_connection()
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(days=days)
+            revenue_data = get_power_transaction_revenue(start_time, end_time)
+            if event.get('notify'):
+                send_revenue_alert(revenue_data, f"Last {days} day(s)", start_time, end_time)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Range report built successfully',
+                    'days': days,
+                    'total_revenue': float(revenue_data['total_amount']),
+                    'transaction_count': revenue_data['total_transactions'],
+                    'utility_breakdown': revenue_data['utility_breakdown'],
+                    'partitions': revenue_data['partitions'],
+                    'fidelity': revenue_data['fidelity']
+                })
+            }
+        except Exception as e:
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'error': str(e),
+                    'message': 'Range report failed'
+                })
+            }
+    
     elif check_type == 'force_run':
         print("🔄 Running forced revenue check...")
         return main_handler(event, context)
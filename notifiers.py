@@ -0,0 +1,282 @@
+import json
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+import boto3
+import requests
+
+from deadline import boto_config
+
+
+DEFAULT_SINK_TIMEOUT_SECONDS = 10
+DEFAULT_SINK_RETRIES = 1
+RETRY_BACKOFF_SECONDS = 0.25
+SMTP_SECRET_TTL_SECONDS = float(os.environ.get('SMTP_SECRET_TTL_SECONDS', '300'))
+
+# Secret name -> ((username, password), fetched at), re-read after the TTL so rotations land
+smtp_credentials_cache = {}
+
+# Keep-alive sessions kept per container so warm invocations skip the TLS
+# handshake. requests.Session is not thread-safe, so every concurrent sender
+# borrows one of its own
+idle_http_sessions = []
+http_sessions_lock = threading.Lock()
+http_sessions_generation = 0
+
+
+@contextmanager
+def borrow_http_session():
+    with http_sessions_lock:
+        session = idle_http_sessions.pop() if idle_http_sessions else requests.Session()
+        generation = http_sessions_generation
+    try:
+        yield session
+    finally:
+        with http_sessions_lock:
+            # A session borrowed before a reset is closed rather than pooled
+            keep = generation == http_sessions_generation
+            if keep:
+                idle_http_sessions.append(session)
+        if not keep:
+            session.close()
+
+
+def prepare_http_session():
+    """Create an idle session ahead of the first send"""
+    with borrow_http_session():
+        pass
+
+
+def reset_http_sessions():
+    global idle_http_sessions, http_sessions_generation
+    with http_sessions_lock:
+        sessions, idle_http_sessions = idle_http_sessions, []
+        http_sessions_generation += 1
+    for session in sessions:
+        session.close()
+
+
+class Sink:
+    """One notification destination; ``send`` raises on failure so dispatch can retry it
+
+    ``parts`` splits a report into separate deliveries. Dispatch sends them in
+    order and a retry resumes at the part that failed, so parts already
+    delivered are never sent twice.
+    """
+
+    kind = 'sink'
+
+    def __init__(self, name=None, timeout=DEFAULT_SINK_TIMEOUT_SECONDS, retries=DEFAULT_SINK_RETRIES, required=False):
+        self.name = name or self.kind
+        self.timeout = float(timeout)
+        self.retries = int(retries)
+        self.required = required
+
+    def parts(self, report):
+        return [report]
+
+    def send(self, report, timeout):
+        raise NotImplementedError
+
+
+class SlackWebhookSink(Sink):
+    kind = 'slack'
+
+    def __init__(self, webhook_url, **options):
+        super().__init__(**options)
+        self.webhook_url = webhook_url
+
+    def parts(self, report):
+        # One webhook post per page
+        return report['slack_messages']
+
+    def send(self, message, timeout):
+        with borrow_http_session() as session:
+            response = session.post(
+                self.webhook_url,
+                json=message,
+                headers={'Content-Type': 'application/json'},
+                timeout=timeout
+            )
+        if response.status_code != 200:
+            raise Exception(f"Slack API error: {response.status_code} - {response.text}")
+
+
+class WebhookSink(Sink):
+    kind = 'webhook'
+
+    def __init__(self, url, headers=None, **options):
+        super().__init__(**options)
+        self.url = url
+        self.headers = headers or {}
+
+    def send(self, report, timeout):
+        with borrow_http_session() as session:
+            response = session.post(
+                self.url,
+                json={'text': report['text'], 'summary': report['summary']},
+                headers={'Content-Type': 'application/json', **self.headers},
+                timeout=timeout
+            )
+        if response.status_code >= 300:
+            raise Exception(f"Webhook error: {response.status_code} - {response.text}")
+
+
+class SNSSink(Sink):
+    kind = 'sns'
+
+    def __init__(self, topic_arn, **options):
+        super().__init__(**options)
+        self.topic_arn = topic_arn
+
+    def send(self, report, timeout):
+        sns_client = boto3.client('sns', config=boto_config(timeout))
+        sns_client.publish(
+            TopicArn=self.topic_arn,
+            # SNS subjects are limited to 100 characters
+            Subject=report['subject'][:100],
+            Message=report['text']
+        )
+
+
+def get_smtp_credentials(secret_name, timeout):
+    """Username and password from a Secrets Manager secret holding ``{"username": ..., "password": ...}``"""
+
+    cached = smtp_credentials_cache.get(secret_name)
+    if cached is not None and time.monotonic() - cached[1] < SMTP_SECRET_TTL_SECONDS:
+        return cached[0]
+
+    secrets_client = boto3.client('secretsmanager', config=boto_config(timeout))
+    secret = json.loads(secrets_client.get_secret_value(SecretId=secret_name)['SecretString'])
+    credentials = (secret['username'], secret['password'])
+    smtp_credentials_cache[secret_name] = (credentials, time.monotonic())
+    return credentials
+
+
+class SMTPSink(Sink):
+    """SMTP mail; login credentials come from the Secrets Manager secret ``credentials_secret``"""
+
+    kind = 'smtp'
+
+    def __init__(self, host, sender, recipients, port=587, credentials_secret=None, use_tls=True, **options):
+        super().__init__(**options)
+        self.host = host
+        self.port = int(port)
+        self.sender = sender
+        self.recipients = recipients
+        self.credentials_secret = credentials_secret
+        self.use_tls = use_tls
+
+    def send(self, report, timeout):
+        deadline = time.monotonic() + timeout
+        credentials = get_smtp_credentials(self.credentials_secret, timeout) if self.credentials_secret else None
+
+        email = EmailMessage()
+        email['Subject'] = report['subject']
+        email['From'] = self.sender
+        email['To'] = ', '.join(self.recipients)
+        email.set_content(report['text'])
+
+        with smtplib.SMTP(self.host, self.port, timeout=max(0.001, deadline - time.monotonic())) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if credentials:
+                smtp.login(*credentials)
+            smtp.send_message(email)
+
+
+SINK_TYPES = {sink_class.kind: sink_class for sink_class in (SlackWebhookSink, WebhookSink, SNSSink, SMTPSink)}
+
+
+def build_sinks(sink_configs, slack_webhook_url=None):
+    """Sinks from ``NOTIFY_SINKS``-style config; a ``slack`` entry without a URL uses the Slack secret"""
+
+    sinks = []
+    for config in sink_configs:
+        config = dict(config)
+        kind = config.pop('type')
+        if kind == 'slack':
+            config.setdefault('webhook_url', slack_webhook_url)
+            config.setdefault('required', True)
+        if kind not in SINK_TYPES:
+            raise ValueError(f"Unknown notification sink type: {kind}")
+        if kind == 'smtp' and ('password' in config or 'username' in config):
+            # NOTIFY_SINKS is a plain environment variable, visible in the console
+            raise ValueError("SMTP credentials must come from Secrets Manager: set credentials_secret instead")
+        sinks.append(SINK_TYPES[kind](**config))
+    return sinks
+
+
+def get_sink_configs():
+    raw_configs = os.environ.get('NOTIFY_SINKS')
+    if not raw_configs:
+        return [{'type': 'slack'}]
+    return json.loads(raw_configs)
+
+
+def run_sink(sink, report, deadline):
+    """Send every part of ``report``; each attempt gets ``sink.timeout`` in total and resumes at the first unsent part"""
+
+    started = time.monotonic()
+    parts = sink.parts(report)
+    sent = 0
+    attempts = 0
+    error = None
+
+    while sent < len(parts) and attempts <= sink.retries:
+        if deadline - time.monotonic() <= 0:
+            error = error or "deadline exceeded before sending"
+            break
+        attempts += 1
+        attempt_deadline = min(deadline, time.monotonic() + sink.timeout)
+        try:
+            while sent < len(parts):
+                remaining = attempt_deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"sink timeout exceeded after {sent} of {len(parts)} parts")
+                sink.send(parts[sent], remaining)
+                sent += 1
+            error = None
+        except Exception as e:
+            error = str(e)
+            print(f"⚠️ {sink.name} attempt {attempts} failed: {error}")
+            if attempts <= sink.retries:
+                time.sleep(min(RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), max(0.0, deadline - time.monotonic())))
+
+    return {
+        'sink': sink.name,
+        'ok': error is None,
+        'attempts': attempts,
+        'latency_ms': round((time.monotonic() - started) * 1000, 1),
+        'error': error
+    }
+
+
+def dispatch_report(sinks, report, deadline_seconds):
+    """Send ``report`` to every sink concurrently; returns one result per sink within ``deadline_seconds``
+
+    Every sink's socket and HTTP timeouts are cut to the time left before the
+    deadline, so all of them finish by then and are joined before returning.
+    No sink thread outlives the call, where Lambda would freeze it mid-send
+    and resume it during a later invocation.
+    """
+
+    if not sinks:
+        return []
+
+    deadline = time.monotonic() + deadline_seconds
+    with ThreadPoolExecutor(max_workers=len(sinks), thread_name_prefix='notify') as executor:
+        futures = {executor.submit(run_sink, sink, report, deadline): sink for sink in sinks}
+    # Leaving the block joined every sink thread
+    results = [future.result() for future in futures]
+
+    for result, sink in zip(results, futures.values()):
+        result['required'] = sink.required
+        status = "✅" if result['ok'] else "❌"
+        print(f"{status} {result['sink']}: {result['latency_ms']}ms ({result['attempts']} attempts) {result['error'] or ''}")
+    return results
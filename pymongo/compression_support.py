@@ -13,9 +13,17 @@
 # limitations under the License.
 from __future__ import annotations
 
+import threading
 import warnings
 from typing import Any, Iterable, Optional, Union
 
+try:
+    import zlib
+
+    _HAVE_ZLIB = True
+except ImportError:
+    _HAVE_ZLIB = False
+
 from pymongo.hello import HelloCompat
 from pymongo.helpers_shared import _SENSITIVE_COMMANDS
 
@@ -34,12 +42,7 @@ def _have_snappy() -> bool:
 
 
 def _have_zlib() -> bool:
-    try:
-        import zlib  # noqa: F401
-
-        return True
-    except ImportError:
-        return False
+    return _HAVE_ZLIB
 
 
 def _have_zstd() -> bool:
@@ -101,21 +104,56 @@ class CompressionSettings:
     def __init__(self, compressors: list[str], zlib_compression_level: int):
         self.compressors = compressors
         self.zlib_compression_level = zlib_compression_level
+        # Optional object that picks the compressor for each new connection
+        # (``choose``), decides per command whether to compress
+        # (``compress_command``) and may wrap contexts to measure them
+        # (``instrument``, ``decompress``, ``received``).
+        self.policy: Any = None
 
     def get_compression_context(
         self, compressors: Optional[list[str]]
     ) -> Union[SnappyContext, ZlibContext, ZstdContext, None]:
         if compressors:
-            chosen = compressors[0]
+            if self.policy is not None:
+                chosen = self.policy.choose(compressors)
+            else:
+                chosen = compressors[0]
+            ctx: Union[SnappyContext, ZlibContext, ZstdContext, None] = None
             if chosen == "snappy":
-                return SnappyContext()
+                ctx = SnappyContext()
             elif chosen == "zlib":
-                return ZlibContext(self.zlib_compression_level)
+                ctx = ZlibContext(self.zlib_compression_level)
             elif chosen == "zstd":
-                return ZstdContext()
-            return None
+                ctx = ZstdContext()
+            if ctx is not None and self.policy is not None:
+                return self.policy.instrument(ctx)
+            return ctx
         return None
 
+    def compress_command(self, name: str) -> bool:
+        """Whether command ``name`` should be sent, and so answered, compressed."""
+        return self.policy is None or self.policy.compress_command(name)
+
+    def decompress(self, data: bytes, compressor_id: int) -> bytes:
+        if self.policy is not None:
+            return self.policy.decompress(data, compressor_id)
+        return decompress(data, compressor_id)
+
+    def received(self, length: int) -> None:
+        """Report the uncompressed length of a reply read off the wire."""
+        if self.policy is not None:
+            self.policy.received(length)
+
+
+def _command_compression_context(
+    conn: Any, name: str
+) -> Union[SnappyContext, ZlibContext, ZstdContext, None]:
+    """The connection's compression context, or None to send ``name`` uncompressed."""
+    ctx = conn.compression_context
+    if ctx and (name.lower() in _NO_COMPRESSION or not conn.compression_settings.compress_command(name)):
+        return None
+    return ctx
+
 
 class SnappyContext:
     compressor_id = 1
@@ -134,22 +172,38 @@ class ZlibContext:
         self.level = level
 
     def compress(self, data: bytes) -> bytes:
-        import zlib
-
         return zlib.compress(data, self.level)
 
 
+# ZstdCompressor and ZstdDecompressor are not thread safe but can be reused
+# for any number of messages, so each thread keeps one of each.
+_zstd_contexts = threading.local()
+
+
+def _zstd_compressor() -> Any:
+    compressor = getattr(_zstd_contexts, "compressor", None)
+    if compressor is None:
+        import zstandard
+
+        compressor = _zstd_contexts.compressor = zstandard.ZstdCompressor()
+    return compressor
+
+
+def _zstd_decompressor() -> Any:
+    decompressor = getattr(_zstd_contexts, "decompressor", None)
+    if decompressor is None:
+        import zstandard
+
+        decompressor = _zstd_contexts.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
 class ZstdContext:
     compressor_id = 3
 
     @staticmethod
     def compress(data: bytes) -> bytes:
-        # ZstdCompressor is not thread safe.
-        # TODO: Use a pool?
-
-        import zstandard
-
-        return zstandard.ZstdCompressor().compress(data)
+        return _zstd_compressor().compress(data)
 
 
 def decompress(data: bytes, compressor_id: int) -> bytes:
@@ -162,14 +216,8 @@ def decompress(data: bytes, compressor_id: int) -> bytes:
 
         return snappy.uncompress(bytes(data))
     elif compressor_id == ZlibContext.compressor_id:
-        import zlib
-
         return zlib.decompress(data)
     elif compressor_id == ZstdContext.compressor_id:
-        # ZstdDecompressor is not thread safe.
-        # TODO: Use a pool?
-        import zstandard
-
-        return zstandard.ZstdDecompressor().decompress(data)
+        return _zstd_decompressor().decompress(data)
     else:
         raise ValueError("Unknown compressorId %d" % (compressor_id,))
@@ -46,6 +46,7 @@ from bson.raw_bson import (
     RawBSONDocument,
     _inflate_bson,
 )
+from pymongo.compression_support import _command_compression_context
 from pymongo.hello import HelloCompat
 from pymongo.monitoring import _EventListeners
 
@@ -1700,7 +1701,7 @@ class _Query:
                 self.db,
                 read_preference,
                 self.codec_options,
-                ctx=conn.compression_context,
+                ctx=_command_compression_context(conn, "find"),
             )
             return request_id, msg, size
 
@@ -1726,7 +1727,7 @@ class _Query:
             spec,
             None if use_cmd else self.fields,
             self.codec_options,
-            ctx=conn.compression_context,
+            ctx=_command_compression_context(conn, "find"),
         )
 
 
@@ -1831,7 +1832,7 @@ class _GetMore:
     ) -> Union[tuple[int, bytes, int], tuple[int, bytes]]:
         """Get a getmore message."""
         ns = self.namespace()
-        ctx = conn.compression_context
+        ctx = _command_compression_context(conn, "getMore")
 
         if use_cmd:
             spec = self.as_command(conn)[0]
@@ -1840,7 +1841,7 @@ class _GetMore:
             else:
                 flags = 0
             request_id, msg, size, _ = _op_msg(
-                flags, spec, self.db, None, self.codec_options, ctx=conn.compression_context
+                flags, spec, self.db, None, self.codec_options, ctx=ctx
             )
             return request_id, msg, size
 
@@ -321,9 +321,98 @@ def wait_for_read(conn: Connection, deadline: Optional[float]) -> None:
             raise socket.timeout("timed out")
 
 
+# Receive buffers larger than this are not kept after use. Each connection
+# keeps up to _RECEIVE_BUFFER_RING_SIZE of them, so the worst case is
+# twice this per pooled connection. Applications may lower or raise it
+# before creating a client.
+_MAX_RETAINED_RECEIVE_BUFFER = 1024 * 1024
+# Buffers kept per connection; a second one covers a reply whose memoryview
+# is still alive (e.g. a RawBSONDocument) while the next one is read.
+_RECEIVE_BUFFER_RING_SIZE = 2
+_MIN_RECEIVE_BUFFER = 64 * 1024
+
+
+def _buffer_in_use(buf: bytearray) -> bool:
+    """Whether a memoryview of ``buf`` is still alive.
+
+    A bytearray with live exports cannot change size, so a one byte append
+    raises BufferError. Buffers are created with room for that byte, so the
+    check never reallocates.
+    """
+    try:
+        buf.append(0)
+    except BufferError:
+        return True
+    del buf[-1]
+    return False
+
+
+class _ReceiveBuffers:
+    """A small ring of reusable receive buffers owned by one connection.
+
+    Replies are read with ``recv_into`` straight into a retained buffer and
+    handed on as a memoryview slice, so decompression and BSON decoding read
+    the bytes where the socket wrote them. A buffer is only reused once every
+    view of the previous reply is gone; otherwise a new one is allocated.
+    """
+
+    __slots__ = ("_ring", "max_retained", "reused", "allocated")
+
+    def __init__(self, max_retained: Optional[int] = None) -> None:
+        self._ring: list[bytearray] = []
+        self.max_retained = (
+            _MAX_RETAINED_RECEIVE_BUFFER if max_retained is None else max_retained
+        )
+        self.reused = 0
+        self.allocated = 0
+
+    def get(self, length: int) -> memoryview:
+        # PyPy lets a bytearray resize under a live memoryview, so
+        # _buffer_in_use cannot tell when reuse is safe there.
+        if _PYPY or length > self.max_retained:
+            self.allocated += 1
+            return memoryview(bytearray(length))
+        victim = None
+        for index, buf in enumerate(self._ring):
+            if _buffer_in_use(buf):
+                continue
+            if len(buf) >= length:
+                self.reused += 1
+                return memoryview(buf)[:length]
+            victim = index
+        # Grow geometrically so a stream of slightly larger replies settles quickly.
+        size = _MIN_RECEIVE_BUFFER
+        while size < length:
+            size *= 2
+        buf = bytearray(min(size, self.max_retained))
+        # Reserve the byte _buffer_in_use appends.
+        buf.append(0)
+        del buf[-1]
+        if victim is not None:
+            self._ring[victim] = buf
+        elif len(self._ring) < _RECEIVE_BUFFER_RING_SIZE:
+            self._ring.append(buf)
+        else:
+            # Every retained buffer is still referenced; drop the oldest.
+            self._ring.pop(0)
+            self._ring.append(buf)
+        self.allocated += 1
+        return memoryview(buf)[:length]
+
+    def clear(self) -> None:
+        self._ring.clear()
+
+    @property
+    def retained_bytes(self) -> int:
+        return sum(len(buf) for buf in self._ring)
+
+
 def receive_data(conn: Connection, length: int, deadline: Optional[float]) -> memoryview:
-    buf = bytearray(length)
-    mv = memoryview(buf)
+    buffers = getattr(conn, "receive_buffers", None)
+    if buffers is not None:
+        mv = buffers.get(length)
+    else:
+        mv = memoryview(bytearray(length))
     bytes_read = 0
     # To support cancelling a network read, we shorten the socket timeout and
     # check for the cancellation signal after each timeout. Alternatively we
@@ -476,6 +565,7 @@ class PyMongoProtocol(BufferedProtocol):
         self._compression_header = memoryview(bytearray(9))
         self._compression_index = 0
         self._message: Optional[memoryview] = None
+        self._receive_buffers = _ReceiveBuffers()
         self._message_index = 0
         # State. TODO: replace booleans with an enum?
         self._expecting_header = True
@@ -592,7 +682,7 @@ class PyMongoProtocol(BufferedProtocol):
                 except ProtocolError as exc:
                     self.close(exc)
                     return
-                self._message = memoryview(bytearray(self._message_size))
+                self._message = self._receive_buffers.get(self._message_size)
             return
         if self._expecting_compression:
             self._compression_index += nbytes
@@ -674,6 +764,7 @@ class PyMongoProtocol(BufferedProtocol):
 
     def connection_lost(self, exc: Optional[Exception] = None) -> None:
         self._resolve_pending_messages(exc)
+        self._receive_buffers.clear()
         if not self._closed.done():
             self._closed.set_result(None)
 
@@ -769,9 +860,15 @@ def receive_message(
         )
     if op_code == 2012:
         op_code, _, compressor_id = _UNPACK_COMPRESSION_HEADER(receive_data(conn, 9, deadline))
-        data = decompress(receive_data(conn, length - 25, deadline), compressor_id)
+        data = receive_data(conn, length - 25, deadline)
+        if conn.compression_settings:
+            data = conn.compression_settings.decompress(data, compressor_id)
+        else:
+            data = decompress(data, compressor_id)
     else:
         data = receive_data(conn, length - 16, deadline)
+    if conn.compression_settings:
+        conn.compression_settings.received(len(data))
 
     try:
         unpack_reply = _UNPACK_REPLY[op_code]
@@ -30,7 +30,7 @@ from typing import (
 
 from bson import _decode_all_selective
 from pymongo import _csot, helpers_shared, message
-from pymongo.compression_support import _NO_COMPRESSION
+from pymongo.compression_support import _command_compression_context
 from pymongo.errors import (
     NotPrimaryError,
     OperationFailure,
@@ -131,8 +131,8 @@ def command(
     if publish:
         speculative_hello = _is_speculative_authenticate(name, spec)
 
-    if compression_ctx and name.lower() in _NO_COMPRESSION:
-        compression_ctx = None
+    if compression_ctx:
+        compression_ctx = _command_compression_context(conn, name)
 
     if client and client._encrypter and not client._encrypter._bypass_auto_encryption:
         spec = orig = client._encrypter.encrypt(dbname, spec, codec_options)
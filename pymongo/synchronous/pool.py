@@ -70,7 +70,7 @@ from pymongo.monitoring import (
     ConnectionCheckOutFailedReason,
     ConnectionClosedReason,
 )
-from pymongo.network_layer import NetworkingInterface, receive_message, sendall
+from pymongo.network_layer import NetworkingInterface, _ReceiveBuffers, receive_message, sendall
 from pymongo.pool_options import PoolOptions
 from pymongo.pool_shared import (
     SSLErrors,
@@ -164,6 +164,7 @@ class Connection:
         self.enabled_for_logging = pool.enabled_for_logging
         self.compression_settings = pool.opts._compression_settings
         self.compression_context: Union[SnappyContext, ZlibContext, ZstdContext, None] = None
+        self.receive_buffers = _ReceiveBuffers()
         self.socket_checker: SocketChecker = SocketChecker()
         self.oidc_token_gen_id: Optional[int] = None
         # Support for mechanism negotiation on the initial handshake.
@@ -578,6 +579,7 @@ class Connection:
             return
         self.closed = True
         self.cancel_context.cancel()
+        self.receive_buffers.clear()
         # Note: We catch exceptions to avoid spurious errors on interpreter
         # shutdown.
         try:
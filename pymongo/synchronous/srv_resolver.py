@@ -17,7 +17,9 @@ from __future__ import annotations
 
 import ipaddress
 import random
-from typing import TYPE_CHECKING, Any, Optional, Union
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
 from pymongo.common import CONNECT_TIMEOUT
 from pymongo.errors import ConfigurationError
@@ -72,6 +74,98 @@ _INVALID_HOST_MSG = (
 )
 
 
+class _SrvCache:
+    """Process-wide SRV hosts and TXT options per SRV name, reused for the records' TTL.
+
+    Entries are plain JSON-compatible dicts so an application can persist them
+    (``on_update`` is called with :meth:`dump` after every fresh lookup) and
+    seed a new process from them with :meth:`load`. Seeded entries are served
+    while their TTL lasts and refreshed in the background. Expired entries are
+    only served, for at most ``max_stale`` seconds, when DNS fails.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._refreshing: set[str] = set()
+        self.on_update: Optional[Callable[[dict[str, dict[str, Any]]], None]] = None
+        self.max_stale = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(
+        self, key: str, hosts: list[tuple[str, Any]], options: Optional[str], ttl: int
+    ) -> dict[str, Any]:
+        now = time.time()
+        entry = {
+            "hosts": [list(host) for host in hosts],
+            "options": options,
+            "resolved_at": now,
+            "expires_at": now + ttl,
+            "seeded": False,
+        }
+        with self._lock:
+            self._entries[key] = entry
+        if self.on_update is not None:
+            self.on_update(self.dump())
+        return entry
+
+    def load(self, entries: dict[str, dict[str, Any]]) -> int:
+        """Seed from a previous process; returns the number of entries taken."""
+        loaded = 0
+        with self._lock:
+            for key, entry in entries.items():
+                current = self._entries.get(key)
+                if current is not None and current["resolved_at"] >= entry["resolved_at"]:
+                    continue
+                self._entries[key] = dict(entry, seeded=True)
+                loaded += 1
+        return loaded
+
+    def dump(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                key: {name: value for name, value in entry.items() if name != "seeded"}
+                for key, entry in self._entries.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale_hits = 0
+
+    def count(self, name: str) -> None:
+        """Increment the ``hits``, ``misses`` or ``stale_hits`` counter."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def refresh_async(self, key: str, refresh: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run() -> None:
+            try:
+                refresh()
+            except Exception:  # noqa: S110
+                # The cached entry stays in use; the next lookup retries.
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="pymongo srv cache refresh", daemon=True).start()
+
+
+_SRV_CACHE = _SrvCache()
+
+
 class _SrvResolver:
     def __init__(
         self,
@@ -98,19 +192,60 @@ class _SrvResolver:
         self.__slen = len(self.__plist)
         self.nparts = len(split_fqdn)
 
-    def get_options(self) -> Optional[str]:
+    @property
+    def _cache_key(self) -> str:
+        return "_" + self.__srv + "._tcp." + self.__fqdn
+
+    def _get_txt_options_and_ttl(self) -> tuple[Optional[str], Optional[int]]:
         from dns import resolver
 
         try:
             results = _resolve(self.__fqdn, "TXT", lifetime=self.__connect_timeout)
         except (resolver.NoAnswer, resolver.NXDOMAIN):
             # No TXT records
-            return None
+            return None, None
         except Exception as exc:
             raise ConfigurationError(str(exc)) from None
         if len(results) > 1:
             raise ConfigurationError("Only one TXT record is supported")
-        return (b"&".join([b"".join(res.strings) for res in results])).decode("utf-8")  # type: ignore[attr-defined]
+        options = (b"&".join([b"".join(res.strings) for res in results])).decode("utf-8")  # type: ignore[attr-defined]
+        return options, (results.rrset.ttl if results.rrset else 0)
+
+    def _refresh_cache(self) -> dict[str, Any]:
+        """Look up SRV and TXT records now and store them in the cache."""
+        results, nodes = self._get_srv_response_and_hosts(True, sample=False)
+        options, txt_ttl = self._get_txt_options_and_ttl()
+        ttl = results.rrset.ttl if results.rrset else 0
+        if txt_ttl is not None:
+            ttl = min(ttl, txt_ttl)
+        return _SRV_CACHE.put(self._cache_key, nodes, options, ttl)
+
+    def _cached_entry(self) -> dict[str, Any]:
+        key = self._cache_key
+        entry = _SRV_CACHE.get(key)
+        now = time.time()
+        if entry is not None and entry["seeded"]:
+            # Seeds come from outside this process; hold them to the same rules.
+            self._validate_hosts([tuple(host) for host in entry["hosts"]])  # type: ignore[misc]
+        if entry is not None and now < entry["expires_at"]:
+            _SRV_CACHE.count("hits")
+            # Refresh seeded entries and ones past half their TTL so the
+            # next lookup (or the next process) starts from fresh records.
+            half_life = (entry["expires_at"] - entry["resolved_at"]) / 2
+            if entry["seeded"] or now > entry["resolved_at"] + half_life:
+                _SRV_CACHE.refresh_async(key, self._refresh_cache)
+            return entry
+        _SRV_CACHE.count("misses")
+        try:
+            return self._refresh_cache()
+        except ConfigurationError:
+            if entry is None or now > entry["expires_at"] + _SRV_CACHE.max_stale:
+                raise
+            _SRV_CACHE.count("stale_hits")
+            return entry
+
+    def get_options(self) -> Optional[str]:
+        return self._cached_entry()["options"]
 
     def _resolve_uri(self, encapsulate_errors: bool) -> resolver.Answer:
         try:
@@ -126,7 +261,7 @@ class _SrvResolver:
         return results
 
     def _get_srv_response_and_hosts(
-        self, encapsulate_errors: bool
+        self, encapsulate_errors: bool, sample: bool = True
     ) -> tuple[resolver.Answer, list[tuple[str, Any]]]:
         results = self._resolve_uri(encapsulate_errors)
 
@@ -136,7 +271,12 @@ class _SrvResolver:
             for res in results
         ]
 
-        # Validate hosts
+        self._validate_hosts(nodes)
+        if sample:
+            nodes = self._sample(nodes)
+        return results, nodes
+
+    def _validate_hosts(self, nodes: list[tuple[str, Any]]) -> None:
         for node in nodes:
             srv_host = node[0].lower()
             if self.__fqdn == srv_host and self.nparts < 3:
@@ -149,15 +289,18 @@ class _SrvResolver:
                 raise ConfigurationError(f"Invalid SRV host: {node[0]}") from None
             if self.__plist != nlist:
                 raise ConfigurationError(f"Invalid SRV host: {node[0]}")
+
+    def _sample(self, nodes: list[tuple[str, Any]]) -> list[tuple[str, Any]]:
         if self.__srv_max_hosts:
             nodes = random.sample(nodes, min(self.__srv_max_hosts, len(nodes)))
-        return results, nodes
+        return nodes
 
     def get_hosts(self) -> list[tuple[str, Any]]:
-        _, nodes = self._get_srv_response_and_hosts(True)
-        return nodes
+        nodes = [tuple(host) for host in self._cached_entry()["hosts"]]
+        return self._sample(nodes)  # type: ignore[arg-type]
 
     def get_hosts_and_min_ttl(self) -> tuple[list[tuple[str, Any]], int]:
+        # SRV polling always asks DNS; the cache only serves client creation.
         results, nodes = self._get_srv_response_and_hosts(False)
         rrset = results.rrset
         ttl = rrset.ttl if rrset else 0
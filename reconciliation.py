@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from bson.decimal128 import Decimal128
+
+from cursor_stream import CursorStats, stream_transactions
+from deadline import mongo_budget
+
+
+RECONCILE_PARTITIONS = int(os.environ.get('RECONCILE_PARTITIONS', '4'))
+RECONCILE_MAX_SECONDS = float(os.environ.get('RECONCILE_MAX_SECONDS', '120'))
+# Float sums in the report drift from exact Decimal sums by far less than a kobo
+RECONCILE_TOLERANCE = Decimal(os.environ.get('RECONCILE_TOLERANCE', '0.01'))
+MAX_OFFENDING_DOCUMENTS = 100
+
+
+def split_range(start_time, end_time, parts):
+    """``parts`` contiguous (start, end, inclusive_end) sub-ranges covering [start_time, end_time]"""
+
+    parts = max(1, parts)
+    step = (end_time - start_time) / parts
+    bounds = [start_time + step * index for index in range(parts)] + [end_time]
+    return [(bounds[index], bounds[index + 1], index == parts - 1) for index in range(parts)]
+
+
+def parse_amount(value):
+    """Exact Decimal for a stored amount, or None when it is missing or malformed"""
+
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, Decimal128):
+        amount = value.to_decimal()
+    elif isinstance(value, (int, float, str)):
+        try:
+            # str() first so floats keep their shortest repr instead of binary expansion
+            amount = Decimal(str(value).strip())
+        except InvalidOperation:
+            return None
+    else:
+        return None
+    return amount if amount.is_finite() else None
+
+
+def reconcile_partition(collection, sub_start, sub_end, inclusive_end, stats):
+    created_at = {'$gte': sub_start, '$lte' if inclusive_end else '$lt': sub_end}
+    totals = {}
+    malformed = []
+
+    # pymongo.timeout() is a contextvar and does not follow work into pool threads
+    with mongo_budget(RECONCILE_MAX_SECONDS):
+        for docs in stream_transactions(collection, {'createdAt': created_at, 'status': 'fulfilled'}, stats=stats):
+            for doc in docs:
+                # Same key as get_power_transaction_revenue: no util means no breakdown row
+                util = doc.get('util') or None
+                amount = parse_amount(doc.get('amount'))
+                if amount is None:
+                    malformed.append({'_id': str(doc['_id']), 'util': util, 'amount': repr(doc.get('amount'))})
+                    continue
+                util_totals = totals.setdefault(util, {'amount': Decimal(0), 'transactions': 0})
+                util_totals['amount'] += amount
+                util_totals['transactions'] += 1
+
+    return totals, malformed
+
+
+def reconcile_window(collection, start_time, end_time, revenue_data, partitions=RECONCILE_PARTITIONS):
+    """Recompute fulfilled revenue per utility with Decimal sums and compare it with ``revenue_data``"""
+
+    ranges = split_range(start_time, end_time, partitions)
+    stats_per_range = [CursorStats() for _ in ranges]
+
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='reconcile') as executor:
+        partials = list(executor.map(
+            lambda args: reconcile_partition(collection, *args),
+            [(sub_start, sub_end, inclusive_end, stats) for (sub_start, sub_end, inclusive_end), stats in zip(ranges, stats_per_range)]
+        ))
+
+    recomputed = {}
+    malformed = []
+    for totals, partition_malformed in partials:
+        malformed.extend(partition_malformed)
+        for util, util_totals in totals.items():
+            merged = recomputed.setdefault(util, {'amount': Decimal(0), 'transactions': 0})
+            merged['amount'] += util_totals['amount']
+            merged['transactions'] += util_totals['transactions']
+
+    reported = {util_data['util']: util_data for util_data in revenue_data['utility_breakdown']}
+    malformed_per_util = {}
+    for doc in malformed:
+        if doc['util']:
+            malformed_per_util[doc['util']] = malformed_per_util.get(doc['util'], 0) + 1
+
+    drift = []
+    for util in sorted((set(reported) | set(recomputed) | set(malformed_per_util)) - {None}):
+        reported_amount = Decimal(str(reported.get(util, {}).get('amount', 0)))
+        reported_transactions = reported.get(util, {}).get('transactions', 0)
+        util_totals = recomputed.get(util, {'amount': Decimal(0), 'transactions': 0})
+        difference = util_totals['amount'] - reported_amount
+        if abs(difference) > RECONCILE_TOLERANCE or util_totals['transactions'] != reported_transactions or malformed_per_util.get(util):
+            drift.append({
+                'util': util,
+                'reported_amount': float(reported_amount),
+                'recomputed_amount': str(util_totals['amount']),
+                'difference': str(difference),
+                'reported_transactions': reported_transactions,
+                'recomputed_transactions': util_totals['transactions'],
+                'malformed_transactions': malformed_per_util.get(util, 0)
+            })
+
+    # The report's total includes transactions without a util, its breakdown does not
+    unattributed = recomputed.get(None, {'amount': Decimal(0), 'transactions': 0})
+    total_recomputed = sum((util_totals['amount'] for util_totals in recomputed.values()), Decimal(0))
+    docs = sum(stats.docs for stats in stats_per_range)
+    # Partitions run concurrently, so wall time is the slowest partition
+    seconds = max([stats.seconds for stats in stats_per_range] + [0.0])
+
+    result = {
+        'ok': not drift,
+        'fidelity': revenue_data.get('fidelity', 'full'),
+        'partitions': len(ranges),
+        'reported_total': float(revenue_data['total_amount']),
+        'recomputed_total': str(total_recomputed),
+        'drift': drift,
+        'unattributed': {'amount': str(unattributed['amount']), 'transactions': unattributed['transactions']},
+        'malformed_count': len(malformed),
+        'offending_documents': malformed[:MAX_OFFENDING_DOCUMENTS],
+        'documents_scanned': docs,
+        'docs_per_second': round(docs / seconds, 1) if seconds else 0.0
+    }
+
+    if drift:
+        print(f"⚠️ Reconciliation found drift in {len(drift)} utilities ({len(malformed)} malformed amounts)")
+        for row in drift:
+            print(f"   {row['util']}: reported {row['reported_amount']}, recomputed {row['recomputed_amount']} ({row['difference']})")
+    else:
+        print(f"✅ Reconciliation matched: {result['recomputed_total']} over {docs:,} documents")
+    return result
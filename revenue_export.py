@@ -0,0 +1,264 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import boto3
+
+from cursor_stream import CursorStats, stream_transactions
+from deadline import boto_config, mongo_budget, stage_budget
+
+# Parquet output is optional; NDJSON needs nothing beyond the standard library
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+EXPORT_MAX_SECONDS = float(os.environ.get('EXPORT_MAX_SECONDS', '30'))
+DEFAULT_EXPORT_BATCH_SIZE = 1000
+
+FILE_EXTENSIONS = {
+    'ndjson': 'ndjson.gz',
+    'parquet': 'parquet'
+}
+
+RAW_TRANSACTION_FIELDS = ['createdAt', 'util', 'status', 'amount', 'meterNumber', 'customerId']
+RAW_EXTRA_FIELDS = ('meterNumber', 'customerId')
+
+# Parquet column types (pyarrow aliases) for each dataset. Inferring them from
+# the first batch would type a column that starts out all null as null, and
+# later batches with values could not be cast to it.
+WINDOW_AGGREGATE_COLUMNS = {
+    'window_start': 'timestamp[us]',
+    'window_end': 'timestamp[us]',
+    'util': 'string',
+    'amount': 'double',
+    'transactions': 'int64',
+    'failed_amount': 'double',
+    'failed_transactions': 'int64',
+    'pending_transactions': 'int64',
+    'fidelity': 'string',
+    'exported_at': 'timestamp[us]'
+}
+RAW_TRANSACTION_COLUMNS = {
+    '_id': 'string',
+    'createdAt': 'timestamp[us]',
+    'util': 'string',
+    'status': 'string',
+    'amount': 'string',
+    'meterNumber': 'string',
+    'customerId': 'string'
+}
+
+
+def get_export_settings():
+    """Export configuration from the environment; ``target`` is None when exports are off"""
+    return {
+        'target': os.environ.get('EXPORT_TARGET') or None,
+        'format': os.environ.get('EXPORT_FORMAT', 'ndjson'),
+        'raw_transactions': os.environ.get('EXPORT_RAW_TRANSACTIONS', 'false').lower() == 'true',
+        'batch_size': int(os.environ.get('EXPORT_BATCH_SIZE', str(DEFAULT_EXPORT_BATCH_SIZE))),
+        # For S3-compatible stores (MinIO, R2, ...); unset means AWS S3
+        's3_endpoint_url': os.environ.get('EXPORT_S3_ENDPOINT_URL') or None
+    }
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class NDJSONWriter:
+    """Gzip-compressed newline-delimited JSON, one record per line"""
+
+    def __init__(self, path, columns=None):
+        self._file = gzip.open(path, 'wb')
+
+    def write_batch(self, rows):
+        self._file.write("".join([json.dumps(row, default=json_default) + "\n" for row in rows]).encode())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Parquet via pyarrow; each batch becomes one row group so memory stays bounded by the batch size
+
+    ``columns`` maps column names to pyarrow type aliases. Without it the
+    schema is inferred from the first batch.
+    """
+
+    def __init__(self, path, columns=None):
+        if pyarrow is None:
+            raise RuntimeError("EXPORT_FORMAT=parquet needs pyarrow, which is not installed")
+        self._path = path
+        self._schema = None
+        self._writer = None
+        if columns:
+            self._schema = pyarrow.schema([(name, pyarrow.type_for_alias(alias)) for name, alias in columns.items()])
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression='zstd')
+
+    def write_batch(self, rows):
+        table = pyarrow.Table.from_pylist(rows, schema=self._schema)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._path, table.schema, compression='zstd')
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS = {
+    'ndjson': NDJSONWriter,
+    'parquet': ParquetWriter
+}
+
+
+def export_path(dataset, start_time, end_time, file_format):
+    """Hive-style date partition so BI tools can prune by day"""
+    return (
+        f"{dataset}/date={start_time:%Y-%m-%d}/"
+        f"{start_time:%Y%m%dT%H%M}-{end_time:%Y%m%dT%H%M}.{FILE_EXTENSIONS[file_format]}"
+    )
+
+
+def write_export(target, relative_path, batches, file_format, columns=None, s3_endpoint_url=None):
+    """Stream ``batches`` into one file under ``target`` (a directory or ``s3://bucket/prefix``)
+
+    Rows are written batch by batch to a temporary file, which only replaces the
+    destination once complete, so an interrupted export never leaves a partial file.
+    ``columns`` declares the Parquet schema; ``s3_endpoint_url`` points the S3
+    client at an S3-compatible store instead of AWS.
+    """
+
+    is_s3 = target.startswith('s3://')
+    if is_s3:
+        bucket, _, prefix = target[len('s3://'):].partition('/')
+        key = f"{prefix.rstrip('/')}/{relative_path}" if prefix else relative_path
+        staging_dir = tempfile.gettempdir()
+        destination = f"s3://{bucket}/{key}"
+    else:
+        destination = os.path.join(target, relative_path)
+        staging_dir = os.path.dirname(destination)
+        os.makedirs(staging_dir, exist_ok=True)
+
+    handle, staging_path = tempfile.mkstemp(dir=staging_dir, suffix='.partial')
+    os.close(handle)
+    rows = 0
+    try:
+        writer = WRITERS[file_format](staging_path, columns)
+        try:
+            for batch in batches:
+                if batch:
+                    writer.write_batch(batch)
+                    rows += len(batch)
+        finally:
+            writer.close()
+
+        size = os.path.getsize(staging_path)
+        if is_s3:
+            s3_client = boto3.client('s3', endpoint_url=s3_endpoint_url, config=boto_config(EXPORT_MAX_SECONDS))
+            # upload_file streams from disk in multipart chunks
+            s3_client.upload_file(staging_path, bucket, key)
+        else:
+            os.replace(staging_path, destination)
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+    return {'path': destination, 'rows': rows, 'bytes': size}
+
+
+def window_aggregate_rows(start_time, end_time, revenue_data, exported_at):
+    """One row per utility with the window's totals and vending health"""
+
+    health = {util_data['util']: util_data for util_data in revenue_data.get('status_breakdown', [])}
+    rows = []
+    for util_data in revenue_data['utility_breakdown']:
+        util_health = health.get(util_data['util'], {})
+        rows.append({
+            'window_start': start_time,
+            'window_end': end_time,
+            'util': util_data['util'],
+            'amount': util_data['amount'],
+            'transactions': util_data['transactions'],
+            'failed_amount': util_health.get('failed_amount', 0.0),
+            'failed_transactions': util_health.get('failed_transactions', 0),
+            'pending_transactions': util_health.get('pending_transactions', 0),
+            'fidelity': revenue_data.get('fidelity', 'full'),
+            'exported_at': exported_at
+        })
+    return rows
+
+
+def iter_fulfilled_batches(collection, start_time, end_time, batch_size, stats=None):
+    """Fulfilled transactions in the window as lists of at most ``batch_size`` flat rows"""
+
+    for docs in stream_transactions(
+        collection,
+        {'createdAt': {'$gte': start_time, '$lte': end_time}, 'status': 'fulfilled'},
+        extra_fields=RAW_EXTRA_FIELDS,
+        stats=stats,
+        max_batch_size=batch_size
+    ):
+        batch = []
+        for doc in docs:
+            row = {'_id': str(doc['_id'])}
+            for field in RAW_TRANSACTION_FIELDS:
+                row[field] = doc.get(field)
+            # Amounts are stored as both strings and numbers; keep the original text too
+            row['amount'] = None if row['amount'] is None else str(row['amount'])
+            batch.append(row)
+        yield batch
+
+
+def export_window(database, start_time, end_time, revenue_data, settings=None):
+    """Write the window's per-utility aggregate (and optionally its raw fulfilled transactions)"""
+
+    settings = settings or get_export_settings()
+    if not settings['target']:
+        return []
+    if revenue_data.get('fidelity') == 'unavailable':
+        print("📦 Skipping export: no revenue data for this window")
+        return []
+    if settings['format'] not in WRITERS:
+        raise ValueError(f"Unknown EXPORT_FORMAT: {settings['format']}")
+
+    exported_at = datetime.utcnow()
+    results = [write_export(
+        settings['target'],
+        export_path('window_aggregates', start_time, end_time, settings['format']),
+        [window_aggregate_rows(start_time, end_time, revenue_data, exported_at)],
+        settings['format'],
+        WINDOW_AGGREGATE_COLUMNS,
+        settings.get('s3_endpoint_url')
+    )]
+
+    if settings['raw_transactions']:
+        export_budget = stage_budget(EXPORT_MAX_SECONDS)
+        if export_budget < 1:
+            print("⏳ Not enough time left to export raw transactions")
+        else:
+            stats = CursorStats()
+            with mongo_budget(export_budget):
+                raw_result = write_export(
+                    settings['target'],
+                    export_path('fulfilled_transactions', start_time, end_time, settings['format']),
+                    iter_fulfilled_batches(
+                        database['power_transaction_items'], start_time, end_time, settings['batch_size'], stats
+                    ),
+                    settings['format'],
+                    RAW_TRANSACTION_COLUMNS,
+                    settings.get('s3_endpoint_url')
+                )
+            raw_result['cursor'] = stats.as_dict()
+            results.append(raw_result)
+
+    for result in results:
+        print(f"📦 Exported {result['rows']} rows ({result['bytes']:,} bytes) to {result['path']}")
+    return results
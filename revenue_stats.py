@@ -0,0 +1,123 @@
+import math
+
+
+# Relative accuracy of the log-bucketed amount sketch. Each bucket covers
+# amounts within +/-1% of its representative value, so a utility with ticket
+# sizes from ₦100 to ₦1,000,000 needs at most ~460 buckets regardless of how
+# many transactions landed in the window.
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_LN_GAMMA = math.log(SKETCH_GAMMA)
+
+REPORT_PERCENTILES = [0.5, 0.9, 0.99]
+
+HISTOGRAM_EDGES = [1000, 2000, 5000, 10000, 20000, 50000]
+
+
+def percentile_key(quantile):
+    return f"p{round(quantile * 100):g}"
+
+
+def sketch_bucket_expression(field):
+    """Server-side expression mapping an amount to its sketch bucket index (None for non-positive)"""
+    return {
+        '$cond': {
+            'if': {'$gt': [field, 0]},
+            'then': {'$ceil': {'$divide': [{'$ln': field}, SKETCH_LN_GAMMA]}},
+            'else': None
+        }
+    }
+
+
+def bucket_index(amount):
+    if amount <= 0:
+        return None
+    return math.ceil(math.log(amount) / SKETCH_LN_GAMMA)
+
+
+def bucket_value(index):
+    if index is None:
+        return 0.0
+    return 2 * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1)
+
+
+def sketches_from_rows(rows):
+    """Turn ``{_id: {util, bucket}, count}`` group rows into per-utility sketches"""
+    sketches = {}
+    for row in rows:
+        key = row.get('_id') or {}
+        index = key.get('bucket')
+        if index is not None:
+            index = int(index)
+        counts = sketches.setdefault(key.get('util'), {})
+        counts[index] = counts.get(index, 0) + int(row.get('count') or 0)
+    return sketches
+
+
+def merge_sketches(*sketches):
+    merged = {}
+    for counts in sketches:
+        for index, count in counts.items():
+            merged[index] = merged.get(index, 0) + count
+    return merged
+
+
+def sketch_quantiles(counts, quantiles=REPORT_PERCENTILES):
+    total = sum(counts.values())
+    if not total:
+        return [None for _ in quantiles]
+
+    ordered = sorted(counts.items(), key=lambda item: float('-inf') if item[0] is None else item[0])
+    values = []
+    for q in quantiles:
+        rank = q * (total - 1)
+        cumulative = 0
+        for index, count in ordered:
+            cumulative += count
+            if cumulative > rank:
+                values.append(bucket_value(index))
+                break
+    return values
+
+
+def sketch_histogram(counts, edges=HISTOGRAM_EDGES):
+    bins = [0] * (len(edges) + 1)
+    for index, count in counts.items():
+        value = bucket_value(index)
+        position = 0
+        while position < len(edges) and value >= edges[position]:
+            position += 1
+        bins[position] += count
+    return bins
+
+
+def histogram_labels(edges=HISTOGRAM_EDGES):
+    def short(amount):
+        return f"{amount // 1000}k" if amount >= 1000 else str(amount)
+
+    labels = [f"<{short(edges[0])}"]
+    for low, high in zip(edges, edges[1:]):
+        labels.append(f"{short(low)}-{short(high)}")
+    labels.append(f"≥{short(edges[-1])}")
+    return labels
+
+
+SPARKLINE_BARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values):
+    peak = max(values) if values else 0
+    if not peak:
+        return SPARKLINE_BARS[0] * len(values)
+    # Zero stays on the baseline so empty bins are distinguishable from small ones
+    scale = (len(SPARKLINE_BARS) - 2) / peak
+    return "".join([SPARKLINE_BARS[1 + int(value * scale)] if value else SPARKLINE_BARS[0] for value in values])
+
+
+def encode_sketch(counts):
+    """BSON keys must be strings, so bucket indexes are stored as text ('null' for non-positive amounts)"""
+    return {('null' if index is None else str(index)): count for index, count in counts.items()}
+
+
+def decode_sketch(stored):
+    return {(None if key == 'null' else int(key)): int(count) for key, count in (stored or {}).items()}
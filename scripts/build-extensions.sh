@@ -0,0 +1,40 @@
+#!/bin/bash
+
+# Build the bundled bson C extension for the Lambda runtime
+# Usage: ./scripts/build-extensions.sh [python]
+#
+# The compiled bson/_cbson*.so is not committed, so run this before
+# `sam build` / `sam deploy`. With docker available, the extension is built
+# inside the SAM python3.12 build image so it links against Lambda's glibc;
+# otherwise it is built with the given local interpreter (default python3.12).
+
+set -e
+
+ROOT="$(cd "$(dirname "$0")/.." && pwd)"
+PYTHON=${1:-python3.12}
+IMAGE="public.ecr.aws/sam/build-python3.12"
+
+if [ -z "$IN_BUILD_IMAGE" ] && command -v docker >/dev/null 2>&1; then
+    echo "🐳 Building in $IMAGE"
+    docker run --rm -v "$ROOT":/var/task -w /var/task -e IN_BUILD_IMAGE=1 \
+        "$IMAGE" ./scripts/build-extensions.sh python3.12
+    exit 0
+fi
+
+INCLUDE=$("$PYTHON" -c "import sysconfig; print(sysconfig.get_paths()['include'])")
+SUFFIX=$("$PYTHON" -c "import sysconfig; print(sysconfig.get_config_var('EXT_SUFFIX'))")
+
+echo "🔨 Building bson/_cbson$SUFFIX with $PYTHON"
+cd "$ROOT/bson"
+gcc -shared -fPIC -O2 -Wall -Wno-unused-function -I"$INCLUDE" -I. \
+    _cbsonmodule.c buffer.c time64.c -o "_cbson$SUFFIX"
+
+"$PYTHON" -c "
+import sys
+sys.path.insert(0, '$ROOT')
+import bson
+assert bson.has_c(), 'bson did not load the C extension'
+from bson import _cbson
+assert hasattr(_cbson, '_decode_columns'), 'stale _cbson build'
+print('✅ bson C extension loaded:', _cbson.__file__)
+"
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+
+import boto3
+from pymongo.synchronous.srv_resolver import _SRV_CACHE
+
+from deadline import boto_config
+
+
+# Survives warm restarts and SnapStart snapshots of this environment
+SRV_CACHE_FILE = os.environ.get('SRV_CACHE_FILE', os.path.join(tempfile.gettempdir(), 'mongodb-srv-cache.json'))
+# Optional SSM parameter shared by every environment, so fresh cold starts get a seed too
+SRV_CACHE_PARAMETER = os.environ.get('SRV_CACHE_PARAMETER') or None
+# How long past their TTL cached records may still be used when DNS fails
+SRV_CACHE_MAX_STALE_SECONDS = float(os.environ.get('SRV_CACHE_MAX_STALE_SECONDS', '86400'))
+SRV_CACHE_SSM_MAX_SECONDS = 3
+
+installed = False
+# Records last read from or written to SRV_CACHE_PARAMETER, None when unknown
+parameter_seed = None
+
+
+def read_seed():
+    """Cached SRV/TXT records from the local file, else from SSM; {} when there are none"""
+
+    try:
+        with open(SRV_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    global parameter_seed
+
+    if SRV_CACHE_PARAMETER:
+        try:
+            ssm_client = boto3.client('ssm', config=boto_config(SRV_CACHE_SSM_MAX_SECONDS))
+            parameter_seed = json.loads(ssm_client.get_parameter(Name=SRV_CACHE_PARAMETER)['Parameter']['Value'])
+            return parameter_seed
+        except Exception as e:
+            print(f"⚠️ Could not read SRV seed from {SRV_CACHE_PARAMETER}: {e}")
+    return {}
+
+
+def seed_changed(entries):
+    """Whether SRV_CACHE_PARAMETER lacks these hosts/options, or holds them too close to going stale"""
+
+    if parameter_seed is None:
+        return True
+    for key, entry in entries.items():
+        stored = parameter_seed.get(key)
+        if stored is None or stored.get('options') != entry['options']:
+            return True
+        if sorted(map(tuple, stored.get('hosts', []))) != sorted(map(tuple, entry['hosts'])):
+            return True
+        # Rewrite well before the stored copy is too old to cover a DNS outage
+        if entry['resolved_at'] - stored.get('resolved_at', 0) > SRV_CACHE_MAX_STALE_SECONDS / 2:
+            return True
+    return False
+
+
+def write_seed(entries):
+    """Persist fresh records: always to the file, to SSM only when the hosts changed"""
+
+    payload = json.dumps(entries)
+    try:
+        handle, staging_path = tempfile.mkstemp(dir=os.path.dirname(SRV_CACHE_FILE), suffix='.partial')
+        with os.fdopen(handle, 'w') as f:
+            f.write(payload)
+        os.replace(staging_path, SRV_CACHE_FILE)
+    except OSError as e:
+        print(f"⚠️ Could not write SRV cache file: {e}")
+
+    if SRV_CACHE_PARAMETER and seed_changed(entries):
+        put_seed_parameter(entries, payload)
+
+
+def put_seed_parameter(entries, payload):
+    """Store the seed in SSM within SRV_CACHE_SSM_MAX_SECONDS of the remaining budget"""
+
+    global parameter_seed
+
+    try:
+        ssm_client = boto3.client('ssm', config=boto_config(SRV_CACHE_SSM_MAX_SECONDS))
+        ssm_client.put_parameter(Name=SRV_CACHE_PARAMETER, Value=payload, Type='String', Overwrite=True)
+        parameter_seed = entries
+        print(f"🧭 Stored SRV seed in {SRV_CACHE_PARAMETER}")
+    except Exception as e:
+        print(f"⚠️ Could not store SRV seed in {SRV_CACHE_PARAMETER}: {e}")
+
+
+def install_srv_cache():
+    """Seed pymongo's SRV cache and persist every fresh lookup; once per process"""
+
+    global installed
+
+    if installed:
+        return
+    _SRV_CACHE.max_stale = SRV_CACHE_MAX_STALE_SECONDS
+    loaded = _SRV_CACHE.load(read_seed())
+    _SRV_CACHE.on_update = write_seed
+    installed = True
+    if loaded:
+        print(f"🧭 Seeded SRV cache with {loaded} record sets")
+
+
+def srv_cache_stats():
+    return {'hits': _SRV_CACHE.hits, 'misses': _SRV_CACHE.misses, 'stale_hits': _SRV_CACHE.stale_hits}
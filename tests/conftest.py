@@ -0,0 +1,17 @@
+import sys
+import os
+
+import pytest
+
+# Make the Lambda modules and the test helpers importable from every test module
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, TESTS_DIR)
+
+from harness import LambdaHarness
+
+
+@pytest.fixture
+def lambda_harness():
+    with LambdaHarness() as harness:
+        yield harness
@@ -0,0 +1,596 @@
+"""In-process stand-in for the parts of MongoDB the alert Lambda uses.
+
+Supports the query operators, aggregation stages and expressions that
+``lambda_function`` sends (``$match``/``$addFields``/``$facet``/``$group`` and
+friends) with MongoDB's semantics where they matter for the report, e.g.
+``$toDouble`` failing the whole pipeline on a malformed amount.
+"""
+import copy
+import itertools
+import math
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from bson.codec_options import DEFAULT_CODEC_OPTIONS
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import ReadPreference
+from pymongo.read_concern import ReadConcern
+
+
+MISSING = object()
+
+
+def get_path(doc, path):
+    value = doc
+    for part in path.split('.'):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return MISSING
+    return value
+
+
+def set_path(doc, path, value):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def sort_key(value):
+    """Approximation of MongoDB's cross-type comparison order"""
+    if value is MISSING or value is None:
+        return (1, 0)
+    if isinstance(value, bool):
+        return (8, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, dict):
+        return (4, [(k, sort_key(v)) for k, v in value.items()])
+    if isinstance(value, list):
+        return (5, [sort_key(v) for v in value])
+    if isinstance(value, ObjectId):
+        return (7, value.binary)
+    if isinstance(value, datetime):
+        return (9, value)
+    return (10, repr(value))
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return tuple((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def bson_type(value):
+    if value is MISSING:
+        return 'missing'
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int' if -2**31 <= value < 2**31 else 'long'
+    if isinstance(value, float):
+        return 'double'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, datetime):
+        return 'date'
+    if isinstance(value, ObjectId):
+        return 'objectId'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    return type(value).__name__
+
+
+def to_string(value):
+    if value is None or value is MISSING:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+    return str(value)
+
+
+def to_double(value):
+    if value is None or value is MISSING:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise OperationFailure(f"Failed to parse number '{value}' in $convert with no onError value", code=241)
+
+
+def date_trunc(args, doc):
+    date = evaluate(args['date'], doc)
+    unit = evaluate(args['unit'], doc)
+    if date is None:
+        return None
+    if unit == 'hour':
+        return date.replace(minute=0, second=0, microsecond=0)
+    if unit == 'day':
+        return date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == 'minute':
+        return date.replace(second=0, microsecond=0)
+    raise OperationFailure(f"$dateTrunc unit '{unit}' not supported by the fake engine")
+
+
+def numeric(args, doc, fn):
+    values = [evaluate(arg, doc) for arg in (args if isinstance(args, list) else [args])]
+    if any(v is None or v is MISSING for v in values):
+        return None
+    return fn(*values)
+
+
+def compare(op):
+    def apply(args, doc):
+        left, right = (evaluate(arg, doc) for arg in args)
+        return op(sort_key(left), sort_key(right))
+    return apply
+
+
+def cond(args, doc):
+    if isinstance(args, list):
+        condition, then, otherwise = args
+    else:
+        condition, then, otherwise = args['if'], args['then'], args['else']
+    return evaluate(then if truthy(evaluate(condition, doc)) else otherwise, doc)
+
+
+def truthy(value):
+    return value not in (None, False, 0, MISSING)
+
+
+EXPRESSIONS = {
+    '$cond': cond,
+    '$eq': compare(lambda a, b: a == b),
+    '$ne': compare(lambda a, b: a != b),
+    '$gt': compare(lambda a, b: a > b),
+    '$gte': compare(lambda a, b: a >= b),
+    '$lt': compare(lambda a, b: a < b),
+    '$lte': compare(lambda a, b: a <= b),
+    '$and': lambda args, doc: all(truthy(evaluate(arg, doc)) for arg in args),
+    '$or': lambda args, doc: any(truthy(evaluate(arg, doc)) for arg in args),
+    '$not': lambda args, doc: not truthy(evaluate(args[0] if isinstance(args, list) else args, doc)),
+    '$in': lambda args, doc: evaluate(args[0], doc) in evaluate(args[1], doc),
+    '$ifNull': lambda args, doc: next((v for v in (evaluate(arg, doc) for arg in args) if v not in (None, MISSING)), None),
+    '$type': lambda args, doc: bson_type(evaluate_raw(args[0] if isinstance(args, list) else args, doc)),
+    '$toString': lambda args, doc: to_string(evaluate(args, doc)),
+    '$toDouble': lambda args, doc: to_double(evaluate(args, doc)),
+    '$add': lambda args, doc: numeric(args, doc, lambda *v: sum(v)),
+    '$subtract': lambda args, doc: numeric(args, doc, lambda a, b: a - b),
+    '$multiply': lambda args, doc: numeric(args, doc, lambda *v: math.prod(v)),
+    '$divide': lambda args, doc: numeric(args, doc, lambda a, b: a / b),
+    '$ceil': lambda args, doc: numeric(args, doc, math.ceil),
+    '$floor': lambda args, doc: numeric(args, doc, math.floor),
+    '$ln': lambda args, doc: numeric(args, doc, math.log),
+    '$log10': lambda args, doc: numeric(args, doc, math.log10),
+    '$max': lambda args, doc: max((evaluate(arg, doc) for arg in args), key=sort_key),
+    '$min': lambda args, doc: min((evaluate(arg, doc) for arg in args), key=sort_key),
+    '$concat': lambda args, doc: numeric(args, doc, lambda *v: ''.join(v)),
+    '$dateTrunc': date_trunc,
+    '$slice': lambda args, doc: (evaluate(args[0], doc) or [])[:evaluate(args[1], doc)],
+}
+
+
+def evaluate_raw(expr, doc):
+    if isinstance(expr, str) and expr.startswith('$'):
+        if expr == '$$ROOT':
+            return doc
+        return get_path(doc, expr[1:])
+    if isinstance(expr, dict):
+        if len(expr) == 1 and next(iter(expr)).startswith('$'):
+            op, args = next(iter(expr.items()))
+            if op == '$literal':
+                return args
+            if op not in EXPRESSIONS:
+                raise OperationFailure(f"Unrecognized expression '{op}'", code=168)
+            return EXPRESSIONS[op](args, doc)
+        return {key: evaluate(value, doc) for key, value in expr.items()}
+    if isinstance(expr, list):
+        return [evaluate(item, doc) for item in expr]
+    return expr
+
+
+def evaluate(expr, doc):
+    value = evaluate_raw(expr, doc)
+    return None if value is MISSING else value
+
+
+def same_type_class(left, right):
+    return sort_key(left)[0] == sort_key(right)[0]
+
+
+QUERY_OPERATORS = {
+    '$eq': lambda value, arg: value_equals(value, arg),
+    '$ne': lambda value, arg: not value_equals(value, arg),
+    '$gt': lambda value, arg: same_type_class(value, arg) and sort_key(value) > sort_key(arg),
+    '$gte': lambda value, arg: same_type_class(value, arg) and sort_key(value) >= sort_key(arg),
+    '$lt': lambda value, arg: same_type_class(value, arg) and sort_key(value) < sort_key(arg),
+    '$lte': lambda value, arg: same_type_class(value, arg) and sort_key(value) <= sort_key(arg),
+    '$in': lambda value, arg: any(value_equals(value, item) for item in arg),
+    '$nin': lambda value, arg: not any(value_equals(value, item) for item in arg),
+    '$exists': lambda value, arg: (value is not MISSING) == bool(arg),
+}
+
+
+def value_equals(value, arg):
+    if value is MISSING:
+        return arg is None
+    if isinstance(value, list) and not isinstance(arg, list):
+        return arg in value
+    return value == arg
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if key == '$and':
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == '$or':
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == '$expr':
+            if not truthy(evaluate(condition, doc)):
+                return False
+        else:
+            value = get_path(doc, key)
+            if isinstance(condition, dict) and condition and all(op.startswith('$') for op in condition):
+                for op, arg in condition.items():
+                    if op not in QUERY_OPERATORS:
+                        raise OperationFailure(f"unknown operator: {op}", code=2)
+                    if not QUERY_OPERATORS[op](value, arg):
+                        return False
+            elif not value_equals(value, condition):
+                return False
+    return True
+
+
+# Servers older than these reject the operator when the pipeline is parsed
+OPERATOR_MIN_VERSIONS = {'$dateTrunc': [5, 0], '$topN': [5, 2], '$percentile': [7, 0]}
+
+
+def check_operators(value, server_version):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if server_version < OPERATOR_MIN_VERSIONS.get(key, [0]):
+                raise OperationFailure(f"Unrecognized expression '{key}'", code=168)
+            check_operators(item, server_version)
+    elif isinstance(value, list):
+        for item in value:
+            check_operators(item, server_version)
+
+
+def percentile(values, quantiles):
+    ordered = sorted(v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool))
+    if not ordered:
+        return [None for _ in quantiles]
+    return [ordered[max(0, math.ceil(q * len(ordered)) - 1)] for q in quantiles]
+
+
+def accumulate(spec, docs):
+    op, args = next(iter(spec.items()))
+    if op == '$sum':
+        values = [evaluate(args, doc) for doc in docs]
+        return sum(v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool))
+    if op == '$avg':
+        values = [v for v in (evaluate(args, doc) for doc in docs) if isinstance(v, (int, float))]
+        return sum(values) / len(values) if values else None
+    if op == '$min':
+        values = [v for v in (evaluate(args, doc) for doc in docs) if v is not None]
+        return min(values, key=sort_key) if values else None
+    if op == '$max':
+        values = [v for v in (evaluate(args, doc) for doc in docs) if v is not None]
+        return max(values, key=sort_key) if values else None
+    if op == '$first':
+        return evaluate(args, docs[0])
+    if op == '$last':
+        return evaluate(args, docs[-1])
+    if op == '$push':
+        return [evaluate(args, doc) for doc in docs]
+    if op == '$addToSet':
+        seen = {}
+        for doc in docs:
+            value = evaluate(args, doc)
+            seen.setdefault(freeze(value), value)
+        return list(seen.values())
+    if op == '$percentile':
+        return percentile([evaluate(args['input'], doc) for doc in docs], args['p'])
+    if op == '$topN':
+        ordered = sort_documents(docs, args['sortBy'])
+        return [evaluate(args['output'], doc) for doc in ordered[:args['n']]]
+    raise OperationFailure(f"unknown group operator '{op}'", code=15952)
+
+
+def sort_documents(docs, spec):
+    ordered = list(docs)
+    for key, direction in reversed(list(spec.items())):
+        ordered.sort(key=lambda doc: sort_key(get_path(doc, key)), reverse=direction < 0)
+    return ordered
+
+
+def project(doc, spec):
+    includes = {k: v for k, v in spec.items() if v not in (0, False)}
+    if not includes:
+        projected = copy.deepcopy(doc)
+        for key in spec:
+            projected.pop(key, None)
+        return projected
+
+    projected = {}
+    if spec.get('_id', 1) not in (0, False) and '_id' in doc:
+        projected['_id'] = doc['_id']
+    for key, value in includes.items():
+        if value in (1, True):
+            found = get_path(doc, key)
+            if found is not MISSING:
+                set_path(projected, key, found)
+        else:
+            set_path(projected, key, evaluate(value, doc))
+    return projected
+
+
+def run_pipeline(docs, pipeline):
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == '$match':
+            docs = [doc for doc in docs if matches(doc, spec)]
+        elif name in ('$addFields', '$set'):
+            updated = []
+            for doc in docs:
+                doc = dict(doc)
+                for key, expr in spec.items():
+                    set_path(doc, key, evaluate(expr, doc))
+                updated.append(doc)
+            docs = updated
+        elif name == '$project':
+            docs = [project(doc, spec) for doc in docs]
+        elif name == '$group':
+            groups = {}
+            keys = {}
+            for doc in docs:
+                key = evaluate(spec['_id'], doc)
+                frozen = freeze(key)
+                keys.setdefault(frozen, key)
+                groups.setdefault(frozen, []).append(doc)
+            docs = []
+            for frozen, members in groups.items():
+                row = {'_id': keys[frozen]}
+                for field, accumulator in spec.items():
+                    if field != '_id':
+                        row[field] = accumulate(accumulator, members)
+                docs.append(row)
+        elif name == '$sort':
+            docs = sort_documents(docs, spec)
+        elif name == '$limit':
+            docs = docs[:spec]
+        elif name == '$skip':
+            docs = docs[spec:]
+        elif name == '$count':
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == '$unwind':
+            path = spec if isinstance(spec, str) else spec['path']
+            unwound = []
+            for doc in docs:
+                for item in get_path(doc, path[1:]) or []:
+                    doc_copy = dict(doc)
+                    set_path(doc_copy, path[1:], item)
+                    unwound.append(doc_copy)
+            docs = unwound
+        elif name == '$facet':
+            docs = [{field: run_pipeline(docs, sub_pipeline) for field, sub_pipeline in spec.items()}]
+        else:
+            raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'", code=40324)
+    return docs
+
+
+class FakeCommandCursor:
+
+    def __init__(self, docs, address=('localhost', 27017)):
+        self._docs = iter(docs)
+        self.address = address
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._docs)
+
+    def batch_size(self, batch_size):
+        return self
+
+    def close(self):
+        pass
+
+
+class FakeRawBatchCursor:
+    """Raw BSON batches like ``aggregate_raw_batches``; ``batch_size`` applies from the next batch"""
+
+    def __init__(self, docs, batch_size=0, address=('localhost', 27017)):
+        self._docs = list(docs)
+        self._position = 0
+        self._batch_size = batch_size or 101
+        self.address = address
+        self.batch_sizes_used = []
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._position >= len(self._docs):
+            raise StopIteration
+        batch = self._docs[self._position:self._position + self._batch_size]
+        self._position += len(batch)
+        self.batch_sizes_used.append(self._batch_size)
+        return b''.join(bson.encode(doc) for doc in batch)
+
+    def batch_size(self, batch_size):
+        self._batch_size = batch_size
+        return self
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor(FakeCommandCursor):
+
+    def __init__(self, docs, address=('localhost', 27017)):
+        self._all = list(docs)
+        super().__init__(self._all, address)
+
+    def sort(self, key, direction=1):
+        spec = dict(key) if isinstance(key, list) else {key: direction}
+        self._all = sort_documents(self._all, spec)
+        self._docs = iter(self._all)
+        return self
+
+    def limit(self, count):
+        if count:
+            self._all = self._all[:count]
+            self._docs = iter(self._all)
+        return self
+
+
+class FakeCollection:
+
+    def __init__(self, database, name, read_preference=None, read_concern=None):
+        self.database = database
+        self.name = name
+        self.read_preference = read_preference or ReadPreference.PRIMARY
+        self.read_concern = read_concern or ReadConcern()
+        self.codec_options = DEFAULT_CODEC_OPTIONS
+
+    @property
+    def _docs(self):
+        return self.database.client.store.setdefault((self.database.name, self.name), [])
+
+    def with_options(self, read_preference=None, read_concern=None, **kwargs):
+        return FakeCollection(self.database, self.name, read_preference or self.read_preference, read_concern or self.read_concern)
+
+    def insert_one(self, document):
+        document.setdefault('_id', ObjectId())
+        self._docs.append(copy.deepcopy(document))
+
+    def insert_many(self, documents):
+        for document in documents:
+            self.insert_one(document)
+
+    def replace_one(self, filter, replacement, upsert=False):
+        for index, doc in enumerate(self._docs):
+            if matches(doc, filter):
+                new_doc = copy.deepcopy(replacement)
+                new_doc['_id'] = doc['_id']
+                self._docs[index] = new_doc
+                return
+        if upsert:
+            new_doc = copy.deepcopy(replacement)
+            if '_id' in filter:
+                new_doc['_id'] = filter['_id']
+            self.insert_one(new_doc)
+
+    def delete_many(self, filter):
+        self._docs[:] = [doc for doc in self._docs if not matches(doc, filter)]
+
+    def find(self, filter=None, projection=None, **kwargs):
+        self.database.client.commands.append(('find', self.name, filter, dict(kwargs, projection=projection)))
+        docs = [doc for doc in self._docs if matches(doc, filter or {})]
+        if projection:
+            docs = [project(doc, projection) for doc in docs]
+        else:
+            docs = [copy.deepcopy(doc) for doc in docs]
+        return FakeCursor(docs)
+
+    def find_one(self, filter=None, projection=None, **kwargs):
+        return next(iter(self.find(filter, projection)), None)
+
+    def aggregate(self, pipeline, **kwargs):
+        self.database.client.commands.append(('aggregate', self.name, pipeline, kwargs))
+        check_operators(pipeline, self.database.client.server_version[:2])
+        return FakeCommandCursor(run_pipeline(list(self._docs), pipeline))
+
+    def aggregate_raw_batches(self, pipeline, **kwargs):
+        self.database.client.commands.append(('aggregate_raw_batches', self.name, pipeline, kwargs))
+        check_operators(pipeline, self.database.client.server_version[:2])
+        cursor = FakeRawBatchCursor(run_pipeline(list(self._docs), pipeline), kwargs.get('batchSize', 0))
+        self.database.client.raw_cursors.append(cursor)
+        return cursor
+
+    def count_documents(self, filter, **kwargs):
+        self.database.client.commands.append(('count', self.name, filter, kwargs))
+        return sum(1 for doc in self._docs if matches(doc, filter))
+
+    def estimated_document_count(self, **kwargs):
+        return len(self._docs)
+
+
+class FakeDatabase:
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+    def get_collection(self, name, read_preference=None, read_concern=None, **kwargs):
+        return FakeCollection(self, name, read_preference, read_concern)
+
+    def command(self, command, *args, **kwargs):
+        if command == 'ping':
+            return {'ok': 1.0}
+        raise OperationFailure(f"no such command: '{command}'", code=59)
+
+
+class FakeTopologyDescription:
+
+    def server_descriptions(self):
+        return {}
+
+
+class FakeClientOptions:
+    heartbeat_frequency = 10
+
+
+class FakeMongoClient:
+    """Drop-in for ``MongoClient`` sharing one in-memory ``store`` between instances"""
+
+    instances = itertools.count()
+
+    def __init__(self, host=None, store=None, server_version=(7, 0, 0), **kwargs):
+        self.host = host
+        self.kwargs = kwargs
+        self.store = store if store is not None else {}
+        self.server_version = list(server_version)
+        self.commands = []
+        self.raw_cursors = []
+        self.topology_description = FakeTopologyDescription()
+        self.options = FakeClientOptions()
+        self.read_preference = kwargs.get('read_preference', ReadPreference.PRIMARY)
+        self.closed = False
+        next(self.instances)
+
+    def __getitem__(self, name):
+        return FakeDatabase(self, name)
+
+    def get_database(self, name, **kwargs):
+        return FakeDatabase(self, name)
+
+    @property
+    def admin(self):
+        return FakeDatabase(self, 'admin')
+
+    def server_info(self):
+        return {'version': '.'.join(map(str, self.server_version)), 'versionArray': self.server_version + [0]}
+
+    def close(self):
+        self.closed = True
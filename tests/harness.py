@@ -0,0 +1,286 @@
+"""Hermetic harness for running ``lambda_function.lambda_handler`` end to end.
+
+Replaces SSM and Secrets Manager with in-memory fakes, MongoDB with the
+in-process engine from ``fake_mongo`` (or a real mongod when
+``TEST_MONGODB_URI`` is set) and Slack with a local HTTP server that records
+every webhook call and how long it took to answer.
+"""
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+from botocore.exceptions import ClientError
+
+import lambda_function
+from fake_mongo import FakeMongoClient
+
+
+DEFAULT_PARAM_BASE = '/power-alerts/dev/mongodb'
+DEFAULT_SLACK_SECRET = 'power-alerts/dev/slack-webhook'
+TEST_DATABASE = 'power_alerts_test'
+
+
+class FakeSSMClient:
+
+    def __init__(self, parameters):
+        self.parameters = parameters
+        self.calls = []
+
+    def get_parameter(self, Name, WithDecryption=False):
+        self.calls.append(Name)
+        if Name not in self.parameters:
+            raise ClientError({'Error': {'Code': 'ParameterNotFound', 'Message': Name}}, 'GetParameter')
+        return {'Parameter': {'Name': Name, 'Value': self.parameters[Name]}}
+
+
+class FakeSecretsManagerClient:
+
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.calls = []
+
+    def get_secret_value(self, SecretId):
+        self.calls.append(SecretId)
+        if SecretId not in self.secrets:
+            raise ClientError({'Error': {'Code': 'ResourceNotFoundException', 'Message': SecretId}}, 'GetSecretValue')
+        return {'Name': SecretId, 'SecretString': self.secrets[SecretId]}
+
+
+class FakeSNSClient:
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, TopicArn, Message, Subject=None):
+        self.published.append({'TopicArn': TopicArn, 'Subject': Subject, 'Message': Message})
+        return {'MessageId': f"msg-{len(self.published)}"}
+
+
+class FakeS3Client:
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, Filename, Bucket, Key, **kwargs):
+        with open(Filename, 'rb') as f:
+            self.objects[(Bucket, Key)] = f.read()
+
+
+class FakeAWS:
+    """Stands in for ``boto3.client``; every client of a service shares the same fake"""
+
+    def __init__(self, parameters=None, secrets=None):
+        self.ssm = FakeSSMClient(parameters or {})
+        self.secretsmanager = FakeSecretsManagerClient(secrets or {})
+        self.sns = FakeSNSClient()
+        self.s3 = FakeS3Client()
+        self.clients_created = []
+        self.client_options = []
+
+    def client(self, service_name, *args, **kwargs):
+        self.clients_created.append(service_name)
+        self.client_options.append((service_name, kwargs))
+        return getattr(self, service_name.replace('-', ''))
+
+
+class SlackWebhookStub:
+    """Local HTTP server impersonating a Slack incoming webhook"""
+
+    def __init__(self, delay=0.0, status=200, body='ok', failures=0, fail_at=()):
+        self.delay = delay
+        self.status = status
+        self.body = body
+        # The first ``failures`` requests, and those numbered in ``fail_at``,
+        # get a 500, to exercise retries
+        self.failures = failures
+        self.fail_at = set(fail_at)
+        self.requests = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/services/T000/B000/XXXX"
+
+    @property
+    def messages(self):
+        return [request['payload'] for request in self.requests]
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                received = time.perf_counter()
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'null')
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status = stub.status
+                if len(stub.requests) < stub.failures or len(stub.requests) in stub.fail_at:
+                    status = 500
+                body = stub.body.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                stub.requests.append({
+                    'path': self.path,
+                    'payload': payload,
+                    'status': status,
+                    'latency': time.perf_counter() - received
+                })
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class FakeLambdaContext:
+
+    def __init__(self, timeout_seconds=300):
+        self._deadline = time.monotonic() + timeout_seconds
+        self.function_name = 'power-transaction-monitor-test'
+        self.aws_request_id = 'test-request'
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def frozen_datetime(now):
+
+    class FrozenDatetime(datetime):
+
+        @classmethod
+        def utcnow(cls):
+            return now
+
+    return FrozenDatetime
+
+
+def generate_transactions(count, start_time, end_time, utilities=('IKEDC', 'EKEDC', 'AEDC'), status_weights=None, seed=1):
+    """Deterministic synthetic ``power_transaction_items`` documents spread over the window"""
+
+    rng = random.Random(seed)
+    status_weights = status_weights or {'fulfilled': 0.9, 'failed': 0.06, 'pending': 0.04}
+    statuses, weights = zip(*status_weights.items())
+    span = (end_time - start_time).total_seconds()
+
+    docs = []
+    for index in range(count):
+        amount = round(rng.lognormvariate(8, 0.8), 2)
+        docs.append({
+            'createdAt': start_time + timedelta(seconds=rng.uniform(0, span)),
+            'status': rng.choices(statuses, weights)[0],
+            'util': rng.choice(utilities),
+            # Production data mixes string and numeric amounts
+            'amount': str(amount) if index % 2 else amount,
+            'meterNumber': f"{rng.randrange(10**10, 10**11)}",
+            'customerId': f"cust-{rng.randrange(500)}"
+        })
+    return docs
+
+
+class LambdaHarness:
+    """Patches the handler's dependencies for the duration of a ``with`` block"""
+
+    def __init__(self, now=None, slack_delay=0.0, server_version=(7, 0, 0), environ=None):
+        self.now = now or datetime(2025, 6, 1, 15, 30, 0)
+        self.server_version = server_version
+        self.environ = dict(environ or {})
+        self.slack = SlackWebhookStub(delay=slack_delay)
+        self.store = {}
+        self.mongo_clients = []
+        self.aws = None
+        self._saved = []
+
+    @property
+    def uses_real_mongod(self):
+        return bool(os.environ.get('TEST_MONGODB_URI'))
+
+    def _patch(self, target, name, value):
+        self._saved.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+    def _make_client(self, uri, **kwargs):
+        if self.uses_real_mongod:
+            return self._real_client_class(os.environ['TEST_MONGODB_URI'], **kwargs)
+        return FakeMongoClient(uri, store=self.store, server_version=self.server_version, **kwargs)
+
+    def _handler_client(self, uri, **kwargs):
+        client = self._make_client(uri, **kwargs)
+        self.mongo_clients.append(client)
+        return client
+
+    @property
+    def database(self):
+        return self._make_client('mongodb://harness')[TEST_DATABASE]
+
+    def seed(self, docs, collection='power_transaction_items'):
+        self.database[collection].insert_many(docs)
+
+    def reset_warm_state(self):
+        """Forget cached connections so the next invocation takes the cold path"""
+        lambda_function.close_connections()
+        lambda_function.mongodb_config = None
+        lambda_function.slack_webhook_cache = None
+        lambda_function.percentile_supported = None
+        lambda_function.server_version = None
+
+    def invoke(self, event=None, timeout_seconds=300):
+        started = time.perf_counter()
+        response = lambda_function.lambda_handler(event or {}, FakeLambdaContext(timeout_seconds))
+        return response, time.perf_counter() - started
+
+    def __enter__(self):
+        self.slack.start()
+        self.aws = FakeAWS(
+            parameters={
+                f"{DEFAULT_PARAM_BASE}/uri": 'mongodb://harness.invalid:27017',
+                f"{DEFAULT_PARAM_BASE}/database": TEST_DATABASE
+            },
+            secrets={DEFAULT_SLACK_SECRET: json.dumps({'webhook_url': self.slack.url})}
+        )
+        self._real_client_class = lambda_function.MongoClient
+
+        self._patch(boto3, 'client', self.aws.client)
+        self._patch(lambda_function, 'MongoClient', self._handler_client)
+        self._patch(lambda_function, 'datetime', frozen_datetime(self.now))
+        for name, value in self.environ.items():
+            self._saved.append((os.environ, name, os.environ.get(name)))
+            os.environ[name] = value
+
+        self.reset_warm_state()
+        if self.uses_real_mongod:
+            self._real_client_class(os.environ['TEST_MONGODB_URI']).drop_database(TEST_DATABASE)
+        return self
+
+    def __exit__(self, *exc_info):
+        for target, name, value in reversed(self._saved):
+            if target is os.environ:
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            else:
+                setattr(target, name, value)
+        self._saved = []
+        self.reset_warm_state()
+        self.slack.stop()
+        return False
@@ -0,0 +1,151 @@
+import pytest
+from datetime import datetime
+
+from alert_rendering import (
+    DEFAULT_MAX_UTILITY_LINES,
+    SLACK_MAX_BLOCKS,
+    SLACK_SECTION_TEXT_LIMIT,
+    SLACK_TEXT_PAGE_LIMIT,
+    currency_formatter,
+    render_revenue_report,
+    render_error_message
+)
+from lambda_function import empty_revenue_summary
+
+
+START = datetime(2025, 6, 1, 12, 1)
+END = datetime(2025, 6, 1, 17, 59)
+
+
+def revenue_with_utilities(count):
+    revenue_data = empty_revenue_summary()
+    revenue_data['utility_breakdown'] = [
+        {'util': f"UTILITY-{index:04d}", 'amount': 1000.0 * (count - index), 'transactions': count - index}
+        for index in range(count)
+    ]
+    revenue_data['total_amount'] = sum(u['amount'] for u in revenue_data['utility_breakdown'])
+    revenue_data['total_transactions'] = sum(u['transactions'] for u in revenue_data['utility_breakdown'])
+    return revenue_data
+
+
+class TestAlertRendering:
+
+    def test_text_report_matches_classic_layout(self):
+        """Test that the text renderer keeps the original message layout"""
+        revenue_data = revenue_with_utilities(2)
+        messages = render_revenue_report(revenue_data, "Afternoon Period (12:01 PM - 5:59 PM)", START, END)
+
+        assert messages == [{"text": (
+            "⚡ *Power Transaction Revenue Report*\n\n"
+            "📅 *Period:* Afternoon Period (12:01 PM - 5:59 PM)\n"
+            "🕐 *Time:* 12:01 - 17:59 UTC on 2025-06-01\n\n"
+            "💰 *Total Revenue Generated:* ₦3,000.00\n"
+            "📊 *Total Transactions:* 3\n\n"
+            "🏢 *Revenue Breakdown by Utility:*\n"
+            "• *UTILITY-0000*: ₦2,000.00 (2 transactions)\n"
+            "• *UTILITY-0001*: ₦1,000.00 (1 transactions)"
+        )}]
+
+    def test_no_transactions_message(self):
+        """Test the no-transactions text"""
+        messages = render_revenue_report(empty_revenue_summary(), "Night Period", START, END)
+
+        assert len(messages) == 1
+        assert "No new transactions yet" in messages[0]['text']
+
+    def test_text_report_is_paginated(self):
+        """Test that long text reports are split into pages Slack will show in full"""
+        messages = render_revenue_report(revenue_with_utilities(400), "Morning", START, END, max_utility_lines=None)
+
+        assert len(messages) > 1
+        assert all(len(message['text']) <= SLACK_TEXT_PAGE_LIMIT for message in messages)
+        assert "(continued 2/" in messages[1]['text']
+        assert sum(message['text'].count("UTILITY-") for message in messages) == 400
+
+    def test_utility_lines_are_capped(self):
+        """Test that utilities past the cap are totalled in one line, keeping the report to one post"""
+        revenue_data = revenue_with_utilities(300)
+        revenue_data['failed_transactions'] = 300
+        revenue_data['failed_amount'] = 300.0
+        revenue_data['status_breakdown'] = [
+            {'util': f"UTILITY-{index:04d}", 'fulfillment_rate': 0.9, 'failed_amount': 1.0, 'failed_transactions': 1, 'pending_transactions': 0}
+            for index in range(300)
+        ]
+
+        messages = render_revenue_report(revenue_data, "Morning", START, END)
+        text = messages[0]['text']
+        rest = revenue_data['utility_breakdown'][DEFAULT_MAX_UTILITY_LINES:]
+
+        assert len(messages) == 1
+        assert f"UTILITY-{DEFAULT_MAX_UTILITY_LINES - 1:04d}*" in text
+        assert f"UTILITY-{DEFAULT_MAX_UTILITY_LINES:04d}*" not in text
+        assert (
+            f"• _{len(rest)} more utilities_: ₦{sum(u['amount'] for u in rest):,.2f} "
+            f"({sum(u['transactions'] for u in rest):,} transactions)"
+        ) in text
+        assert f"• _…and {len(rest)} more utilities_" in text
+
+    def test_block_kit_respects_slack_limits(self):
+        """Test that Block Kit output stays within Slack's block and section limits"""
+        messages = render_revenue_report(
+            revenue_with_utilities(5000), "Morning", START, END, message_format='blocks', max_utility_lines=None
+        )
+
+        assert len(messages) > 1
+        for message in messages:
+            assert len(message['blocks']) <= SLACK_MAX_BLOCKS
+            assert message['text']
+            for block in message['blocks']:
+                if block['type'] == 'section':
+                    assert len(block['text']['text']) <= SLACK_SECTION_TEXT_LIMIT
+        assert messages[-1]['blocks'][-1]['type'] == 'context'
+
+    def test_hourly_revenue_row_per_utility(self):
+        """Test the per-utility hourly sparkline and peak hour"""
+        revenue_data = revenue_with_utilities(2)
+        revenue_data['hourly_revenue'] = {
+            'hours': [datetime(2025, 6, 1, hour) for hour in range(12, 18)],
+            'by_utility': [
+                {'util': 'UTILITY-0000', 'amounts': [0.0, 100.0, 900.0, 400.0, 0.0, 50.0], 'transactions': [0, 1, 3, 2, 0, 1]},
+                {'util': 'UTILITY-0001', 'amounts': [0.0] * 6, 'transactions': [0] * 6}
+            ]
+        }
+        
+        text = render_revenue_report(revenue_data, "Afternoon", START, END)[0]['text']
+        
+        assert "Revenue by Hour* (12:00 → 17:00 UTC)" in text
+        assert "• *UTILITY-0000*: `▁▂█▄▁▂` peak 14:00 (₦900)" in text
+        assert "*UTILITY-0001*: `" not in text
+
+    def test_top_contributors_section(self):
+        """Test the top customers line per utility"""
+        revenue_data = revenue_with_utilities(1)
+        revenue_data['top_contributors'] = {
+            'field': 'customerId',
+            'by_utility': [{'util': 'UTILITY-0000', 'top': [
+                {'key': 'cust-7', 'amount': 25000.0, 'count': 3},
+                {'key': 'cust-2', 'amount': 12000.0, 'count': 1}
+            ]}]
+        }
+
+        text = render_revenue_report(revenue_data, "Afternoon", START, END)[0]['text']
+
+        assert "🏆 *Top Customers by Revenue:*" in text
+        assert "• *UTILITY-0000*: `cust-7` ₦25,000 (3) • `cust-2` ₦12,000 (1)" in text
+
+    def test_currency_formatter_is_cached_per_locale(self):
+        """Test locale-specific currency formatting and caching"""
+        assert currency_formatter('en_NG')(1234567.5) == "₦1,234,567.50"
+        assert currency_formatter('de_DE')(1234567.5) == "€1.234.567,50"
+        assert currency_formatter('en_NG') is currency_formatter('en_NG')
+
+    def test_error_message(self):
+        """Test that error text is cleaned for Slack"""
+        message = render_error_message('bad "quote"\nnewline', datetime(2025, 6, 1, 9, 0, 0))
+
+        assert "bad 'quote' newline" in message['text']
+        assert "2025-06-01 09:00:00 UTC" in message['text']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,93 @@
+import datetime
+import math
+
+import pytest
+
+import bson.columnar as columnar
+from bson import Int64, ObjectId, encode
+from bson.columnar import DATETIME_MS, FLOAT64, INT64, MISSING_INT64, STRING, decode_columns
+from bson.errors import InvalidBSON
+
+
+SCHEMA = {'amount': FLOAT64, 'createdAt': DATETIME_MS, 'util': STRING, 'units': INT64}
+
+DOCS = [
+    {'_id': ObjectId(), 'createdAt': datetime.datetime(2025, 6, 1, 12, 0), 'util': 'IKEDC', 'amount': '1500.00', 'units': 42, 'meta': {'amount': 1}},
+    {'_id': ObjectId(), 'createdAt': datetime.datetime(2025, 6, 1, 12, 1), 'util': 'EKEDC', 'amount': 2500.5, 'units': Int64(2**40)},
+    {'_id': ObjectId(), 'util': 'IKEDC', 'amount': 7, 'units': 3.0},
+    {'_id': ObjectId(), 'createdAt': 'yesterday', 'util': None, 'amount': 'n/a', 'units': 3.5}
+]
+
+BATCH = b''.join(encode(doc) for doc in DOCS)
+
+
+def as_lists(columns):
+    return {name: [None if isinstance(v, float) and math.isnan(v) else v for v in column] for name, column in columns.items()}
+
+
+@pytest.fixture(params=['default', 'python'])
+def decoder(request, monkeypatch):
+    """decode_columns with whichever decoder is available, and forced to pure Python"""
+    if request.param == 'python':
+        monkeypatch.setattr(columnar, '_c_decode_columns', None)
+    return decode_columns
+
+
+class TestDecodeColumns:
+
+    def test_batch_is_decoded_into_columns(self, decoder):
+        """Test one entry per document with the missing-value sentinels"""
+        columns = decoder(BATCH, SCHEMA)
+
+        assert columns['amount'].format == 'd'
+        assert columns['createdAt'].format == 'q'
+        assert as_lists(columns) == {
+            'amount': [1500.0, 2500.5, 7.0, None],
+            'createdAt': [1748779200000, 1748779260000, MISSING_INT64, MISSING_INT64],
+            'util': ['IKEDC', 'EKEDC', 'IKEDC', None],
+            'units': [42, 2**40, 3, MISSING_INT64]
+        }
+        assert math.isclose(sum(columns['amount'][:3]), 4007.5)
+
+    def test_repeated_strings_are_interned(self, decoder):
+        """Test that equal strings in a column are one object"""
+        util = decoder(BATCH, {'util': STRING})['util']
+
+        assert util[0] is util[2]
+
+    def test_empty_batch(self, decoder):
+        """Test that an empty batch gives empty columns"""
+        columns = decoder(b'', SCHEMA)
+
+        assert len(columns['amount']) == 0
+        assert columns['util'] == []
+
+    def test_default_decoder_matches_python(self, monkeypatch):
+        """Test that the C fast path and the Python fallback agree"""
+        default = as_lists(decode_columns(BATCH * 50, SCHEMA))
+        monkeypatch.setattr(columnar, '_c_decode_columns', None)
+
+        assert as_lists(decode_columns(BATCH * 50, SCHEMA)) == default
+
+    def test_invalid_schema(self):
+        """Test unknown column types and empty schemas are rejected"""
+        with pytest.raises(ValueError):
+            decode_columns(BATCH, {'amount': 'decimal'})
+        with pytest.raises(ValueError):
+            decode_columns(BATCH, {})
+
+    @pytest.mark.parametrize('corrupt', [
+        lambda data: data[:-1],
+        lambda data: data[:10] + (1000).to_bytes(4, 'little') + data[14:],
+        lambda data: data + b'\x05\x00\x00'
+    ], ids=['truncated', 'overlong-value', 'trailing-bytes'])
+    def test_corrupt_batch_is_invalid(self, decoder, corrupt):
+        """Test that a batch whose lengths do not add up raises InvalidBSON"""
+        data = encode({'note': 'x' * 20, 'amount': 1.0})
+
+        with pytest.raises(InvalidBSON):
+            decoder(corrupt(data), {'amount': FLOAT64})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
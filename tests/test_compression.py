@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from pymongo.compression_support import ZlibContext, ZstdContext, decompress
+
+
+REPLY = b'{"util": "IKEDC", "amount": 1500.0}' * 200
+
+
+class TestCompressionSupport:
+
+    def test_zlib_round_trip(self):
+        """Test zlib compression with the module-level import"""
+        ctx = ZlibContext(6)
+        assert decompress(ctx.compress(REPLY), ctx.compressor_id) == REPLY
+
+    def test_zstd_contexts_are_cached_per_thread(self):
+        """Test that each thread reuses one zstd compressor/decompressor pair"""
+        pytest.importorskip('zstandard')
+        from pymongo import compression_support
+
+        ctx = ZstdContext()
+        assert decompress(ctx.compress(REPLY), ctx.compressor_id) == REPLY
+        compressor = compression_support._zstd_compressor()
+        decompressor = compression_support._zstd_decompressor()
+        assert decompress(ctx.compress(REPLY), ctx.compressor_id) == REPLY
+        assert compression_support._zstd_compressor() is compressor
+        assert compression_support._zstd_decompressor() is decompressor
+
+        other_threads = []
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(20):
+                    assert decompress(ctx.compress(REPLY), ctx.compressor_id) == REPLY
+                other_threads.append(compression_support._zstd_compressor())
+            except AssertionError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert len({id(c) for c in other_threads}) == 4
+        assert compressor not in other_threads
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
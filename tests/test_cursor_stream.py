@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime, timedelta
+
+from cursor_stream import (
+    MAX_BATCH_SIZE,
+    MIN_BATCH_SIZE,
+    CursorStats,
+    adaptive_batch_size,
+    stream_transactions
+)
+from harness import generate_transactions
+
+
+NOW = datetime(2025, 6, 1, 15, 30, 0)
+START = NOW - timedelta(hours=6)
+
+
+class TestCursorStream:
+
+    def test_adaptive_batch_size_follows_memory_and_doc_size(self):
+        """Test that bigger documents or less free memory mean smaller batches, within bounds"""
+        roomy = adaptive_batch_size(200, free_bytes=256 * 2**20)
+        tight = adaptive_batch_size(200, free_bytes=32 * 2**20)
+        large_docs = adaptive_batch_size(2000, free_bytes=256 * 2**20)
+
+        assert tight < roomy
+        assert large_docs < roomy
+        assert adaptive_batch_size(200, free_bytes=0) == MIN_BATCH_SIZE
+        assert adaptive_batch_size(1, free_bytes=2**40) == MAX_BATCH_SIZE
+        assert adaptive_batch_size(1, free_bytes=2**40, max_batch_size=40) == 40
+
+    def test_stream_projects_transaction_fields(self, lambda_harness):
+        """Test that only the transaction fields (plus _id and requested extras) are fetched"""
+        lambda_harness.seed(generate_transactions(50, START, NOW))
+        collection = lambda_harness.database['power_transaction_items']
+
+        docs = [doc for batch in stream_transactions(collection, {'status': 'fulfilled'}) for doc in batch]
+        assert set(docs[0]) == {'_id', 'createdAt', 'amount', 'util', 'status'}
+
+        docs = [doc for batch in stream_transactions(collection, {}, extra_fields=('meterNumber',)) for doc in batch]
+        assert len(docs) == 50
+        assert 'meterNumber' in docs[0] and 'customerId' not in docs[0]
+
+    def test_batch_size_adapts_after_first_batch(self, lambda_harness):
+        """Test that the getMore batch size is re-derived from the measured document size"""
+        lambda_harness.seed(generate_transactions(600, START, NOW))
+        collection = lambda_harness.database['power_transaction_items']
+        stats = CursorStats()
+
+        batches = list(stream_transactions(collection, {}, stats=stats, batch_size=50, max_batch_size=200))
+
+        [cursor] = collection.database.client.raw_cursors
+        assert cursor.closed
+        assert cursor.batch_sizes_used[0] == 50
+        assert cursor.batch_sizes_used[1] == 200
+        assert stats.batch_sizes == [50, 200]
+        assert [len(batch) for batch in batches] == [50, 200, 200, 150]
+
+    def test_stats_count_docs_and_bytes(self, lambda_harness):
+        """Test the docs/sec and bytes/sec counters"""
+        lambda_harness.seed(generate_transactions(120, START, NOW))
+        collection = lambda_harness.database['power_transaction_items']
+        stats = CursorStats()
+
+        for _ in stream_transactions(collection, {}, stats=stats, batch_size=50, max_batch_size=50):
+            pass
+
+        summary = stats.as_dict()
+        assert summary['docs'] == 120
+        assert summary['batches'] == 3
+        assert summary['bytes'] > 120 * 40
+        assert summary['docs_per_second'] > 0
+        assert summary['bytes_per_second'] > summary['docs_per_second']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,90 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import deadline
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deadline
+from pymongo import _csot
+
+
+class FakeContext:
+
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class TestDeadline:
+
+    def test_budget_follows_lambda_remaining_time(self):
+        """Test that stage budgets are derived from the Lambda context"""
+        deadline.start_invocation_budget(FakeContext(60000))
+
+        assert 57 < deadline.remaining_seconds() <= 60 - deadline.SAFETY_MARGIN_SECONDS
+        assert deadline.stage_budget(30) == 30
+        assert deadline.stage_budget(120, reserve=15) <= 60 - deadline.SAFETY_MARGIN_SECONDS - 15
+
+    def test_exhausted_budget(self):
+        """Test that an exhausted budget yields zero stage time but a usable HTTP timeout"""
+        deadline.start_invocation_budget(FakeContext(1000))
+
+        assert deadline.stage_budget(30) == 0.0
+        assert deadline.http_timeout(30) == 1.0
+
+    def test_mongo_budget_sets_csot_deadline(self):
+        """Test that MongoDB stages run inside a pymongo CSOT block"""
+        deadline.start_invocation_budget(FakeContext(20000))
+
+        with deadline.mongo_budget(5):
+            assert 0 < _csot.remaining() <= 5
+        assert _csot.remaining() is None
+
+        # A spent budget must still be a (tiny) timeout rather than "no timeout"
+        deadline.start_invocation_budget(FakeContext(0))
+        with deadline.mongo_budget(5):
+            assert _csot.remaining() is not None
+
+    def test_phase_budget_bounds_stages_and_boto_calls(self):
+        """Test that a phase caps every stage in total, ignores reserves and gives boto one attempt per call"""
+        deadline.start_invocation_budget(FakeContext(0))
+
+        with deadline.phase_budget(6):
+            assert 5.5 < deadline.stage_budget(10, reserve=15) <= 6
+            assert deadline.stage_budget(4) == 4
+            config = deadline.boto_config(10, reserve=15, calls=2)
+            assert 2 * (config.connect_timeout + config.read_timeout) <= 6
+            assert config.retries == {'max_attempts': 0}
+        assert deadline.phase_deadline is None
+        assert deadline.stage_budget(10) == 0.0
+
+    def test_boto_retries_share_the_stage_budget(self):
+        """Test that outside a phase every attempt of every call fits in the budget, retrying only when there is room"""
+        deadline.start_invocation_budget(FakeContext(60000))
+
+        config = deadline.boto_config(24, reserve=15, calls=2)
+        attempts = 1 + config.retries['max_attempts']
+        assert attempts == 3
+        assert 2 * attempts * (config.connect_timeout + config.read_timeout) <= 24
+
+        config = deadline.boto_config(3)
+        assert config.retries == {'max_attempts': 0}
+        assert config.connect_timeout + config.read_timeout <= 3
+
+        deadline.start_invocation_budget(FakeContext(0))
+        config = deadline.boto_config(5)
+        assert config.retries == {'max_attempts': 0}
+        assert config.connect_timeout == deadline.BOTO_MIN_TIMEOUT_SECONDS
+
+    def test_exhausted_phase_refuses_boto_calls(self):
+        """Test that no boto client is configured once the phase has no time left"""
+        with deadline.phase_budget(0):
+            with pytest.raises(TimeoutError):
+                deadline.boto_config(5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
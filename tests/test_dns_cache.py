@@ -0,0 +1,104 @@
+import time
+
+import dns.asyncresolver
+import dns.message
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import pytest
+
+import dns_cache
+from dns_cache import SharedLRUCache, dns_cache_stats, install_dns_cache
+
+
+SRV_NAME = dns.name.from_text('_mongodb._tcp.cluster0.abcde.mongodb.net.')
+
+
+def srv_answer(ttl=60):
+    response = dns.message.from_text(f"""id 1
+opcode QUERY
+rcode NOERROR
+flags QR RD RA
+;QUESTION
+{SRV_NAME} IN SRV
+;ANSWER
+{SRV_NAME} {ttl} IN SRV 0 0 27017 cluster0-shard-00-00.abcde.mongodb.net.
+""")
+    return dns.resolver.Answer(SRV_NAME, dns.rdatatype.SRV, dns.rdataclass.IN, response)
+
+
+def nxdomain_answer(soa_minimum=3600):
+    name = dns.name.from_text('cluster9.abcde.mongodb.net.')
+    response = dns.message.from_text(f"""id 2
+opcode QUERY
+rcode NXDOMAIN
+flags QR RD RA
+;QUESTION
+{name} IN TXT
+;AUTHORITY
+mongodb.net. {soa_minimum} IN SOA ns. admin. 1 7200 3600 1209600 {soa_minimum}
+""")
+    return name, dns.resolver.Answer(name, dns.rdatatype.ANY, dns.rdataclass.IN, response)
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    monkeypatch.setattr(dns_cache, 'shared_cache', None)
+    yield
+    dns.resolver.get_default_resolver().cache = None
+    dns.asyncresolver.get_default_resolver().cache = None
+
+
+class TestDNSCache:
+
+    def test_negative_answers_are_capped(self):
+        """Test that NXDOMAIN answers expire after the negative TTL, not the SOA minimum"""
+        cache = SharedLRUCache(max_size=10, negative_ttl=30)
+        name, answer = nxdomain_answer(soa_minimum=3600)
+        cache.put((name, dns.rdatatype.ANY, dns.rdataclass.IN), answer)
+
+        assert answer.expiration <= time.time() + 30
+        assert cache.get((name, dns.rdatatype.ANY, dns.rdataclass.IN)) is answer
+        assert cache.negative_puts == 1
+
+        no_negatives = SharedLRUCache(max_size=10, negative_ttl=0)
+        no_negatives.put((name, dns.rdatatype.ANY, dns.rdataclass.IN), nxdomain_answer()[1])
+        assert no_negatives.get((name, dns.rdatatype.ANY, dns.rdataclass.IN)) is None
+
+    def test_positive_answers_keep_ttl_and_lru_bound(self):
+        """Test that answers keep their own TTL and the cache stays within max_size"""
+        cache = SharedLRUCache(max_size=2, negative_ttl=30)
+        answer = srv_answer(ttl=600)
+        cache.put((SRV_NAME, dns.rdatatype.SRV, dns.rdataclass.IN), answer)
+        assert answer.expiration > time.time() + 500
+
+        for index in range(3):
+            name, negative = nxdomain_answer()
+            cache.put((dns.name.from_text(f"n{index}.mongodb.net."), dns.rdatatype.ANY, dns.rdataclass.IN), negative)
+        assert len(cache.data) == 2
+
+    def test_default_resolvers_share_the_cache(self, shared_cache):
+        """Test that dnspython's module-level resolve (used by pymongo) is served from the shared cache"""
+        cache = install_dns_cache()
+        assert install_dns_cache() is cache
+        assert dns.resolver.get_default_resolver().cache is cache
+        assert dns.asyncresolver.get_default_resolver().cache is cache
+
+        cache.put((SRV_NAME, dns.rdatatype.SRV, dns.rdataclass.IN), srv_answer())
+        for _ in range(3):
+            answer = dns.resolver.resolve(SRV_NAME, 'SRV')
+            assert answer[0].port == 27017
+
+        stats = dns_cache_stats()
+        assert stats['hits'] == 3
+        assert stats['hit_rate'] == 1.0
+        assert stats['entries'] == 1
+
+    def test_stats_before_install(self, shared_cache):
+        """Test that nothing is reported when no DNS cache is in use"""
+        assert dns_cache_stats() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,134 @@
+import datetime
+
+import pytest
+
+import bson
+from bson import Binary, Code, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp, decode, decode_all, decode_iter, encode
+from bson.codec_options import CodecOptions
+from bson.dbref import DBRef
+from bson.errors import InvalidBSON
+from pymongo.message import _OpMsg
+
+
+# One field of every BSON type before the last one, so reaching 'status' means
+# every other type was skipped by length correctly
+WIDE_DOC = {
+    '_id': ObjectId(),
+    'amount': 1500.0,
+    'util': 'IKEDC',
+    'meta': {'source': 'app', 'device': {'os': 'android'}},
+    'tags': ['a', 'b'],
+    'payload': Binary(b'\x00\x01\x02', 5),
+    'pattern': Regex('^45', 'i'),
+    'script': Code('return 1', {'x': 1}),
+    'snippet': Code('return 2'),
+    'big': Int64(2**40),
+    'price': Decimal128('1500.25'),
+    'seen': Timestamp(1, 2),
+    'low': MinKey(),
+    'high': MaxKey(),
+    'paid': True,
+    'refunded': None,
+    'ref': DBRef('meters', 1),
+    'createdAt': datetime.datetime(2025, 6, 1, 12, 0),
+    'status': 'fulfilled'
+}
+
+CURSOR_FIELDS = {'cursor': {'firstBatch': 1, 'nextBatch': 1}}
+
+
+def python_decode(data, opts):
+    """The pure-Python decoder, whichever decoder bson.decode uses"""
+    data, view = bson.get_data_and_view(data)
+    _, end = bson._get_object_size(data, 0, len(data))
+    return bson._selected_elements_to_dict(data, view, 4, end, opts, opts.field_selection)
+
+
+class TestFieldSelectionOptions:
+
+    def test_selection_is_normalized_to_a_trie(self):
+        """Test names, dotted paths and mappings all give the same trie"""
+        trie = {'status': None, 'meta': {'source': None}}
+        assert CodecOptions(field_selection=['status', 'meta.source']).field_selection == trie
+        assert CodecOptions(field_selection={'status': 1, 'meta': {'source': True}}).field_selection == trie
+        assert CodecOptions(field_selection=['meta', 'meta.source']).field_selection == {'meta': None}
+
+    def test_invalid_selections(self):
+        """Test that strings and exclusions are rejected"""
+        with pytest.raises(TypeError):
+            CodecOptions(field_selection='status')
+        with pytest.raises(ValueError):
+            CodecOptions(field_selection={'status': 0})
+
+    def test_options_carry_the_selection(self):
+        """Test equality, with_options and repr include the selection"""
+        selected = CodecOptions(field_selection=['status'])
+        assert selected != CodecOptions()
+        assert selected == CodecOptions(field_selection={'status': 1})
+        assert selected.with_options(tz_aware=True).field_selection == {'status': None}
+        assert selected.with_options(field_selection=None).field_selection is None
+        assert 'field_selection' in repr(selected)
+        assert 'field_selection' not in repr(CodecOptions())
+
+
+class TestSelectiveDecoding:
+
+    @pytest.mark.parametrize('decoder', [decode, python_decode], ids=['default', 'python'])
+    def test_only_selected_fields_are_decoded(self, decoder):
+        """Test that the selected fields come back and every other type is skipped"""
+        data = encode(WIDE_DOC)
+        opts = CodecOptions(field_selection=['createdAt', 'amount', 'meta.device', 'status'])
+
+        assert decoder(data, opts) == {
+            'amount': 1500.0,
+            'meta': {'device': {'os': 'android'}},
+            'createdAt': datetime.datetime(2025, 6, 1, 12, 0),
+            'status': 'fulfilled'
+        }
+        everything = CodecOptions(field_selection=list(WIDE_DOC))
+        assert decoder(data, everything) == decode(data)
+
+    def test_decode_all_and_iter_apply_the_selection_per_document(self):
+        """Test that each document of a batch is decoded with the selection"""
+        data = b''.join(encode(dict(WIDE_DOC, amount=float(i))) for i in range(3))
+        opts = CodecOptions(field_selection=['amount'])
+
+        assert decode_all(data, opts) == [{'amount': 0.0}, {'amount': 1.0}, {'amount': 2.0}]
+        assert list(decode_iter(data, opts)) == decode_all(data, opts)
+
+    def test_corrupt_skipped_value_is_invalid(self):
+        """Test that a skipped value running past the document raises InvalidBSON"""
+        data = bytearray(encode({'note': 'x' * 20, 'status': 'fulfilled'}))
+        data[10:14] = (1000).to_bytes(4, 'little')
+
+        for decoder in (decode, python_decode):
+            with pytest.raises(InvalidBSON):
+                decoder(bytes(data), CodecOptions(field_selection=['status']))
+
+    def test_command_reply_keeps_cursor_metadata(self):
+        """Test that a find/aggregate reply applies the selection to the batch only"""
+        reply = {
+            'cursor': {'firstBatch': [dict(WIDE_DOC, amount=float(i)) for i in range(3)], 'id': Int64(42), 'ns': 'power_alerts.power_transaction_items'},
+            'ok': 1.0,
+            '$clusterTime': {'clusterTime': Timestamp(5, 1)}
+        }
+        opts = CodecOptions(field_selection=['amount', 'status'])
+
+        response = _OpMsg(0, encode(reply)).unpack_response(codec_options=opts, user_fields=CURSOR_FIELDS)[0]
+
+        assert response['ok'] == 1.0
+        assert response['$clusterTime'] == {'clusterTime': Timestamp(5, 1)}
+        assert response['cursor']['id'] == 42
+        assert response['cursor']['ns'] == 'power_alerts.power_transaction_items'
+        assert response['cursor']['firstBatch'] == [{'amount': float(i), 'status': 'fulfilled'} for i in range(3)]
+
+    def test_non_document_values_are_decoded_whole(self):
+        """Test distinct-style replies whose values are not documents"""
+        opts = CodecOptions(field_selection=['amount'])
+        reply = _OpMsg(0, encode({'values': ['IKEDC', 'EKEDC'], 'ok': 1.0}))
+
+        assert reply.unpack_response(codec_options=opts, user_fields={'values': 1})[0]['values'] == ['IKEDC', 'EKEDC']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+import datetime
+import io
+
+import pytest
+
+from bson import ObjectId, decode_all, decode_file_iter, encode
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidBSON
+from bson.file_reader import decode_mmap_iter, index_chunks
+from bson.son import SON
+
+
+DOCS = [
+    {'_id': ObjectId(), 'createdAt': datetime.datetime(2025, 6, 1, 12, 0) + datetime.timedelta(seconds=i), 'util': 'IKEDC', 'amount': f"{1000 + i}.00", 'note': 'x' * (i % 40)}
+    for i in range(500)
+]
+DATA = b''.join(encode(doc) for doc in DOCS)
+
+
+@pytest.fixture
+def dump_file(tmp_path):
+    """Write BSON bytes to a file, like a mongodump collection file"""
+    def write(data):
+        path = tmp_path / 'power_transaction_items.bson'
+        path.write_bytes(data)
+        return path
+    return write
+
+
+def read_all(path, reader, **kwargs):
+    """Collect a reader's documents and the error it stopped with, if any"""
+    docs = []
+    with open(path, 'rb') as file_obj:
+        try:
+            for doc in reader(file_obj, **kwargs):
+                docs.append(doc)
+        except InvalidBSON as exc:
+            return docs, str(exc)
+    return docs, None
+
+
+class TestIndexChunks:
+
+    def test_chunks_end_on_document_boundaries(self):
+        """Test that every chunk holds whole documents and the index covers the data"""
+        offsets = index_chunks(DATA, chunk_size=4096)
+
+        assert offsets[0] == 0 and offsets[-1] == len(DATA)
+        assert len(offsets) > 3
+        docs = [doc for start, end in zip(offsets, offsets[1:]) for doc in decode_all(DATA[start:end])]
+        assert docs == DOCS
+
+    def test_bad_length_prefix_starts_the_last_chunk(self):
+        """Test that documents before a corrupt prefix keep their own chunk"""
+        bad_at = sum(len(encode(doc)) for doc in DOCS[:10])
+        data = DATA[:bad_at] + (10**6).to_bytes(4, 'little') + DATA[bad_at + 4:]
+
+        assert index_chunks(data, chunk_size=10**9).tolist() == [0, bad_at, len(data)]
+
+
+class TestDecodeMmapIter:
+
+    @pytest.mark.parametrize('processes', [None, 2], ids=['in-process', 'pool'])
+    def test_matches_decode_file_iter(self, dump_file, processes):
+        """Test the same documents in the same order, from the current position"""
+        path = dump_file(DATA)
+        skip = len(encode(DOCS[0]))
+        opts = CodecOptions(document_class=SON, tz_aware=True)
+
+        with open(path, 'rb') as file_obj:
+            file_obj.seek(skip)
+            docs = list(decode_mmap_iter(file_obj, opts, processes=processes, chunk_size=4096))
+            assert file_obj.tell() == len(DATA)
+
+        assert docs == list(decode_file_iter(io.BytesIO(DATA[skip:]), opts))
+        assert isinstance(docs[0], SON)
+
+    @pytest.mark.parametrize('processes', [None, 2], ids=['in-process', 'pool'])
+    @pytest.mark.parametrize('corrupt', [
+        lambda data: data[:-7],
+        lambda data: data[:5000] + b'\xff' * 4 + data[5004:],
+        lambda data: data + b'\x01\x02'
+    ], ids=['truncated', 'garbage', 'trailing-bytes'])
+    def test_errors_match_decode_file_iter(self, dump_file, processes, corrupt):
+        """Test that the documents before a bad one are yielded, then the same error is raised"""
+        path = dump_file(corrupt(DATA))
+
+        expected = read_all(path, decode_file_iter)
+        assert expected[1] is not None
+        assert read_all(path, decode_mmap_iter, processes=processes, chunk_size=2048) == expected
+
+    def test_unmappable_files_fall_back(self, dump_file):
+        """Test BytesIO and empty files"""
+        assert list(decode_mmap_iter(io.BytesIO(DATA))) == DOCS
+        with open(dump_file(b''), 'rb') as file_obj:
+            assert list(decode_mmap_iter(file_obj)) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,134 @@
+import datetime
+import io
+import json
+import re
+import uuid
+
+import pytest
+
+from bson import SON, Binary, Code, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp, json_util
+from bson.binary import UuidRepresentation
+from bson.json_util import CANONICAL_JSON_OPTIONS, LEGACY_JSON_OPTIONS, RELAXED_JSON_OPTIONS, JSONOptions, dump_documents
+
+
+class Amount(float):
+    """A float subclass, which json_util only knows through isinstance checks"""
+
+
+DOC = {
+    '_id': ObjectId('665b0c3f8e4a2b1c9d0e1f23'),
+    'createdAt': datetime.datetime(2025, 6, 1, 12, 0, 0, 250000),
+    'util': 'IKEDC',
+    'units': 42,
+    'big': Int64(2**40),
+    'amount': 1500.5,
+    'refund': Amount(2.5),
+    'missing': float('nan'),
+    'paid': True,
+    'note': None,
+    'price': Decimal128('1500.25'),
+    'token': Binary(b'\x01\x02', 0),
+    'items': [1, ('a', 2.0), {'seen': Timestamp(1, 2)}],
+    'meta': SON([('pattern', Regex('^45', 'i')), ('compiled', re.compile('x', re.M))]),
+    'script': Code('return x', {'x': 1}),
+    'bounds': [MinKey(), MaxKey()]
+}
+
+RELAXED = (
+    '{"_id": {"$oid": "665b0c3f8e4a2b1c9d0e1f23"}, "createdAt": {"$date": "2025-06-01T12:00:00.250Z"}, '
+    '"util": "IKEDC", "units": 42, "big": 1099511627776, "amount": 1500.5, "refund": 2.5, '
+    '"missing": {"$numberDouble": "NaN"}, "paid": true, "note": null, "price": {"$numberDecimal": "1500.25"}, '
+    '"token": {"$binary": {"base64": "AQI=", "subType": "00"}}, '
+    '"items": [1, ["a", 2.0], {"seen": {"$timestamp": {"t": 1, "i": 2}}}], '
+    '"meta": {"pattern": {"$regularExpression": {"pattern": "^45", "options": "i"}}, '
+    '"compiled": {"$regularExpression": {"pattern": "x", "options": "mu"}}}, '
+    '"script": {"$code": "return x", "$scope": {"x": 1}}, "bounds": [{"$minKey": 1}, {"$maxKey": 1}]}'
+)
+
+
+class TestJSONConvert:
+
+    def test_relaxed_output(self):
+        """Test the documented Relaxed Extended JSON"""
+        assert json_util.dumps(DOC) == RELAXED
+
+    @pytest.mark.parametrize('options', [RELAXED_JSON_OPTIONS, CANONICAL_JSON_OPTIONS, LEGACY_JSON_OPTIONS], ids=['relaxed', 'canonical', 'legacy'])
+    def test_round_trip(self, options):
+        """Test that each mode loads back what it dumps"""
+        doc = dict(DOC, missing=1.0, meta={'pattern': Regex('^45', 'i')}, items=[1, {'seen': Timestamp(1, 2)}])
+        loaded = json_util.loads(json_util.dumps(doc, json_options=options), json_options=options.with_options(tz_aware=False))
+
+        assert loaded['_id'] == doc['_id']
+        assert loaded['createdAt'] == doc['createdAt']
+        assert loaded['price'] == doc['price']
+        assert loaded['items'] == doc['items']
+        assert loaded['meta']['pattern'].pattern == '^45'
+        assert loaded['script'] == doc['script']
+
+    def test_canonical_numbers(self):
+        """Test that canonical mode wraps every number"""
+        converted = json.loads(json_util.dumps({'i': 1, 'l': 2**40, 'f': 1.5, 'b': True}, json_options=CANONICAL_JSON_OPTIONS))
+
+        assert converted == {'i': {'$numberInt': '1'}, 'l': {'$numberLong': '1099511627776'}, 'f': {'$numberDouble': '1.5'}, 'b': True}
+
+    def test_uuid_options_are_honoured(self):
+        """Test that dumps and dump_documents both encode UUIDs with the given representation"""
+        options = JSONOptions(uuid_representation=UuidRepresentation.STANDARD)
+        out = io.StringIO()
+        dump_documents([{'u': uuid.UUID(int=1)}], out, json_options=options)
+
+        assert out.getvalue() == json_util.dumps({'u': uuid.UUID(int=1)}, json_options=options) + "\n"
+        assert json_util.loads(out.getvalue(), json_options=options) == {'u': uuid.UUID(int=1)}
+
+    def test_unknown_types_are_left_to_json(self):
+        """Test that values no encoder handles still reach json.dumps' default"""
+        assert json_util.dumps({'when': datetime.date(2025, 6, 1)}, default=str) == '{"when": "2025-06-01"}'
+
+
+class TestObjectHooks:
+
+    @pytest.mark.parametrize('document_class', [dict, SON], ids=['object_hook', 'object_pairs_hook'])
+    def test_wrappers_are_parsed_and_plain_documents_kept(self, document_class):
+        """Test type wrapper keys with both hooks"""
+        options = RELAXED_JSON_OPTIONS.with_options(document_class=document_class)
+        text = '{"a": {"$oid": "665b0c3f8e4a2b1c9d0e1f23"}, "b": {"x": 1, "y": {"$numberLong": "5"}}, "c": {"$in": [1]}}'
+
+        loaded = json_util.loads(text, json_options=options)
+
+        assert isinstance(loaded, document_class)
+        assert loaded['a'] == ObjectId('665b0c3f8e4a2b1c9d0e1f23')
+        assert loaded['b'] == {'x': 1, 'y': Int64(5)}
+        assert isinstance(loaded['b'], document_class)
+        assert loaded['c'] == {'$in': [1]}
+
+    def test_invalid_wrapper_still_raises(self):
+        """Test that malformed wrappers are rejected as before"""
+        with pytest.raises(TypeError):
+            json_util.loads('{"a": {"$oid": 1}}')
+        with pytest.raises(TypeError):
+            json_util.loads('{"a": {"$numberLong": "5", "extra": 1}}')
+
+
+class TestDumpDocuments:
+
+    def test_writes_one_line_per_document(self, monkeypatch):
+        """Test the output matches dumps per document across chunk boundaries"""
+        monkeypatch.setattr(json_util, '_DUMP_CHUNK_SIZE', 3)
+        docs = [dict(DOC, units=i) for i in range(7)]
+        out = io.StringIO()
+
+        assert dump_documents(iter(docs), out) == 7
+        assert out.getvalue().splitlines() == [json_util.dumps(doc) for doc in docs]
+
+    def test_encoder_options(self):
+        """Test JSONEncoder keyword arguments and the indent restriction"""
+        out = io.StringIO()
+        dump_documents([{'b': 1, 'a': 'é'}], out, json_options=CANONICAL_JSON_OPTIONS, sort_keys=True, ensure_ascii=False)
+
+        assert out.getvalue() == '{"a": "é", "b": {"$numberInt": "1"}}\n'
+        with pytest.raises(ValueError):
+            dump_documents([{}], io.StringIO(), indent=2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,7 +6,8 @@ import os
 # Add the parent directory to the path so we can import lambda_function
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lambda_function import get_report_period
+from lambda_function import get_report_period, summarize_status_mix, parse_read_preference_tags, get_read_preference, windows_cover_range, summarize_hourly_revenue
+from alert_rendering import format_vending_health
 
 
 class TestPowerAlertsLambda:
@@ -87,6 +88,93 @@ class TestPowerAlertsLambda:
             # Start time should be before test time
             assert start_time <= test_time
     
+    def test_summarize_status_mix(self):
+        """Test that (util, status) groups fold into revenue and vending health"""
+        rows = [
+            {'_id': {'util': 'IKEDC', 'status': 'fulfilled'}, 'amount': 9000.0, 'count': 9},
+            {'_id': {'util': 'IKEDC', 'status': 'failed'}, 'amount': 500.0, 'count': 1},
+            {'_id': {'util': 'EKEDC', 'status': 'fulfilled'}, 'amount': 12000.0, 'count': 3},
+            {'_id': {'util': 'EKEDC', 'status': 'pending'}, 'amount': 2000.0, 'count': 1},
+            {'_id': {'util': None, 'status': 'fulfilled'}, 'amount': 100.0, 'count': 1},
+        ]
+        summary = summarize_status_mix(rows, ['failed'], ['pending'])
+        
+        assert summary['total_amount'] == 21100.0
+        assert summary['total_transactions'] == 13
+        assert summary['failed_amount'] == 500.0
+        assert summary['failed_transactions'] == 1
+        assert summary['pending_transactions'] == 1
+        assert summary['fulfillment_rate'] == 13 / 15
+        
+        # Utilities stay ordered by fulfilled revenue
+        assert [u['util'] for u in summary['utility_breakdown']] == ['EKEDC', 'IKEDC']
+        ikedc = next(u for u in summary['status_breakdown'] if u['util'] == 'IKEDC')
+        assert ikedc['fulfillment_rate'] == 0.9
+        
+        health_text = format_vending_health(summary)
+        assert "Fulfillment Rate" in health_text
+        assert "IKEDC" in health_text
+    
+    def test_vending_health_hidden_when_all_fulfilled(self):
+        """Test that the health section is omitted when nothing failed or is pending"""
+        rows = [{'_id': {'util': 'AEDC', 'status': 'fulfilled'}, 'amount': 750.0, 'count': 3}]
+        summary = summarize_status_mix(rows, ['failed'], ['pending'])
+        
+        assert summary['fulfillment_rate'] == 1.0
+        assert format_vending_health(summary) == ""
+    
+    def test_parse_read_preference_tags(self):
+        """Test that tag sets are parsed in order with an empty fallback set"""
+        assert parse_read_preference_tags("nodeType:ANALYTICS,region:eu;") == [
+            {'nodeType': 'ANALYTICS', 'region': 'eu'},
+            {}
+        ]
+        assert parse_read_preference_tags("") is None
+    
+    def test_report_read_preference_from_environment(self, monkeypatch):
+        """Test that reporting reads can be routed to analytics secondaries"""
+        monkeypatch.setenv('REPORT_READ_PREFERENCE', 'secondaryPreferred')
+        monkeypatch.setenv('REPORT_READ_PREFERENCE_TAGS', 'nodeType:ANALYTICS;')
+        monkeypatch.setenv('REPORT_MAX_STALENESS_SECONDS', '120')
+        read_preference = get_read_preference('REPORT')
+        
+        assert read_preference.mongos_mode == 'secondaryPreferred'
+        assert read_preference.tag_sets == [{'nodeType': 'ANALYTICS'}, {}]
+        assert read_preference.max_staleness == 120
+        
+        monkeypatch.delenv('REPORT_READ_PREFERENCE')
+        assert get_read_preference('REPORT') is None
+    
+    def test_windows_cover_range(self):
+        """Test that rollup windows are only used when they cover the whole report window"""
+        day = datetime(2025, 6, 1)
+        windows = [
+            {'window_start': day.replace(hour=0, minute=1), 'window_end': day.replace(hour=5, minute=59)},
+            {'window_start': day.replace(hour=6, minute=1), 'window_end': day.replace(hour=11, minute=59)},
+        ]
+        
+        assert windows_cover_range(windows, day.replace(hour=0, minute=1), day.replace(hour=11, minute=59))
+        assert not windows_cover_range(windows[:1], day.replace(hour=0, minute=1), day.replace(hour=11, minute=59))
+        assert not windows_cover_range([], day, day.replace(hour=6))
+    
+    def test_summarize_hourly_revenue(self):
+        """Test that (util, hour) rows are aligned on every hour of the window"""
+        start_time = datetime(2025, 6, 1, 12, 1)
+        end_time = datetime(2025, 6, 1, 17, 59, 59)
+        rows = [
+            {'_id': {'util': 'EKEDC', 'hour': datetime(2025, 6, 1, 13)}, 'amount': 2000.0, 'count': 2},
+            {'_id': {'util': 'IKEDC', 'hour': datetime(2025, 6, 1, 12)}, 'amount': 500.0, 'count': 1},
+            {'_id': {'util': 'IKEDC', 'hour': datetime(2025, 6, 1, 17)}, 'amount': 1500.0, 'count': 3},
+        ]
+        
+        hourly = summarize_hourly_revenue(rows, start_time, end_time, ['IKEDC', 'EKEDC'])
+        
+        assert hourly['hours'][0] == datetime(2025, 6, 1, 12)
+        assert len(hourly['hours']) == 6
+        assert [u['util'] for u in hourly['by_utility']] == ['IKEDC', 'EKEDC']
+        assert hourly['by_utility'][0]['amounts'] == [500.0, 0.0, 0.0, 0.0, 0.0, 1500.0]
+        assert hourly['by_utility'][1]['transactions'] == [0, 2, 0, 0, 0, 0]
+    
     def test_lambda_function_structure(self):
         """Test that lambda_function has required structure"""
         import lambda_function
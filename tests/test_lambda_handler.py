@@ -0,0 +1,228 @@
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+
+import lambda_function
+from bson import ObjectId
+from deadline import start_invocation_budget
+from harness import FakeLambdaContext, LambdaHarness, generate_transactions
+
+
+# Generous ceilings: the harness has no network, so anything near these
+# means the handler started doing real work it should not (e.g. retries,
+# blocking on a dead host or sleeping on a timeout).
+COLD_PATH_MAX_SECONDS = 3.0
+WARM_PATH_MAX_SECONDS = 1.5
+
+NOW = datetime(2025, 6, 1, 15, 30, 0)
+
+
+def report_window():
+    return NOW - timedelta(hours=6), NOW
+
+
+class TestLambdaHandler:
+
+    def test_cold_and_warm_invocations(self, lambda_harness):
+        """Test the full handler against fake AWS, in-process MongoDB and a local Slack webhook"""
+        start_time, end_time = report_window()
+        docs = generate_transactions(300, start_time, end_time)
+        lambda_harness.seed(docs)
+
+        cold_response, cold_seconds = lambda_harness.invoke()
+        warm_response, warm_seconds = lambda_harness.invoke()
+
+        for response in (cold_response, warm_response):
+            assert response['statusCode'] == 200
+            body = json.loads(response['body'])
+            assert body['fidelity'] == 'full'
+            assert body['transaction_count'] == sum(1 for doc in docs if doc['status'] == 'fulfilled')
+            assert body['total_revenue'] == pytest.approx(
+                sum(float(doc['amount']) for doc in docs if doc['status'] == 'fulfilled')
+            )
+
+        # The warm path must reuse the cached client instead of re-reading SSM
+        assert len(lambda_harness.mongo_clients) == 1
+        assert len(lambda_harness.aws.ssm.calls) == 2
+
+        assert len(lambda_harness.slack.requests) == 2
+        message = lambda_harness.slack.messages[0]['text']
+        assert "Revenue Breakdown by Utility" in message
+        assert "IKEDC" in message
+        assert "Vending Health" in message
+        assert "Revenue by Hour" in message
+
+        # Hourly heatmap, sketch and status mix all come from one aggregation per invocation
+        aggregates = [command for command in lambda_harness.mongo_clients[0].commands if command[0] == 'aggregate']
+        assert len(aggregates) == 2
+        assert 'by_util_hour' in aggregates[0][2][-1]['$facet']
+
+        assert cold_seconds < COLD_PATH_MAX_SECONDS
+        assert warm_seconds < WARM_PATH_MAX_SECONDS
+        assert all(request['latency'] < 0.5 for request in lambda_harness.slack.requests)
+
+    def test_empty_window_reports_no_transactions(self, lambda_harness):
+        """Test the no-transactions message when nothing landed in the window"""
+        response, _ = lambda_harness.invoke()
+
+        assert response['statusCode'] == 200
+        assert json.loads(response['body'])['transaction_count'] == 0
+        assert "No new transactions yet" in lambda_harness.slack.messages[0]['text']
+
+    def test_malformed_amount_degrades_to_group_only_fallback(self, lambda_harness):
+        """Test that a $toDouble failure in the main pipeline falls through the fallback tiers"""
+        start_time, end_time = report_window()
+        lambda_harness.seed(generate_transactions(50, start_time, end_time))
+        lambda_harness.seed([{
+            'createdAt': end_time - timedelta(minutes=5),
+            'status': 'failed',
+            'util': 'IKEDC',
+            'amount': 'N/A'
+        }])
+
+        response, _ = lambda_harness.invoke()
+        body = json.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert body['fidelity'] == 'group_only'
+        assert body['transaction_count'] > 0
+        assert "Degraded report (group_only)" in lambda_harness.slack.messages[0]['text']
+
+    def test_fallback_tiers_reuse_main_match(self, lambda_harness, monkeypatch):
+        """Test that the group_only and count_only tiers filter exactly like the main pipeline"""
+        start_time, end_time = report_window()
+        docs = generate_transactions(100, start_time, end_time)
+        docs.append({'createdAt': end_time - timedelta(minutes=5), 'status': 'fulfilled', 'util': 'IKEDC', 'amount': ''})
+        for doc in docs:
+            doc['_id'] = ObjectId(ObjectId.from_datetime(doc['createdAt']).binary[:4] + os.urandom(8))
+        lambda_harness.seed(docs)
+        monkeypatch.setenv('REPORT_ID_RANGE_PRUNING', 'true')
+        start_invocation_budget(FakeLambdaContext())
+        lambda_function.init_mongodb_connection()
+        client = lambda_harness.mongo_clients[-1]
+        collection = lambda_function.database['power_transaction_items']
+
+        group_summary = lambda_function.get_group_only_revenue(collection, start_time, end_time)
+        count_summary = lambda_function.get_count_revenue(collection, start_time, end_time)
+
+        expected = lambda_function.revenue_window_match(start_time, end_time, ['fulfilled'])
+        assert '_id' in expected
+        group_match = next(command for command in client.commands if command[0] == 'aggregate')[2][0]['$match']
+        count_filter = next(command for command in client.commands if command[0] == 'count')[2]
+        assert group_match == count_filter == expected
+        fulfilled = [doc for doc in docs if doc['status'] == 'fulfilled' and doc['amount'] != '']
+        assert group_summary['total_transactions'] == count_summary['total_transactions'] == len(fulfilled)
+        assert group_summary['total_amount'] == pytest.approx(sum(float(doc['amount']) for doc in fulfilled))
+
+    @pytest.mark.parametrize('server_version', [(7, 0, 0), (5, 0, 0)])
+    def test_top_meters_facet(self, server_version):
+        """Test that the top-N facet returns N meters per utility with $topN or its pre-5.2 equivalent"""
+        start_time, end_time = report_window()
+        docs = generate_transactions(400, start_time, end_time)
+        environ = {'REPORT_TOP_N': '3', 'REPORT_TOP_FIELD': 'meterNumber'}
+        with LambdaHarness(now=NOW, server_version=server_version, environ=environ) as harness:
+            harness.seed(docs)
+            response, _ = harness.invoke()
+            aggregate = next(command for command in harness.mongo_clients[0].commands if command[0] == 'aggregate')
+
+        assert response['statusCode'] == 200
+        top_facet = aggregate[2][-1]['$facet']['top_contributors']
+        assert any('$topN' in str(stage) for stage in top_facet) == (server_version >= (5, 2))
+        assert aggregate[3].get('allowDiskUse') is True
+
+        expected = {}
+        for doc in docs:
+            if doc['status'] == 'fulfilled':
+                per_meter = expected.setdefault(doc['util'], {})
+                per_meter[doc['meterNumber']] = per_meter.get(doc['meterNumber'], 0) + float(doc['amount'])
+        message = harness.slack.messages[0]['text']
+        top_section = message.split("Top Meters by Revenue")[1].split("\n\n")[0]
+        for util, per_meter in expected.items():
+            top_meter = max(per_meter, key=per_meter.get)
+            line = next(line for line in top_section.splitlines() if line.startswith(f"• *{util}*"))
+            assert line.count("`") == 2 * 3
+            assert line.startswith(f"• *{util}*: `{top_meter}`")
+
+    def test_hourly_facet_skipped_before_mongodb_5(self):
+        """Test that a 4.4 server gets a full report without the $dateTrunc heatmap facet"""
+        start_time, end_time = report_window()
+        docs = generate_transactions(200, start_time, end_time)
+        with LambdaHarness(now=NOW, server_version=(4, 4, 0)) as harness:
+            harness.seed(docs)
+            response, _ = harness.invoke()
+            aggregate = next(command for command in harness.mongo_clients[0].commands if command[0] == 'aggregate')
+
+        assert response['statusCode'] == 200
+        assert json.loads(response['body'])['fidelity'] == 'full'
+        assert 'by_util_hour' not in aggregate[2][-1]['$facet']
+        assert '$dateTrunc' not in str(aggregate[2])
+        assert "Revenue by Hour" not in harness.slack.messages[0]['text']
+
+    def test_init_phase_moves_setup_out_of_handler(self, lambda_harness):
+        """Test that after initialize() the first invocation reads no config and opens no client"""
+        lambda_function.initialize()
+        assert len(lambda_harness.mongo_clients) == 1
+        assert len(lambda_harness.aws.ssm.calls) == 2
+        assert len(lambda_harness.aws.secretsmanager.calls) == 1
+
+        response, _ = lambda_harness.invoke()
+
+        assert response['statusCode'] == 200
+        assert len(lambda_harness.mongo_clients) == 1
+        assert len(lambda_harness.aws.ssm.calls) == 2
+        assert len(lambda_harness.aws.secretsmanager.calls) == 1
+
+    def test_init_phase_fits_its_total_budget(self, lambda_harness, monkeypatch):
+        """Test that the init-phase SSM and Secrets Manager clients share INIT_MAX_SECONDS without retries"""
+        monkeypatch.setattr(lambda_function, 'INIT_MAX_SECONDS', 6.0)
+        lambda_function.initialize()
+
+        configs = {service: options['config'] for service, options in lambda_harness.aws.client_options}
+        ssm, secrets = configs['ssm'], configs['secretsmanager']
+        assert 2 * (ssm.connect_timeout + ssm.read_timeout) <= 6.0
+        assert secrets.connect_timeout + secrets.read_timeout <= 6.0
+        assert ssm.retries == secrets.retries == {'max_attempts': 0}
+        assert lambda_function.mongodb_client is not None
+
+    def test_init_failure_is_retried_by_handler(self, lambda_harness):
+        """Test that a failed init phase leaves the handler to connect lazily"""
+        parameters = dict(lambda_harness.aws.ssm.parameters)
+        lambda_harness.aws.ssm.parameters.clear()
+        lambda_function.initialize()
+        assert lambda_function.mongodb_client is None
+
+        lambda_harness.aws.ssm.parameters.update(parameters)
+        response, _ = lambda_harness.invoke()
+        assert response['statusCode'] == 200
+
+    def test_snapshot_restore_reconnects(self, lambda_harness):
+        """Test the SnapStart hooks: sockets are dropped before the snapshot and re-opened on restore"""
+        lambda_function.initialize()
+        snapshotted_client = lambda_function.mongodb_client
+
+        lambda_function.before_snapshot()
+        assert snapshotted_client.closed
+        assert lambda_function.mongodb_client is None
+
+        lambda_function.after_restore()
+        assert lambda_function.mongodb_client is not None
+        assert lambda_function.mongodb_client is not snapshotted_client
+        # Config resolved before the snapshot is reused
+        assert len(lambda_harness.aws.ssm.calls) == 2
+
+        response, _ = lambda_harness.invoke()
+        assert response['statusCode'] == 200
+
+    def test_slow_slack_is_bounded_by_remaining_time(self):
+        """Test that a slow webhook cannot hold the handler past its time budget"""
+        with LambdaHarness(now=NOW, slack_delay=3.0) as harness:
+            response, seconds = harness.invoke(timeout_seconds=1.5)
+
+        # The Slack post times out, the error alert gets its own (minimum) timeout
+        assert response['statusCode'] == 500
+        assert seconds < 1.5 + 1.0 + 1.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,260 @@
+import json
+import threading
+import time
+import pytest
+
+import boto3
+
+import notifiers
+
+from harness import FakeAWS, LambdaHarness, SlackWebhookStub
+from notifiers import (
+    SMTPSink, SNSSink, SlackWebhookSink, WebhookSink, borrow_http_session, build_sinks, dispatch_report, get_sink_configs,
+    reset_http_sessions
+)
+
+
+def sample_report():
+    return {
+        'subject': "Power Transaction Revenue Report - Afternoon",
+        'text': "*Power Transaction Revenue Report*",
+        'slack_messages': [{'text': "*Power Transaction Revenue Report*"}],
+        'summary': {'total_amount': 1500.0, 'total_transactions': 3}
+    }
+
+
+@pytest.fixture
+def stubs():
+    started = []
+
+    def start(**options):
+        stub = SlackWebhookStub(**options).start()
+        started.append(stub)
+        return stub
+
+    yield start
+    for stub in started:
+        stub.stop()
+
+
+class TestNotifiers:
+
+    def test_build_sinks_defaults_to_required_slack(self, monkeypatch):
+        """Test that without NOTIFY_SINKS only the Slack secret's webhook is used, and it is required"""
+        monkeypatch.delenv('NOTIFY_SINKS', raising=False)
+        sinks = build_sinks(get_sink_configs(), 'https://hooks.slack.com/services/T/B/X')
+
+        assert len(sinks) == 1
+        assert isinstance(sinks[0], SlackWebhookSink)
+        assert sinks[0].webhook_url == 'https://hooks.slack.com/services/T/B/X'
+        assert sinks[0].required is True
+
+    def test_build_sinks_from_config(self, monkeypatch):
+        """Test parsing a mixed NOTIFY_SINKS list"""
+        monkeypatch.setenv('NOTIFY_SINKS', json.dumps([
+            {'type': 'slack'},
+            {'type': 'webhook', 'url': 'https://example.com/hook', 'timeout': 2},
+            {'type': 'sns', 'topic_arn': 'arn:aws:sns:eu-west-1:123:power-alerts-dev', 'retries': 0}
+        ]))
+        sinks = build_sinks(get_sink_configs(), 'https://hooks.slack.com/x')
+
+        assert [sink.kind for sink in sinks] == ['slack', 'webhook', 'sns']
+        assert sinks[1].timeout == 2.0 and sinks[1].required is False
+        assert sinks[2].retries == 0
+
+        with pytest.raises(ValueError):
+            build_sinks([{'type': 'pager'}])
+
+    def test_slow_sink_does_not_delay_fast_sinks(self, stubs):
+        """Test that sinks are sent concurrently, so a slow one only costs its own latency"""
+        fast = stubs()
+        slow = stubs(delay=0.8)
+        sinks = [SlackWebhookSink(fast.url, name='fast'), WebhookSink(slow.url, name='slow')]
+
+        started = time.perf_counter()
+        results = dispatch_report(sinks, sample_report(), deadline_seconds=5)
+        elapsed = time.perf_counter() - started
+
+        by_name = {result['sink']: result for result in results}
+        assert by_name['fast']['ok'] and by_name['slow']['ok']
+        assert by_name['fast']['latency_ms'] < 500
+        assert by_name['slow']['latency_ms'] >= 800
+        assert elapsed < 1.5
+
+    def test_dispatch_is_bounded_by_deadline(self, stubs):
+        """Test that a hung sink fails by the overall deadline and its thread is joined"""
+        hung = stubs(delay=3.0)
+        fast = stubs()
+        sinks = [WebhookSink(hung.url, name='hung', retries=0), SlackWebhookSink(fast.url, name='fast')]
+
+        started = time.perf_counter()
+        results = dispatch_report(sinks, sample_report(), deadline_seconds=0.5)
+        elapsed = time.perf_counter() - started
+
+        by_name = {result['sink']: result for result in results}
+        assert not by_name['hung']['ok']
+        assert by_name['fast']['ok']
+        assert elapsed < 1.0
+        # Nothing is left running for Lambda to freeze and resume later
+        assert not [thread for thread in threading.enumerate() if thread.name.startswith('notify')]
+
+    def test_retries_after_server_error(self, stubs):
+        """Test that a 500 is retried and the attempt count is reported"""
+        flaky = stubs(failures=1)
+        results = dispatch_report([SlackWebhookSink(flaky.url, retries=1)], sample_report(), deadline_seconds=5)
+
+        assert results[0]['ok']
+        assert results[0]['attempts'] == 2
+        assert len(flaky.requests) == 2
+
+    def test_retry_resumes_at_the_failed_page(self, stubs):
+        """Test that pages delivered before a failure are not posted again by the retry"""
+        flaky = stubs(fail_at=[1])
+        report = sample_report()
+        report['slack_messages'] = [{'text': f"Page {page}"} for page in range(1, 4)]
+
+        results = dispatch_report([SlackWebhookSink(flaky.url, retries=1)], report, deadline_seconds=5)
+
+        assert results[0]['ok']
+        assert results[0]['attempts'] == 2
+        assert [request['payload']['text'] for request in flaky.requests] == ["Page 1", "Page 2", "Page 2", "Page 3"]
+        delivered = [request['payload']['text'] for request in flaky.requests if request['status'] == 200]
+        assert delivered == ["Page 1", "Page 2", "Page 3"]
+
+    def test_sink_timeout_covers_all_pages(self, stubs):
+        """Test that a multi-page send shares one sink timeout instead of getting one per page"""
+        slow = stubs(delay=0.4)
+        report = sample_report()
+        report['slack_messages'] = [{'text': f"Page {page}"} for page in range(1, 4)]
+
+        started = time.perf_counter()
+        results = dispatch_report([SlackWebhookSink(slow.url, timeout=1.0, retries=0)], report, deadline_seconds=5)
+        elapsed = time.perf_counter() - started
+
+        assert not results[0]['ok']
+        assert elapsed < 1.15
+
+    def test_gives_up_after_retries(self, stubs):
+        """Test that a sink failing every attempt reports its last error"""
+        broken = stubs(status=500)
+        results = dispatch_report([WebhookSink(broken.url, retries=2)], sample_report(), deadline_seconds=5)
+
+        assert not results[0]['ok']
+        assert results[0]['attempts'] == 3
+        assert '500' in results[0]['error']
+
+    def test_concurrent_senders_borrow_separate_sessions(self):
+        """Test that threads never share a requests.Session and idle sessions are reused"""
+        reset_http_sessions()
+        both_borrowed = threading.Barrier(2)
+        borrowed = []
+
+        def borrow():
+            with borrow_http_session() as session:
+                borrowed.append(session)
+                both_borrowed.wait(timeout=5)
+
+        threads = [threading.Thread(target=borrow) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert borrowed[0] is not borrowed[1]
+        with borrow_http_session() as session:
+            assert session in borrowed
+
+    def test_reset_drops_sessions_borrowed_before_it(self):
+        """Test that a session still in use at reset is closed, not pooled, when it is returned"""
+        reset_http_sessions()
+        with borrow_http_session() as in_flight:
+            reset_http_sessions()
+
+        with borrow_http_session() as session:
+            assert session is not in_flight
+        reset_http_sessions()
+
+    def test_sns_sink_publishes_text(self, monkeypatch):
+        """Test that SNS gets the plain-text report with a subject within its 100-character limit"""
+        aws = FakeAWS()
+        monkeypatch.setattr(boto3, 'client', aws.client)
+        report = sample_report()
+        report['subject'] = "x" * 150
+
+        results = dispatch_report([SNSSink('arn:aws:sns:eu-west-1:123:power-alerts-dev')], report, deadline_seconds=5)
+
+        assert results[0]['ok']
+        assert aws.sns.published[0]['Message'] == report['text']
+        assert len(aws.sns.published[0]['Subject']) == 100
+
+    def test_smtp_credentials_come_from_secrets_manager(self, monkeypatch):
+        """Test that the SMTP login is read from its secret, and never from NOTIFY_SINKS"""
+        aws = FakeAWS(secrets={'power-alerts/dev/smtp': json.dumps({'username': 'alerts', 'password': 's3cret'})})
+        monkeypatch.setattr(boto3, 'client', aws.client)
+        monkeypatch.setattr(notifiers, 'smtp_credentials_cache', {})
+        sessions = []
+
+        class FakeSMTP:
+
+            def __init__(self, host, port, timeout):
+                self.calls = [('connect', host, port)]
+                sessions.append(self)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def starttls(self):
+                self.calls.append(('starttls',))
+
+            def login(self, username, password):
+                self.calls.append(('login', username, password))
+
+            def send_message(self, email):
+                self.calls.append(('send', email['To']))
+
+        monkeypatch.setattr(notifiers.smtplib, 'SMTP', FakeSMTP)
+        sink = SMTPSink('smtp.example.com', 'alerts@example.com', ['finance@example.com'], credentials_secret='power-alerts/dev/smtp')
+
+        results = dispatch_report([sink], sample_report(), deadline_seconds=5)
+        results += dispatch_report([sink], sample_report(), deadline_seconds=5)
+
+        assert all(result['ok'] for result in results)
+        assert sessions[0].calls == [
+            ('connect', 'smtp.example.com', 587), ('starttls',), ('login', 'alerts', 's3cret'), ('send', 'finance@example.com')
+        ]
+        assert aws.secretsmanager.calls == ['power-alerts/dev/smtp']
+
+        with pytest.raises(ValueError):
+            build_sinks([{'type': 'smtp', 'host': 'smtp.example.com', 'sender': 'a@example.com', 'recipients': [], 'password': 'x'}])
+
+    def test_handler_reports_per_sink_results(self, stubs):
+        """Test that the handler fans out to every configured sink and returns their latencies"""
+        webhook = stubs()
+        sinks = [{'type': 'slack'}, {'type': 'webhook', 'url': webhook.url}]
+        with LambdaHarness(environ={'NOTIFY_SINKS': json.dumps(sinks)}) as harness:
+            response, _ = harness.invoke()
+
+        body = json.loads(response['body'])
+        assert response['statusCode'] == 200
+        assert [result['sink'] for result in body['notifications']] == ['slack', 'webhook']
+        assert all(result['ok'] for result in body['notifications'])
+        assert len(harness.slack.requests) == 1
+        assert "Revenue Report" in webhook.messages[0]['text']
+
+    def test_optional_sink_failure_does_not_fail_handler(self, stubs):
+        """Test that only required sinks turn a delivery failure into an error response"""
+        broken = stubs(status=500)
+        sinks = [{'type': 'slack'}, {'type': 'webhook', 'url': broken.url, 'retries': 0}]
+        with LambdaHarness(environ={'NOTIFY_SINKS': json.dumps(sinks)}) as harness:
+            response, _ = harness.invoke()
+
+        body = json.loads(response['body'])
+        assert response['statusCode'] == 200
+        assert [result['ok'] for result in body['notifications']] == [True, False]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,126 @@
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import lambda_function
+from bson import ObjectId
+from deadline import start_invocation_budget
+from harness import FakeLambdaContext, generate_transactions
+from lambda_function import get_power_transaction_revenue
+
+
+START = datetime(2025, 6, 1, 12, 0, 0)
+END = datetime(2025, 6, 1, 18, 0, 0)
+
+
+def oid_at(when):
+    """An ObjectId as the driver would have generated it at `when`"""
+    return ObjectId(ObjectId.from_datetime(when).binary[:4] + os.urandom(8))
+
+
+def in_range(oid, bounds):
+    return all({'$gte': oid >= bound, '$lt': oid < bound, '$lte': oid <= bound}[op] for op, bound in bounds.items())
+
+
+class TestObjectIdRangeFilter:
+
+    def test_bounds_cover_whole_seconds(self):
+        """Test the tightest bounds for inclusive and exclusive ends"""
+        bounds = ObjectId.range_filter(START, END)
+
+        assert bounds == {'$gte': ObjectId.from_datetime(START), '$lt': ObjectId.from_datetime(END + timedelta(seconds=1))}
+        assert in_range(oid_at(START), bounds)
+        assert in_range(oid_at(END), bounds)
+        assert not in_range(oid_at(START - timedelta(seconds=1)), bounds)
+        assert not in_range(oid_at(END + timedelta(seconds=1)), bounds)
+
+        exclusive = ObjectId.range_filter(START, END, inclusive_end=False)
+        assert exclusive['$lt'] == ObjectId.from_datetime(END)
+        assert ObjectId.range_filter(START, END + timedelta(milliseconds=500), inclusive_end=False) == bounds
+
+    def test_aware_datetimes_are_converted_to_utc(self):
+        """Test that bounds follow from_datetime's time zone handling"""
+        lagos = timezone(timedelta(hours=1))
+        aware = ObjectId.range_filter(START.replace(tzinfo=lagos) + timedelta(hours=1), END.replace(tzinfo=lagos) + timedelta(hours=1))
+
+        assert aware == ObjectId.range_filter(START, END)
+
+    def test_end_past_the_last_timestamp(self):
+        """Test that an end beyond 2106 is capped at the largest ObjectId"""
+        assert ObjectId.range_filter(START, datetime(2200, 1, 1))['$lte'] == ObjectId('f' * 24)
+
+
+class TestGenerateBatch:
+
+    def test_batch_continues_the_counter(self):
+        """Test unique, increasing ids that share the per-process prefix"""
+        before = ObjectId()
+        batch = ObjectId.generate_batch(1000)
+        after = ObjectId()
+
+        assert len(set(batch)) == 1000
+        assert {oid.binary[4:9] for oid in batch} == {before.binary[4:9]}
+        counters = [int.from_bytes(oid.binary[9:], 'big') for oid in [before] + batch + [after]]
+        assert all((b - a) % (1 << 24) == 1 for a, b in zip(counters, counters[1:]))
+        assert ObjectId.generate_batch(0) == []
+
+    def test_counter_wraps(self, monkeypatch):
+        """Test the 3-byte counter wraps like ObjectId() does"""
+        monkeypatch.setattr(ObjectId, '_inc', 0xFFFFFE)
+        batch = ObjectId.generate_batch(3)
+
+        assert [oid.binary[9:] for oid in batch] == [b'\xff\xff\xfe', b'\xff\xff\xff', b'\x00\x00\x00']
+        assert ObjectId._inc == 1
+
+    def test_concurrent_batches_do_not_overlap(self):
+        """Test threads reserving counter ranges at the same time"""
+        batches = []
+        threads = [threading.Thread(target=lambda: batches.append(ObjectId.generate_batch(5000))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({oid for batch in batches for oid in batch}) == 20000
+
+    def test_invalid_count(self):
+        """Test that negative counts and counts beyond the counter range are rejected"""
+        with pytest.raises(ValueError):
+            ObjectId.generate_batch(-1)
+        with pytest.raises(ValueError):
+            ObjectId.generate_batch((1 << 24) + 1)
+
+
+class TestRevenueIdPruning:
+
+    def test_pipeline_bounds_id_when_enabled(self, lambda_harness, monkeypatch):
+        """Test the $match gains a slack-widened _id range and the totals are unchanged"""
+        docs = generate_transactions(300, START, END)
+        for doc in docs:
+            doc['_id'] = oid_at(doc['createdAt'])
+        lambda_harness.seed(docs)
+        start_invocation_budget(FakeLambdaContext())
+        lambda_function.init_mongodb_connection()
+        client = lambda_harness.mongo_clients[-1]
+
+        unpruned = get_power_transaction_revenue(START, END)
+        monkeypatch.setenv('REPORT_ID_RANGE_PRUNING', 'true')
+        client.commands.clear()
+        pruned = get_power_transaction_revenue(START, END)
+
+        match = next(command for command in client.commands if command[0] == 'aggregate')[2][0]['$match']
+        slack = timedelta(seconds=lambda_function.ID_RANGE_SLACK_SECONDS)
+        assert match['_id'] == ObjectId.range_filter(START - slack, END + slack)
+        assert match['createdAt'] == {'$gte': START, '$lte': END}
+        assert pruned['total_transactions'] == unpruned['total_transactions']
+        assert pruned['total_amount'] == pytest.approx(unpruned['total_amount'])
+
+    def test_disabled_by_default(self):
+        """Test that the match is createdAt-only unless pruning is switched on"""
+        assert lambda_function.transaction_window_match(START, END) == {'createdAt': {'$gte': START, '$lte': END}}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
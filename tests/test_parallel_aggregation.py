@@ -0,0 +1,120 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+
+import lambda_function
+import manual_handler
+from deadline import start_invocation_budget
+from harness import FakeLambdaContext, generate_transactions
+from lambda_function import choose_partition_count, get_power_transaction_revenue, merge_facet_results
+
+
+NOW = datetime(2025, 6, 1, 15, 30, 0)
+
+
+def seed_rollups(harness, windows, transactions_per_window):
+    harness.database['revenue_window_sketches'].insert_many([
+        {
+            'window_start': NOW - timedelta(hours=6 * (index + 1)),
+            'window_end': NOW - timedelta(hours=6 * index),
+            'total_transactions': transactions_per_window
+        }
+        for index in range(windows)
+    ])
+
+
+def connect(harness):
+    start_invocation_budget(FakeLambdaContext())
+    lambda_function.init_mongodb_connection()
+    return harness.mongo_clients[-1]
+
+
+class TestParallelAggregation:
+
+    def test_merge_facet_results(self):
+        """Test that partial sums, counts, sketch buckets and top-N entries are combined per key"""
+        partials = [
+            {
+                'by_util_status': [{'_id': {'util': 'IKEDC', 'status': 'fulfilled'}, 'amount': 100.0, 'count': 2}],
+                'amount_sketch': [{'_id': {'util': 'IKEDC', 'bucket': 400}, 'count': 2}],
+                'top_contributors': [{'_id': 'IKEDC', 'top': [{'key': 'm1', 'amount': 60.0, 'count': 1}]}]
+            },
+            {
+                'by_util_status': [
+                    {'_id': {'util': 'IKEDC', 'status': 'fulfilled'}, 'amount': 50.0, 'count': 1},
+                    {'_id': {'util': 'AEDC', 'status': 'failed'}, 'amount': 10.0, 'count': 1}
+                ],
+                'amount_sketch': [{'_id': {'util': 'IKEDC', 'bucket': 400}, 'count': 1}],
+                'top_contributors': [{'_id': 'IKEDC', 'top': [
+                    {'key': 'm2', 'amount': 45.0, 'count': 1},
+                    {'key': 'm1', 'amount': 5.0, 'count': 1}
+                ]}]
+            },
+            None
+        ]
+
+        merged = merge_facet_results(partials, top_n=1)
+
+        statuses = {(row['_id']['util'], row['_id']['status']): row for row in merged['by_util_status']}
+        assert statuses[('IKEDC', 'fulfilled')]['amount'] == 150.0
+        assert statuses[('IKEDC', 'fulfilled')]['count'] == 3
+        assert statuses[('AEDC', 'failed')]['count'] == 1
+        assert merged['amount_sketch'] == [{'_id': {'util': 'IKEDC', 'bucket': 400}, 'count': 3}]
+        assert merged['top_contributors'] == [{'_id': 'IKEDC', 'top': [{'key': 'm1', 'amount': 65.0, 'count': 2}]}]
+
+    def test_partition_count_follows_historical_volume(self, lambda_harness, monkeypatch):
+        """Test that K grows with expected documents and short windows stay in one pass"""
+        seed_rollups(lambda_harness, windows=4, transactions_per_window=3600)
+        connect(lambda_harness)
+        monkeypatch.setattr(lambda_function, 'PARTITION_TARGET_DOCUMENTS', 5000)
+
+        # 3,600 per 6 hours = 10/minute
+        assert choose_partition_count(NOW - timedelta(hours=6), NOW) == 1
+        assert choose_partition_count(NOW - timedelta(days=1), NOW) == 3
+        assert choose_partition_count(NOW - timedelta(days=30), NOW) == lambda_function.PARALLEL_AGGREGATION_MAX_PARTITIONS
+
+    def test_partition_count_without_history(self, lambda_harness):
+        """Test that a fresh deployment with no rollups aggregates in one pass"""
+        connect(lambda_harness)
+        assert choose_partition_count(NOW - timedelta(days=7), NOW) == 1
+
+    def test_partitioned_matches_single_pass(self, lambda_harness, monkeypatch):
+        """Test that K sub-range aggregations merge to the same report as one aggregation"""
+        start_time, end_time = NOW - timedelta(days=2), NOW
+        docs = generate_transactions(600, start_time, end_time)
+        docs.append({'createdAt': end_time, 'status': 'fulfilled', 'util': 'IKEDC', 'amount': '250.00'})
+        lambda_harness.seed(docs)
+        client = connect(lambda_harness)
+
+        single = get_power_transaction_revenue(start_time, end_time)
+        monkeypatch.setenv('AGGREGATION_PARTITIONS', '4')
+        client.commands.clear()
+        partitioned = get_power_transaction_revenue(start_time, end_time)
+
+        aggregates = [command for command in client.commands if command[0] == 'aggregate']
+        assert len(aggregates) == 4
+        ranges = [command[2][0]['$match']['createdAt'] for command in aggregates]
+        assert sorted(ranges, key=lambda r: r['$gte'])[-1]['$lte'] == end_time
+
+        assert partitioned['partitions'] == 4
+        assert partitioned['fidelity'] == 'full'
+        assert partitioned['total_transactions'] == single['total_transactions']
+        assert partitioned['total_amount'] == pytest.approx(single['total_amount'])
+        assert [u['util'] for u in partitioned['utility_breakdown']] == [u['util'] for u in single['utility_breakdown']]
+        assert partitioned['failed_transactions'] == single['failed_transactions']
+        assert partitioned['amount_sketch'] == single['amount_sketch']
+        assert partitioned['hourly_revenue']['by_utility'][0]['transactions'] == single['hourly_revenue']['by_utility'][0]['transactions']
+
+    def test_range_report_check(self, lambda_harness):
+        """Test the manual multi-day report entry point"""
+        response = manual_handler.lambda_handler({'check_type': 'range_report', 'days': 3}, FakeLambdaContext())
+        body = json.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert body['days'] == 3
+        assert body['partitions'] == 1
+        assert body['fidelity'] == 'full'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
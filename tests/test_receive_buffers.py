@@ -0,0 +1,132 @@
+import asyncio
+import socket
+import struct
+from types import SimpleNamespace
+
+import pytest
+from bson import encode
+from pymongo.compression_support import CompressionSettings, ZlibContext
+from pymongo.common import MAX_MESSAGE_SIZE
+from pymongo.message import _UNPACK_REPLY
+from pymongo.network_layer import PyMongoProtocol, _ReceiveBuffers, receive_data, receive_message
+
+
+REPLY = {'cursor': {'firstBatch': [{'util': f"UTIL-{i}", 'amount': 1500.0 + i} for i in range(2000)], 'id': 0}, 'ok': 1.0}
+
+
+def op_msg(doc, request_id=1, response_to=7, compressor=None):
+    """An OP_MSG reply as the server would send it, optionally wrapped in OP_COMPRESSED"""
+    body = struct.pack('<iB', 0, 0) + encode(doc)
+    if compressor is None:
+        return struct.pack('<iiii', 16 + len(body), request_id, response_to, 2013) + body
+    compressed = compressor.compress(body)
+    return (
+        struct.pack('<iiii', 25 + len(compressed), request_id, response_to, 2012)
+        + struct.pack('<iiB', 2013, len(body), compressor.compressor_id)
+        + compressed
+    )
+
+
+@pytest.fixture
+def connection():
+    server, client = socket.socketpair()
+    conn = SimpleNamespace(
+        conn=client,
+        set_conn_timeout=client.settimeout,
+        cancel_context=SimpleNamespace(cancelled=False),
+        is_sdam=False,
+        receive_buffers=_ReceiveBuffers(max_retained=1024 * 1024),
+        compression_settings=None
+    )
+    yield server, conn
+    server.close()
+    client.close()
+
+
+class TestReceiveBuffers:
+
+    def test_buffer_is_reused_between_replies(self, connection):
+        """Test that consecutive reads land in the same retained buffer"""
+        server, conn = connection
+        server.sendall(b'a' * 1000 + b'b' * 2000)
+
+        first = receive_data(conn, 1000, None)
+        assert bytes(first) == b'a' * 1000
+        first.release()
+        second = receive_data(conn, 2000, None)
+
+        assert bytes(second) == b'b' * 2000
+        assert (conn.receive_buffers.allocated, conn.receive_buffers.reused) == (1, 1)
+
+    def test_live_view_is_never_overwritten(self, connection):
+        """Test that a reply still referenced (e.g. by a RawBSONDocument) keeps its bytes"""
+        server, conn = connection
+        server.sendall(b'a' * 100 + b'b' * 100 + b'c' * 100)
+
+        first = receive_data(conn, 100, None)
+        second = receive_data(conn, 100, None)
+        third = receive_data(conn, 100, None)
+
+        assert bytes(first) == b'a' * 100
+        assert bytes(second) == b'b' * 100
+        assert bytes(third) == b'c' * 100
+        assert conn.receive_buffers.allocated == 3
+        assert len(conn.receive_buffers._ring) == 2
+
+    def test_large_replies_are_not_retained(self, connection):
+        """Test the upper bound on retained buffer size"""
+        server, conn = connection
+        conn.receive_buffers = _ReceiveBuffers(max_retained=4096)
+        server.sendall(b'x' * 10000)
+
+        assert bytes(receive_data(conn, 10000, None)) == b'x' * 10000
+        assert conn.receive_buffers.retained_bytes == 0
+
+    def test_receive_message_decodes_from_retained_buffer(self, connection):
+        """Test plain and zlib-compressed OP_MSG replies read through the ring"""
+        server, conn = connection
+        conn.compression_settings = CompressionSettings(['zlib'], 6)
+
+        for compressor in (None, ZlibContext(6), None):
+            server.sendall(op_msg(REPLY, compressor=compressor))
+            reply = receive_message(conn, 7)
+            assert reply.unpack_response()[0] == REPLY
+            del reply
+
+        assert conn.receive_buffers.reused >= 4
+        assert conn.receive_buffers.retained_bytes <= 2 * 1024 * 1024
+
+    def test_default_cap_bounds_pool_memory(self):
+        """Test that without an explicit cap a connection keeps at most two 1 MiB buffers"""
+        buffers = _ReceiveBuffers()
+        for length in (300 * 1024, 900 * 1024, 3 * 1024 * 1024):
+            buffers.get(length)
+
+        assert buffers.max_retained == 1024 * 1024
+        assert buffers.retained_bytes <= 2 * 1024 * 1024
+
+    def test_async_protocol_reads_into_the_ring(self):
+        """Test that the asyncio protocol reuses its receive buffer once the previous reply is gone"""
+        async def receive_replies():
+            protocol = PyMongoProtocol()
+            protocol.transport = SimpleNamespace(pause_reading=lambda: None, resume_reading=lambda: None, is_closing=lambda: False)
+            for _ in range(3):
+                message = op_msg(REPLY)
+                written = 0
+                while written < len(message):
+                    buf = protocol.get_buffer(-1)
+                    nbytes = min(len(buf), len(message) - written)
+                    buf[:nbytes] = message[written:written + nbytes]
+                    protocol.buffer_updated(nbytes)
+                    written += nbytes
+                data, op_code = await protocol.read(7, MAX_MESSAGE_SIZE)
+                assert _UNPACK_REPLY[op_code](data).unpack_response()[0] == REPLY
+                del data
+            return protocol._receive_buffers
+
+        buffers = asyncio.run(receive_replies())
+        assert (buffers.allocated, buffers.reused) == (1, 2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from bson.decimal128 import Decimal128
+
+import manual_handler
+from harness import FakeLambdaContext, generate_transactions
+from reconciliation import parse_amount, split_range
+
+
+NOW = datetime(2025, 6, 1, 15, 30, 0)
+START = NOW - timedelta(hours=6)
+
+
+def run_reconcile(start_time=START, end_time=NOW):
+    event = {'check_type': 'reconcile', 'start_time': start_time.isoformat(), 'end_time': end_time.isoformat()}
+    response = manual_handler.lambda_handler(event, FakeLambdaContext())
+    return response, json.loads(response['body'])
+
+
+class TestReconciliation:
+
+    def test_split_range_is_contiguous(self):
+        """Test that sub-ranges tile the window and only the last one includes its end"""
+        ranges = split_range(START, NOW, 4)
+
+        assert len(ranges) == 4
+        assert ranges[0][0] == START and ranges[-1][1] == NOW
+        assert all(ranges[i][1] == ranges[i + 1][0] for i in range(3))
+        assert [inclusive for _, _, inclusive in ranges] == [False, False, False, True]
+
+    def test_parse_amount(self):
+        """Test exact parsing of the amount shapes found in production"""
+        assert parse_amount("1500.10") == Decimal("1500.10")
+        assert parse_amount(0.1) == Decimal("0.1")
+        assert parse_amount(2500) == Decimal(2500)
+        assert parse_amount(Decimal128("99.99")) == Decimal("99.99")
+        for malformed in ("N/A", "", None, "NaN", True, {'value': 1}):
+            assert parse_amount(malformed) is None
+
+    def test_clean_window_matches_report(self, lambda_harness):
+        """Test that exact sums over parallel partitions agree with the aggregation"""
+        docs = generate_transactions(300, START, NOW)
+        # A transaction exactly on a partition boundary must be counted once
+        docs.append({'createdAt': split_range(START, NOW, 4)[1][0], 'status': 'fulfilled', 'util': 'IKEDC', 'amount': '100.00'})
+        lambda_harness.seed(docs)
+
+        response, body = run_reconcile()
+
+        reconciliation = body['reconciliation']
+        assert response['statusCode'] == 200
+        assert reconciliation['ok'], reconciliation['drift']
+        assert reconciliation['partitions'] == 4
+        assert reconciliation['documents_scanned'] == sum(1 for doc in docs if doc['status'] == 'fulfilled')
+        assert float(reconciliation['recomputed_total']) == pytest.approx(reconciliation['reported_total'])
+
+    def test_malformed_amounts_are_reported_with_ids(self, lambda_harness):
+        """Test that amounts the aggregation cannot count show up as drift with their document IDs"""
+        lambda_harness.seed(generate_transactions(100, START, NOW))
+        lambda_harness.seed([
+            {'createdAt': NOW - timedelta(hours=1), 'status': 'fulfilled', 'util': 'EKEDC', 'amount': ''},
+            {'createdAt': NOW - timedelta(hours=2), 'status': 'fulfilled', 'util': 'EKEDC'}
+        ])
+        bad_ids = {str(doc['_id']) for doc in lambda_harness.database['power_transaction_items'].find({'util': 'EKEDC', 'amount': {'$in': ['', None]}})}
+
+        response, body = run_reconcile()
+
+        reconciliation = body['reconciliation']
+        assert response['statusCode'] == 200
+        assert not reconciliation['ok']
+        assert reconciliation['malformed_count'] == 2
+        assert {doc['_id'] for doc in reconciliation['offending_documents']} == bad_ids
+        [drift] = reconciliation['drift']
+        assert drift['util'] == 'EKEDC'
+        assert drift['malformed_transactions'] == 2
+        assert abs(Decimal(drift['difference'])) < Decimal('0.01')
+
+    def test_transactions_without_util_match_report(self, lambda_harness):
+        """Test that transactions without a util count toward the total but are not reported as drift"""
+        lambda_harness.seed(generate_transactions(100, START, NOW))
+        lambda_harness.seed([
+            {'createdAt': NOW - timedelta(hours=1), 'status': 'fulfilled', 'amount': '250.00'},
+            {'createdAt': NOW - timedelta(hours=2), 'status': 'fulfilled', 'util': '', 'amount': '750.00'}
+        ])
+
+        response, body = run_reconcile()
+
+        reconciliation = body['reconciliation']
+        assert response['statusCode'] == 200
+        assert reconciliation['ok'], reconciliation['drift']
+        assert reconciliation['unattributed'] == {'amount': '1000.00', 'transactions': 2}
+        assert float(reconciliation['recomputed_total']) == pytest.approx(reconciliation['reported_total'])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
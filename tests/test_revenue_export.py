@@ -0,0 +1,125 @@
+import gzip
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+
+from harness import LambdaHarness, generate_transactions
+from revenue_export import RAW_TRANSACTION_COLUMNS, export_path, iter_fulfilled_batches, write_export
+
+
+NOW = datetime(2025, 6, 1, 15, 30, 0)
+START = NOW - timedelta(hours=6)
+
+
+def read_ndjson(data):
+    return [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+
+
+class TestRevenueExport:
+
+    def test_export_path_is_date_partitioned(self):
+        """Test the Hive-style partition layout"""
+        path = export_path('window_aggregates', datetime(2025, 6, 1, 12, 1), datetime(2025, 6, 1, 17, 59), 'ndjson')
+        assert path == 'window_aggregates/date=2025-06-01/20250601T1201-20250601T1759.ndjson.gz'
+
+    def test_failed_export_leaves_no_partial_file(self, tmp_path):
+        """Test that an error mid-stream removes the staging file and never publishes the destination"""
+
+        def batches():
+            yield [{'util': 'IKEDC', 'amount': 1.0}]
+            raise RuntimeError("cursor died")
+
+        with pytest.raises(RuntimeError):
+            write_export(str(tmp_path), 'window_aggregates/part.ndjson.gz', batches(), 'ndjson')
+
+        assert os.listdir(tmp_path / 'window_aggregates') == []
+
+    def test_parquet_column_that_starts_all_null(self, tmp_path):
+        """Test that a column with only nulls in the first batch keeps its declared type"""
+        pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+        row = {'_id': 'a1', 'createdAt': START, 'util': 'IKEDC', 'status': 'fulfilled', 'amount': '1500.00', 'meterNumber': '45011'}
+        batches = [
+            [dict(row, customerId=None), dict(row, customerId=None)],
+            [dict(row, customerId='cust-7')]
+        ]
+
+        result = write_export(str(tmp_path), 'fulfilled_transactions/part.parquet', batches, 'parquet', RAW_TRANSACTION_COLUMNS)
+        table = pyarrow_parquet.read_table(result['path'])
+
+        assert result['rows'] == 3
+        assert str(table.schema.field('customerId').type) == 'string'
+        assert table.column('customerId').to_pylist() == [None, None, 'cust-7']
+
+    def test_raw_transactions_are_batched_and_projected(self, lambda_harness):
+        """Test that raw rows are streamed in bounded batches with only the exported fields"""
+        docs = generate_transactions(250, START, NOW)
+        lambda_harness.seed(docs)
+        collection = lambda_harness.database['power_transaction_items']
+
+        batches = list(iter_fulfilled_batches(collection, START, NOW, batch_size=40))
+
+        fulfilled = sum(1 for doc in docs if doc['status'] == 'fulfilled')
+        assert sum(len(batch) for batch in batches) == fulfilled
+        assert all(len(batch) <= 40 for batch in batches)
+        assert set(batches[0][0]) == {'_id', 'createdAt', 'util', 'status', 'amount', 'meterNumber', 'customerId'}
+
+    def test_handler_exports_to_local_disk(self, tmp_path):
+        """Test that the handler writes the window aggregate and raw transactions as gzip NDJSON"""
+        docs = generate_transactions(200, START, NOW)
+        environ = {'EXPORT_TARGET': str(tmp_path), 'EXPORT_RAW_TRANSACTIONS': 'true', 'EXPORT_BATCH_SIZE': '50'}
+        with LambdaHarness(now=NOW, environ=environ) as harness:
+            harness.seed(docs)
+            response, _ = harness.invoke()
+
+        body = json.loads(response['body'])
+        assert response['statusCode'] == 200
+        aggregates_path, raw_path = [result['path'] for result in body['exports']]
+
+        with open(aggregates_path, 'rb') as f:
+            aggregates = read_ndjson(f.read())
+        assert sum(row['amount'] for row in aggregates) == pytest.approx(body['total_revenue'])
+        assert {row['fidelity'] for row in aggregates} == {'full'}
+
+        with open(raw_path, 'rb') as f:
+            raw_rows = read_ndjson(f.read())
+        assert len(raw_rows) == body['transaction_count']
+        assert sum(float(row['amount']) for row in raw_rows) == pytest.approx(body['total_revenue'])
+
+    def test_handler_exports_to_s3(self):
+        """Test that an s3:// target uploads one object per window under the prefix"""
+        environ = {'EXPORT_TARGET': 's3://revenue-history/power'}
+        with LambdaHarness(now=NOW, environ=environ) as harness:
+            harness.seed(generate_transactions(30, START, NOW))
+            response, _ = harness.invoke()
+
+        assert response['statusCode'] == 200
+        [(bucket, key)] = harness.aws.s3.objects
+        assert bucket == 'revenue-history'
+        assert key.startswith('power/window_aggregates/date=')
+        assert read_ndjson(harness.aws.s3.objects[(bucket, key)])
+
+    def test_s3_endpoint_url(self):
+        """Test that EXPORT_S3_ENDPOINT_URL reaches the S3 client for S3-compatible stores"""
+        environ = {'EXPORT_TARGET': 's3://revenue-history/power', 'EXPORT_S3_ENDPOINT_URL': 'http://minio.internal:9000'}
+        with LambdaHarness(now=NOW, environ=environ) as harness:
+            harness.seed(generate_transactions(30, START, NOW))
+            response, _ = harness.invoke()
+
+        assert response['statusCode'] == 200
+        [s3_options] = [options for service, options in harness.aws.client_options if service == 's3']
+        assert s3_options['endpoint_url'] == 'http://minio.internal:9000'
+
+    def test_export_failure_does_not_fail_report(self, tmp_path):
+        """Test that a broken export target is logged but the report still succeeds"""
+        blocker = tmp_path / 'not-a-directory'
+        blocker.write_text('')
+        with LambdaHarness(now=NOW, environ={'EXPORT_TARGET': str(blocker)}) as harness:
+            response, _ = harness.invoke()
+
+        assert response['statusCode'] == 200
+        assert json.loads(response['body'])['exports'] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
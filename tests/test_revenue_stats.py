@@ -0,0 +1,77 @@
+import pytest
+import random
+import sys
+import os
+
+# Add the parent directory to the path so we can import revenue_stats
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from revenue_stats import (
+    SKETCH_RELATIVE_ACCURACY,
+    bucket_index,
+    bucket_value,
+    merge_sketches,
+    sketch_quantiles,
+    sketch_histogram,
+    sketches_from_rows,
+    encode_sketch,
+    decode_sketch
+)
+
+
+def build_sketch(amounts):
+    counts = {}
+    for amount in amounts:
+        index = bucket_index(amount)
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+class TestRevenueStats:
+
+    def test_bucket_value_within_relative_accuracy(self):
+        """Test that every amount maps to a bucket within the sketch accuracy"""
+        for amount in [1, 99.5, 500, 1234.56, 20000, 999999]:
+            value = bucket_value(bucket_index(amount))
+            assert abs(value - amount) / amount <= SKETCH_RELATIVE_ACCURACY + 1e-9
+
+    def test_quantiles_match_exact_percentiles(self):
+        """Test sketch quantiles against exact percentiles of the raw amounts"""
+        rng = random.Random(42)
+        amounts = sorted(rng.lognormvariate(8, 1) for _ in range(5000))
+        p50, p90, p99 = sketch_quantiles(build_sketch(amounts))
+
+        for estimate, quantile in [(p50, 0.5), (p90, 0.9), (p99, 0.99)]:
+            exact = amounts[int(quantile * (len(amounts) - 1))]
+            assert abs(estimate - exact) / exact <= 2 * SKETCH_RELATIVE_ACCURACY
+
+    def test_merged_windows_equal_single_window(self):
+        """Test that merging 6-hour sketches gives the same answer as one day-long sketch"""
+        rng = random.Random(7)
+        windows = [[rng.uniform(500, 20000) for _ in range(300)] for _ in range(4)]
+
+        merged = merge_sketches(*(build_sketch(window) for window in windows))
+        whole_day = build_sketch([amount for window in windows for amount in window])
+
+        assert merged == whole_day
+        assert sketch_quantiles(merged) == sketch_quantiles(whole_day)
+
+    def test_sketch_round_trips_through_storage(self):
+        """Test that sketches survive the string-keyed BSON encoding"""
+        rows = [
+            {'_id': {'util': 'IKEDC', 'bucket': 350}, 'count': 4},
+            {'_id': {'util': 'IKEDC', 'bucket': None}, 'count': 1},
+            {'_id': {'util': 'EKEDC', 'bucket': 420}, 'count': 2},
+        ]
+        sketches = sketches_from_rows(rows)
+
+        assert decode_sketch(encode_sketch(sketches['IKEDC'])) == sketches['IKEDC']
+        assert sum(sketch_histogram(sketches['IKEDC'])) == 5
+
+    def test_empty_sketch(self):
+        """Test that an empty sketch yields no percentiles"""
+        assert sketch_quantiles({}) == [None, None, None]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from dns import resolver
+from pymongo.errors import ConfigurationError
+from pymongo.synchronous import srv_resolver
+from pymongo.synchronous.srv_resolver import _SRV_CACHE, _SrvResolver
+from pymongo.uri_parser import parse_uri
+
+import srv_cache
+
+
+FQDN = 'cluster0.abcde.mongodb.net'
+HOSTS = [('cluster0-shard-00-00.abcde.mongodb.net', 27017), ('cluster0-shard-00-01.abcde.mongodb.net', 27017)]
+
+
+class FakeDNS:
+    """Stands in for ``srv_resolver._resolve`` and counts lookups"""
+
+    def __init__(self, hosts=HOSTS, txt='authSource=admin&replicaSet=atlas-abc-shard-0', ttl=60):
+        self.hosts = hosts
+        self.txt = txt
+        self.ttl = ttl
+        self.lookups = []
+        self.fail = False
+
+    def __call__(self, name, rdtype, lifetime=None):
+        self.lookups.append((name, rdtype))
+        if self.fail:
+            raise resolver.LifetimeTimeout(timeout=lifetime, errors=[])
+        if rdtype == 'SRV':
+            records = [
+                SimpleNamespace(target=SimpleNamespace(to_text=lambda omit_final_dot, host=host: host), port=port)
+                for host, port in self.hosts
+            ]
+        elif self.txt is None:
+            raise resolver.NoAnswer()
+        else:
+            records = [SimpleNamespace(strings=[self.txt.encode()])]
+        return FakeAnswer(records, self.ttl)
+
+
+class FakeAnswer(list):
+
+    def __init__(self, records, ttl):
+        super().__init__(records)
+        self.rrset = SimpleNamespace(ttl=ttl)
+
+
+@pytest.fixture
+def dns(monkeypatch, tmp_path):
+    fake = FakeDNS()
+    monkeypatch.setattr(srv_resolver, '_resolve', fake)
+    monkeypatch.setattr(srv_cache, 'SRV_CACHE_FILE', str(tmp_path / 'srv-cache.json'))
+    monkeypatch.setattr(srv_cache, 'installed', False)
+    monkeypatch.setattr(srv_cache, 'parameter_seed', None)
+    _SRV_CACHE.clear()
+    yield fake
+    _SRV_CACHE.clear()
+    _SRV_CACHE.on_update = None
+    _SRV_CACHE.max_stale = 0.0
+
+
+def get_hosts():
+    return _SrvResolver(FQDN, None, 'mongodb').get_hosts()
+
+
+class TestSrvCache:
+
+    def test_client_creation_reuses_records_within_ttl(self, dns):
+        """Test that a second mongodb+srv:// parse within TTL makes no DNS lookups"""
+        first = parse_uri(f"mongodb+srv://{FQDN}/reports")
+        second = parse_uri(f"mongodb+srv://{FQDN}/reports")
+
+        assert len(dns.lookups) == 2
+        assert first['nodelist'] == second['nodelist'] == HOSTS
+        assert second['options']['replicaSet'] == 'atlas-abc-shard-0'
+        assert (_SRV_CACHE.hits, _SRV_CACHE.misses) == (3, 1)
+
+    def test_expired_records_are_looked_up_again(self, dns):
+        """Test that the TTL is respected"""
+        get_hosts()
+        _SRV_CACHE._entries[f"_mongodb._tcp.{FQDN}"]['expires_at'] = time.time() - 1
+        dns.hosts = HOSTS[:1]
+
+        assert get_hosts() == HOSTS[:1]
+        assert len(dns.lookups) == 4
+
+    def test_stale_records_cover_dns_failures(self, dns):
+        """Test that expired records are used when DNS fails, up to max_stale"""
+        get_hosts()
+        _SRV_CACHE._entries[f"_mongodb._tcp.{FQDN}"]['expires_at'] = time.time() - 60
+        dns.fail = True
+
+        with pytest.raises(ConfigurationError):
+            get_hosts()
+
+        _SRV_CACHE.max_stale = 3600
+        assert get_hosts() == HOSTS
+        assert _SRV_CACHE.stale_hits == 1
+
+    def test_cold_start_uses_persisted_seed(self, dns):
+        """Test that a new process serves the persisted records and refreshes them in the background"""
+        srv_cache.install_srv_cache()
+        get_hosts()
+        with open(srv_cache.SRV_CACHE_FILE) as f:
+            persisted = json.load(f)
+        assert persisted[f"_mongodb._tcp.{FQDN}"]['hosts'] == [list(host) for host in HOSTS]
+
+        # A new environment: empty in-memory cache, same seed
+        _SRV_CACHE.clear()
+        srv_cache.installed = False
+        dns.lookups.clear()
+        srv_cache.install_srv_cache()
+
+        assert get_hosts() == HOSTS
+        for _ in range(100):
+            if len(dns.lookups) == 2 and not _SRV_CACHE._refreshing:
+                break
+            time.sleep(0.01)
+        assert len(dns.lookups) == 2
+        assert not _SRV_CACHE.get(f"_mongodb._tcp.{FQDN}")['seeded']
+
+    def test_parameter_is_written_only_when_hosts_change(self, dns, monkeypatch):
+        """Test that fresh answers with the same hosts do not rewrite the SSM seed"""
+        puts = []
+        ssm = SimpleNamespace(put_parameter=lambda **kwargs: puts.append(json.loads(kwargs['Value'])))
+        monkeypatch.setattr(srv_cache, 'SRV_CACHE_PARAMETER', '/power-alerts/test/srv-cache')
+        monkeypatch.setattr(srv_cache.boto3, 'client', lambda service, **kwargs: ssm)
+        _SRV_CACHE.on_update = srv_cache.write_seed
+        key = f"_mongodb._tcp.{FQDN}"
+
+        _SrvResolver(FQDN, None, 'mongodb')._refresh_cache()
+        dns.hosts = list(reversed(HOSTS))
+        _SrvResolver(FQDN, None, 'mongodb')._refresh_cache()
+        assert len(puts) == 1
+
+        dns.hosts = HOSTS[:1]
+        _SrvResolver(FQDN, None, 'mongodb')._refresh_cache()
+        assert len(puts) == 2
+        assert puts[-1][key]['hosts'] == [list(HOSTS[0])]
+
+    def test_counters_are_exact_under_concurrency(self, dns):
+        """Test that hit counts from many threads are not lost"""
+        get_hosts()
+        threads = [threading.Thread(target=lambda: [get_hosts() for _ in range(200)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert (_SRV_CACHE.hits, _SRV_CACHE.misses) == (1600, 1)
+
+    def test_seeded_hosts_are_validated(self, dns):
+        """Test that a seed pointing outside the SRV domain is rejected"""
+        _SRV_CACHE.load({f"_mongodb._tcp.{FQDN}": {
+            'hosts': [['evil.example.com', 27017]],
+            'options': None,
+            'resolved_at': time.time(),
+            'expires_at': time.time() + 60
+        }})
+
+        with pytest.raises(ConfigurationError):
+            get_hosts()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+import socket
+import struct
+from types import SimpleNamespace
+
+import pytest
+from bson import CodecOptions, encode
+from pymongo import MongoClient
+from pymongo.compression_support import CompressionSettings, ZlibContext, _command_compression_context
+from pymongo.message import _GetMore
+from pymongo.network_layer import _ReceiveBuffers, receive_message
+
+import lambda_function
+import wire_compression
+from harness import FakeLambdaContext
+from deadline import start_invocation_budget
+from wire_compression import AdaptiveCompressionPolicy, CompressionMonitor, attach_policy
+
+
+LARGE_REPLY = {'cursor': {'firstBatch': [{'util': f"UTIL-{i}", 'amount': 1500.0 * i} for i in range(500)], 'id': 0}, 'ok': 1.0}
+SMALL_REPLY = {'cursor': {'nextBatch': [], 'id': 0}, 'ok': 1.0}
+
+
+def succeeded(monitor, command_name, reply, duration_micros=1000):
+    """Read `reply` off the wire as receive_message would, then publish its succeeded event"""
+    monitor.policy.received(len(encode(reply)) + 5)
+    monitor.succeeded(SimpleNamespace(command_name=command_name, reply=reply, duration_micros=duration_micros))
+
+
+def get_more_opcode(conn):
+    get_more = _GetMore('db', 'coll', 100, 1234, CodecOptions(), None, None, None, None, None, False, None)
+    message = get_more.get_message(None, conn)[1]
+    return struct.unpack('<i', message[12:16])[0]
+
+
+class TestWireCompression:
+
+    def test_small_replies_are_not_compressed(self):
+        """Test that a command is sent uncompressed once its replies are known to be small"""
+        policy = AdaptiveCompressionPolicy(min_reply_bytes=4096)
+        monitor = CompressionMonitor(policy)
+
+        assert policy.compress_command('getMore')
+        assert not policy.compress_command('ping')
+        for _ in range(3):
+            succeeded(monitor, 'getMore', SMALL_REPLY)
+            succeeded(monitor, 'aggregate', LARGE_REPLY)
+
+        assert not policy.compress_command('getMore')
+        assert policy.compress_command('aggregate')
+        assert policy.metrics()['uncompressed_commands'] == 2
+
+    def test_compressor_follows_round_trip_time(self):
+        """Test that a slow link prefers ratio (zstd) and a fast one speed (snappy)"""
+        negotiated = ['zlib', 'snappy', 'zstd']
+        policy = AdaptiveCompressionPolicy(high_rtt_ms=10)
+        assert policy.choose(negotiated) == 'zlib'
+
+        monitor = CompressionMonitor(policy)
+        succeeded(monitor, 'ping', {'ok': 1.0}, duration_micros=40000)
+        assert policy.rtt_ms == 40
+        assert policy.choose(negotiated) == 'zstd'
+
+        succeeded(monitor, 'ping', {'ok': 1.0}, duration_micros=800)
+        assert policy.choose(negotiated) == 'snappy'
+        assert policy.choose(['zlib']) == 'zlib'
+        assert policy.metrics()['connections'] == {'zlib': 2, 'zstd': 1, 'snappy': 1}
+
+    def test_policy_is_used_by_pymongo(self):
+        """Test the hooks in CompressionSettings, the getMore message and reply decompression"""
+        client = MongoClient('mongodb://localhost:1', connect=False, compressors='zlib')
+        policy = AdaptiveCompressionPolicy(min_reply_bytes=4096)
+        assert attach_policy(client, policy)
+        settings = client.options.pool_options._compression_settings
+
+        ctx = settings.get_compression_context(['zlib'])
+        conn = SimpleNamespace(compression_context=ctx, compression_settings=settings)
+        assert _command_compression_context(conn, 'aggregate') is ctx
+        assert _command_compression_context(conn, 'saslStart') is None
+        assert get_more_opcode(conn) == 2012
+
+        data = encode(LARGE_REPLY)
+        assert settings.decompress(ZlibContext(6).compress(data), ZlibContext.compressor_id) == data
+        metrics = policy.metrics()
+        assert metrics['reply_bytes'] == len(data)
+        assert metrics['request_bytes'] > 0
+        assert metrics['bytes_saved'] > len(data) / 2
+
+        for _ in range(3):
+            succeeded(CompressionMonitor(policy), 'getMore', SMALL_REPLY, 500)
+        assert get_more_opcode(conn) == 2005
+        client.close()
+
+    def test_reply_size_comes_from_the_wire(self):
+        """Test that receive_message reports the uncompressed reply size and nothing is re-encoded"""
+        settings = CompressionSettings(['zlib'], 6)
+        settings.policy = policy = AdaptiveCompressionPolicy()
+        monitor = CompressionMonitor(policy)
+        server, client = socket.socketpair()
+        conn = SimpleNamespace(
+            conn=client,
+            set_conn_timeout=client.settimeout,
+            cancel_context=SimpleNamespace(cancelled=False),
+            is_sdam=False,
+            receive_buffers=_ReceiveBuffers(),
+            compression_settings=settings
+        )
+        body = struct.pack('<iB', 0, 0) + encode(LARGE_REPLY)
+        compressed = ZlibContext(6).compress(body)
+
+        try:
+            server.sendall(struct.pack('<iiii', 16 + len(body), 1, 7, 2013) + body)
+            receive_message(conn, 7)
+            monitor.succeeded(SimpleNamespace(command_name='aggregate', reply=LARGE_REPLY, duration_micros=1000))
+            server.sendall(
+                struct.pack('<iiii', 25 + len(compressed), 2, 8, 2012)
+                + struct.pack('<iiB', 2013, len(body), ZlibContext.compressor_id)
+                + compressed
+            )
+            receive_message(conn, 8)
+            monitor.succeeded(SimpleNamespace(command_name='aggregate', reply=LARGE_REPLY, duration_micros=1000))
+            # An event without a reply read on this thread is not measured
+            monitor.succeeded(SimpleNamespace(command_name='aggregate', reply=LARGE_REPLY, duration_micros=1000))
+        finally:
+            server.close()
+            client.close()
+
+        assert policy.metrics()['average_reply_bytes'] == {'aggregate': len(body)}
+        assert policy._replies['aggregate']['measured'] == 2
+
+    def test_client_gets_compressors(self, lambda_harness, monkeypatch):
+        """Test that the reporting client offers the available compressors"""
+        monkeypatch.setattr(wire_compression, 'MONGO_COMPRESSORS', 'zstd,lz4,zlib')
+        start_invocation_budget(FakeLambdaContext())
+        lambda_function.init_mongodb_connection()
+
+        kwargs = lambda_harness.mongo_clients[-1].kwargs
+        assert kwargs['compressors'][-1] == 'zlib'
+        assert 'lz4' not in kwargs['compressors']
+        assert isinstance(kwargs['event_listeners'][0], CompressionMonitor)
+        # Discovery must not start before the policy is attached
+        assert kwargs['connect'] is False
+
+    def test_compression_off(self, lambda_harness, monkeypatch):
+        """Test MONGO_COMPRESSION=off leaves the client uncompressed"""
+        monkeypatch.setattr(wire_compression, 'MONGO_COMPRESSION', 'off')
+        start_invocation_budget(FakeLambdaContext())
+        lambda_function.init_mongodb_connection()
+
+        assert 'compressors' not in lambda_harness.mongo_clients[-1].kwargs
+        assert lambda_function.log_compression_metrics() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,202 @@
+import contextvars
+import os
+import threading
+import time
+
+from pymongo import compression_support, monitoring
+
+
+# Compressors offered to the server, in order of preference when there is no
+# measurement yet; ones whose Python module is missing are dropped.
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zstd,snappy,zlib')
+# adaptive: choose per connection and per command; static: always the first
+# negotiated compressor (plain pymongo behaviour); off: no compression
+MONGO_COMPRESSION = os.environ.get('MONGO_COMPRESSION', 'adaptive').lower()
+# Replies smaller than this cost more CPU to compress than the bytes saved
+MIN_COMPRESS_REPLY_BYTES = int(os.environ.get('MIN_COMPRESS_REPLY_BYTES', '4096'))
+# Above this round trip the link is bandwidth-bound, so ratio beats speed
+HIGH_RTT_MS = float(os.environ.get('COMPRESSION_HIGH_RTT_MS', '10'))
+
+HIGH_RTT_ORDER = ('zstd', 'zlib', 'snappy')
+LOW_RTT_ORDER = ('snappy', 'zstd', 'zlib')
+# Replies that are always a few hundred bytes
+SMALL_REPLY_COMMANDS = {'ping', 'endsessions', 'killcursors', 'buildinfo'}
+MIN_SAMPLES = 3
+
+AVAILABLE = {
+    'snappy': compression_support._have_snappy,
+    'zlib': compression_support._have_zlib,
+    'zstd': compression_support._have_zstd
+}
+
+
+def get_compressors():
+    """Configured compressors whose module can be imported"""
+    if MONGO_COMPRESSION == 'off':
+        return []
+    names = [name.strip() for name in MONGO_COMPRESSORS.split(',') if name.strip()]
+    return [name for name in names if name in AVAILABLE and AVAILABLE[name]()]
+
+
+class MeasuredContext:
+    """Wraps a pymongo compression context to count bytes and CPU time"""
+
+    def __init__(self, ctx, policy, name):
+        self.compressor_id = ctx.compressor_id
+        self.name = name
+        self._ctx = ctx
+        self._policy = policy
+
+    def compress(self, data):
+        started = time.process_time()
+        compressed = self._ctx.compress(data)
+        self._policy.record('request', len(data), len(compressed), time.process_time() - started)
+        return compressed
+
+
+class AdaptiveCompressionPolicy:
+    """Per-connection compressor choice and per-command compression, driven by reply sizes and RTT
+
+    Attached to the client's ``CompressionSettings``; the server answers a
+    compressed request with a compressed reply, so skipping compression for a
+    command skips it in both directions.
+    """
+
+    def __init__(self, min_reply_bytes=MIN_COMPRESS_REPLY_BYTES, high_rtt_ms=HIGH_RTT_MS):
+        self.min_reply_bytes = min_reply_bytes
+        self.high_rtt_ms = high_rtt_ms
+        self.rtt_ms = None
+        self._lock = threading.Lock()
+        self._replies = {}
+        # Size of the reply just read off the wire; the succeeded event is
+        # published right after, in the same thread or task
+        self._reply_bytes = contextvars.ContextVar('reply_bytes', default=None)
+        self._connections = {}
+        self._skipped = 0
+        self._bytes = {'request': [0, 0], 'reply': [0, 0]}
+        self._cpu_seconds = {'request': 0.0, 'reply': 0.0}
+
+    def choose(self, compressors):
+        """Compressor for a new connection out of those the server negotiated"""
+        if self.rtt_ms is None:
+            chosen = compressors[0]
+        else:
+            order = HIGH_RTT_ORDER if self.rtt_ms >= self.high_rtt_ms else LOW_RTT_ORDER
+            chosen = next((name for name in order if name in compressors), compressors[0])
+        with self._lock:
+            self._connections[chosen] = self._connections.get(chosen, 0) + 1
+        return chosen
+
+    def instrument(self, ctx):
+        name = {1: 'snappy', 2: 'zlib', 3: 'zstd'}.get(ctx.compressor_id)
+        return MeasuredContext(ctx, self, name)
+
+    def average_reply_bytes(self, command_name):
+        samples = self._replies.get(command_name.lower())
+        if not samples or samples['measured'] < MIN_SAMPLES:
+            return None
+        return samples['bytes'] / samples['measured']
+
+    def compress_command(self, command_name):
+        name = command_name.lower()
+        average = self.average_reply_bytes(name)
+        if name in SMALL_REPLY_COMMANDS or (average is not None and average < self.min_reply_bytes):
+            with self._lock:
+                self._skipped += 1
+            return False
+        return True
+
+    def decompress(self, data, compressor_id):
+        started = time.process_time()
+        decompressed = compression_support.decompress(data, compressor_id)
+        self.record('reply', len(decompressed), len(data), time.process_time() - started)
+        return decompressed
+
+    def record(self, direction, raw_bytes, wire_bytes, cpu_seconds):
+        with self._lock:
+            self._bytes[direction][0] += raw_bytes
+            self._bytes[direction][1] += wire_bytes
+            self._cpu_seconds[direction] += cpu_seconds
+
+    def received(self, reply_bytes):
+        """Note the uncompressed size of the reply the connection just read"""
+        self._reply_bytes.set(reply_bytes)
+
+    def observe(self, command_name, reply, duration_micros):
+        """Fold a succeeded command's on-wire reply size and latency into the estimates"""
+
+        size = self._reply_bytes.get()
+        if size is None:
+            return
+        self._reply_bytes.set(None)
+        name = command_name.lower()
+        with self._lock:
+            samples = self._replies.setdefault(name, {'measured': 0, 'bytes': 0})
+            samples['measured'] += 1
+            samples['bytes'] += size
+            # A small reply's latency is mostly the round trip; keep the best seen
+            if size < self.min_reply_bytes:
+                rtt_ms = duration_micros / 1000
+                self.rtt_ms = rtt_ms if self.rtt_ms is None else min(self.rtt_ms, rtt_ms)
+
+    def metrics(self):
+        with self._lock:
+            request_raw, request_wire = self._bytes['request']
+            reply_raw, reply_wire = self._bytes['reply']
+            return {
+                'connections': dict(self._connections),
+                'rtt_ms': None if self.rtt_ms is None else round(self.rtt_ms, 2),
+                'uncompressed_commands': self._skipped,
+                'request_bytes': request_raw,
+                'reply_bytes': reply_raw,
+                'bytes_saved': (request_raw - request_wire) + (reply_raw - reply_wire),
+                'compress_cpu_ms': round(self._cpu_seconds['request'] * 1000, 2),
+                'decompress_cpu_ms': round(self._cpu_seconds['reply'] * 1000, 2),
+                'average_reply_bytes': {
+                    name: round(samples['bytes'] / samples['measured'])
+                    for name, samples in self._replies.items() if samples['measured']
+                }
+            }
+
+
+class CompressionMonitor(monitoring.CommandListener):
+    """Feeds reply sizes and latencies from CommandSucceededEvent into the policy"""
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.policy.observe(event.command_name, event.reply, event.duration_micros)
+
+    def failed(self, event):
+        pass
+
+
+def client_compression_options():
+    """MongoClient keyword arguments and the adaptive policy (None unless MONGO_COMPRESSION=adaptive)"""
+
+    compressors = get_compressors()
+    if not compressors:
+        return {}, None
+    options = {'compressors': compressors}
+    if MONGO_COMPRESSION != 'adaptive':
+        return options, None
+    policy = AdaptiveCompressionPolicy()
+    options['event_listeners'] = [CompressionMonitor(policy)]
+    return options, policy
+
+
+def attach_policy(client, policy):
+    """Install ``policy`` on the client's compression settings
+
+    Create the client with ``connect=False`` so no connection exists yet.
+    """
+
+    pool_options = getattr(client.options, 'pool_options', None)
+    settings = getattr(pool_options, '_compression_settings', None)
+    if settings is not None:
+        settings.policy = policy
+    return settings is not None